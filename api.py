@@ -0,0 +1,354 @@
+"""
+JSON API over the data directory
+Endpoints serve projections and slices of the generated files from in-memory
+snapshots, so clients download only the rows and columns they ask for:
+
+    /api/stocks                    index rows merged with fundamentals
+    /api/stocks/<sym>              one stock file, without its history
+    /api/stocks/<sym>/history      daily (1d), weekly (1wk) or monthly (1mo) bars in a date range
+    /api/screener                  screener rows filtered by <field>_min/<field>_max and <field>=a,b
+    /api/categories/<dimension>    symbols per sector, industry or tag, within other dimensions' values
+
+List endpoints take fields=a,b  sort=-field  offset=  limit=; history takes
+start=/end= (YYYY-MM-DD), points=N (LTTB down to at most N bars) and
+format=rows|columns.
+"""
+
+import os
+import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from flask import Blueprint, abort, jsonify, make_response, request
+from snapshots import FileSnapshot
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+STOCKS_DIR = os.path.join(DATA_DIR, 'stocks')
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+from downsample import lttb_records, resample_records
+from screener import Screener, build_table, rows_from_files
+from categories import CategoryIndex, build_index
+from stock_symbols import INDEX_MEMBERS
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+INTERVALS = ('1d', '1wk', '1mo')
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+def _parse_index(data):
+    return tuple(data.get('stocks', [])), data.get('last_update')
+
+def _parse_bars(records):
+    """Bars as (sorted dates, records) so date ranges are two bisects"""
+    records = sorted(records, key=lambda record: record['Date'])
+    return [record['Date'] for record in records], records
+
+def _parse_stock(data):
+    return data, _parse_bars(data.get('historical', {}).get('monthly', []))
+
+index_snapshot = FileSnapshot(os.path.join(DATA_DIR, 'index.json'), _parse_index, default=((), None))
+fundamentals_snapshot = FileSnapshot(os.path.join(DATA_DIR, 'fundamentals.json'), default={})
+screener_snapshot = FileSnapshot(os.path.join(DATA_DIR, 'screener.json'), default=None)
+categories_snapshot = FileSnapshot(os.path.join(DATA_DIR, 'categories.json'), CategoryIndex.from_dict, default=None)
+_stock_snapshots = {}
+_daily_snapshots = {}
+_weekly_snapshots = {}
+_snapshots_lock = threading.Lock()
+# Derived state is rebuilt under its lock and swapped in as one tuple, so a request
+# never sees the rows of one version with the lookup of another
+_rows = (None, (), {})              # (versions, rows, rows by symbol)
+_rows_lock = threading.Lock()
+_engine = (None, None, None)        # (versions, Screener, last_update)
+_engine_lock = threading.Lock()
+_derived = (None, (), None, None)   # (versions, rows from the stock files, CategoryIndex, last_update)
+_derived_lock = threading.Lock()
+
+def _snapshot(cache, symbol, path, parse, default):
+    with _snapshots_lock:
+        if symbol not in cache:
+            cache[symbol] = FileSnapshot(path, parse, default)
+        return cache[symbol]
+
+def stock_rows():
+    """(rows, rows by symbol, last_update): index rows merged with fundamentals, rebuilt when either file changes"""
+    global _rows
+    index_version, (stocks, last_update) = index_snapshot.get()
+    fundamentals_version, fundamentals = fundamentals_snapshot.get()
+    versions = (index_version, fundamentals_version)
+    state = _rows
+    if state[0] != versions:
+        with _rows_lock:
+            state = _rows
+            if state[0] != versions:
+                rows = tuple({**fundamentals.get(stock['symbol'], {}), **stock} for stock in stocks)
+                state = _rows = (versions, rows, {row['symbol']: row for row in rows})
+    return state[1], state[2], last_update
+
+def derived_rows():
+    """(versions, rows, CategoryIndex, last_update) built from the stock files like the pipeline does
+
+    Serves /api/screener and /api/categories until the pipeline has written
+    screener.json and categories.json. The scrapers replace stock files atomically,
+    which bumps the directory's mtime.
+    """
+    global _derived
+    try:
+        stocks_version = os.stat(STOCKS_DIR).st_mtime_ns
+    except OSError:
+        stocks_version = None
+    versions = (index_snapshot.get()[0], fundamentals_snapshot.get()[0], stocks_version)
+    state = _derived
+    if state[0] != versions:
+        with _derived_lock:
+            state = _derived
+            if state[0] != versions:
+                try:
+                    rows, last_update = rows_from_files(DATA_DIR)
+                except FileNotFoundError:
+                    rows, last_update = [], None
+                state = _derived = (versions, rows, build_index(rows, INDEX_MEMBERS), last_update)
+    return state
+
+def category_index():
+    """data/categories.json, or the index derived from the stock files before it exists"""
+    return categories_snapshot.get()[1] or derived_rows()[2]
+
+def screener_index():
+    """(Screener, last_update) over data/screener.json and categories.json, or rows derived from the stock files"""
+    global _engine
+    table_version, table = screener_snapshot.get()
+    categories_version, categories = categories_snapshot.get()
+    if table is None or categories is None:
+        derived_version, rows, derived_categories, last_update = derived_rows()
+        if table is None:
+            table_version = derived_version
+        if categories is None:
+            categories_version, categories = derived_version, derived_categories
+    versions = (table_version, categories_version)
+    state = _engine
+    if state[0] != versions:
+        with _engine_lock:
+            state = _engine
+            if state[0] != versions:
+                if table is None:
+                    table = build_table(rows, last_update)
+                state = _engine = (versions, Screener.from_table(table, categories), table.get('last_update'))
+    return state[1], state[2]
+
+def _error(status, message):
+    abort(make_response(jsonify(error=message), status))
+
+def _respond(payload):
+    """JSON response with a body ETag, so repeated queries get a 304"""
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+def _symbol(sym):
+    """Canonical 'XXXX.JK' for a known symbol, or a 404"""
+    symbol = sym.upper() if sym.upper().endswith('.JK') else f'{sym.upper()}.JK'
+    if symbol not in stock_rows()[1]:
+        _error(404, f'unknown symbol {sym}')
+    return symbol
+
+def _date(name):
+    """The YYYY-MM-DD query argument `name`, or None; anything else is a 400"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        if not DATE_PATTERN.fullmatch(value):
+            raise ValueError(value)
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        _error(400, f'{name} must be a date as YYYY-MM-DD')
+    return value
+
+def _fields():
+    fields = request.args.get('fields')
+    return [field for field in fields.split(',') if field] if fields else None
+
+def _page():
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        _error(400, 'offset and limit must be integers')
+    if offset < 0 or not 0 < limit <= MAX_LIMIT:
+        _error(400, f'offset must be >= 0 and limit between 1 and {MAX_LIMIT}')
+    return offset, limit
+
+def _project(row, fields):
+    return {field: row.get(field) for field in fields} if fields else row
+
+def _project_nested(data, fields):
+    """Keep dotted paths ('basic.price', 'technicals') of a nested document"""
+    result = {}
+    for field in fields:
+        source, target = data, result
+        keys = field.split('.')
+        for key in keys[:-1]:
+            source = source.get(key) if isinstance(source, dict) else None
+            target = target.setdefault(key, {})
+        target[keys[-1]] = source.get(keys[-1]) if isinstance(source, dict) else None
+    return result
+
+def _sorted(rows, sort):
+    """Sort by `field` or `-field`; rows without a value go last either way"""
+    if not sort:
+        return rows
+    field = sort.lstrip('-')
+    present = [row for row in rows if row.get(field) is not None]
+    missing = [row for row in rows if row.get(field) is None]
+    try:
+        present.sort(key=lambda row: row[field], reverse=sort.startswith('-'))
+    except TypeError:
+        _error(400, f'cannot sort by {field}')
+    return present + missing
+
+def _list(rows, last_update):
+    offset, limit = _page()
+    rows = _sorted(list(rows), request.args.get('sort'))
+    fields = _fields()
+    return _respond({
+        'total': len(rows),
+        'offset': offset,
+        'limit': limit,
+        'last_update': last_update,
+        'stocks': [_project(row, fields) for row in rows[offset:offset + limit]]
+    })
+
+@api.route('/stocks')
+def stocks():
+    rows, _, last_update = stock_rows()
+    sectors = request.args.get('sector')
+    if sectors:
+        wanted = set(sectors.split(','))
+        rows = [row for row in rows if row.get('sector') in wanted]
+    return _list(rows, last_update)
+
+@api.route('/stocks/<sym>')
+def stock(sym):
+    symbol = _symbol(sym)
+    clean = symbol.replace('.JK', '')
+    snapshot = _snapshot(_stock_snapshots, clean, os.path.join(DATA_DIR, 'stocks', f'{clean}.json'),
+                         _parse_stock, (None, ([], [])))
+    data = snapshot.get()[1][0]
+    if data is None:
+        _error(404, f'no detail file for {symbol}')
+    fields = _fields()
+    if fields:
+        return _respond(_project_nested(data, fields))
+    # History has its own endpoint; leave it out unless asked for
+    return _respond({key: value for key, value in data.items() if key != 'historical'})
+
+@api.route('/stocks/<sym>/history')
+def history(sym):
+    symbol = _symbol(sym)
+    clean = symbol.replace('.JK', '')
+    interval = request.args.get('interval', '1d')
+    if interval not in INTERVALS:
+        _error(400, f"interval must be one of {', '.join(INTERVALS)}")
+    points = request.args.get('points')
+    if points is not None:
+        try:
+            points = int(points)
+        except ValueError:
+            points = 0
+        if not 3 <= points <= MAX_LIMIT:
+            _error(400, f'points must be between 3 and {MAX_LIMIT}')
+
+    daily = _snapshot(_daily_snapshots, clean, os.path.join(DATA_DIR, 'historicals', f'{clean}_daily.json'),
+                      _parse_bars, ([], []))
+    if interval == '1d':
+        dates, bars = daily.get()[1]
+    elif interval == '1wk':
+        # The exported weekly series covers the whole stored history; fall back to the daily export
+        weekly = _snapshot(_weekly_snapshots, clean, os.path.join(DATA_DIR, 'historicals', f'{clean}_weekly.json'),
+                           _parse_bars, None)
+        dates, bars = weekly.get()[1] or daily.memo('1wk', lambda parsed: _parse_bars(resample_records(parsed[1], '1wk')))
+    else:
+        snapshot = _snapshot(_stock_snapshots, clean, os.path.join(DATA_DIR, 'stocks', f'{clean}.json'),
+                             _parse_stock, (None, ([], [])))
+        dates, bars = snapshot.get()[1][1]
+
+    start, end = _date('start'), _date('end')
+    first = bisect_left(dates, start) if start else 0
+    last = bisect_right(dates, end) if end else len(dates)
+    selected = bars[first:last]
+    if points:
+        selected = lttb_records(selected, points)
+    offset, limit = _page()
+    page = selected[offset:offset + limit]
+    fields = _fields()
+    if fields and 'Date' not in fields:
+        fields = ['Date'] + fields
+
+    payload = {'symbol': symbol, 'interval': interval, 'total': len(selected), 'offset': offset, 'limit': limit}
+    if request.args.get('format') == 'columns':
+        columns = fields or (list(page[0]) if page else ['Date'])
+        payload['columns'] = {column: [bar.get(column) for bar in page] for column in columns}
+    else:
+        payload['bars'] = [_project(bar, fields) for bar in page]
+    return _respond(payload)
+
+@api.route('/screener')
+def screener():
+    """Rows matching every predicate, e.g. ?pe_max=15&roe_min=0.15&sector=Financials,Energy
+
+    Numeric fields take <field>_min / <field>_max (inclusive); text fields such as
+    sector or industry, and index membership tags (tag=LQ45), take <field>=a,b.
+    sort= must name a numeric field.
+    """
+    engine, last_update = screener_index()
+    predicates = {}
+    for name, value in request.args.items():
+        if name in ('fields', 'sort', 'offset', 'limit'):
+            continue
+        if name in engine.categories:
+            predicates[name] = value.split(',')
+            continue
+        field, _, side = name.rpartition('_')
+        if side not in ('min', 'max') or field not in engine.numeric:
+            _error(400, f'unknown filter {name}')
+        try:
+            bound = float(value)
+        except ValueError:
+            _error(400, f'{name} must be a number')
+        low, high = predicates.get(field, (None, None))
+        predicates[field] = (bound, high) if side == 'min' else (low, bound)
+
+    sort = request.args.get('sort')
+    if sort and sort.lstrip('-') not in engine.numeric:
+        _error(400, f"cannot sort by {sort.lstrip('-')}")
+    offset, limit = _page()
+    indices = engine.ordered(engine.match(predicates), sort)
+    return _respond({
+        'total': len(indices),
+        'offset': offset,
+        'limit': limit,
+        'last_update': last_update,
+        'stocks': engine.rows(indices[offset:offset + limit], _fields())
+    })
+
+@api.route('/categories/<dimension>')
+def categories(dimension):
+    """Symbols per value of `dimension`, limited by other dimensions, e.g. /api/categories/sector?tag=LQ45"""
+    index = category_index()
+    if dimension not in index.bitsets:
+        _error(404, f'unknown dimension {dimension}')
+    filters = {name: value.split(',') for name, value in request.args.items()}
+    unknown = [name for name in filters if name not in index.bitsets]
+    if unknown:
+        _error(400, f"unknown dimension {', '.join(unknown)}")
+    within = index.select(**filters) if filters else None
+    groups = index.group(dimension, within)
+    return _respond({
+        'dimension': dimension,
+        'counts': {value: len(symbols) for value, symbols in groups.items()},
+        'groups': groups
+    })
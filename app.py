@@ -1,25 +1,149 @@
-from flask import Flask, render_template
-import json
+import mimetypes
 import os
-from datetime import datetime
+import sys
+import threading
+from flask import Flask, abort, render_template, request, send_file
+from werkzeug.utils import safe_join
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, 'scripts'))
+from api import api
+from snapshots import FileSnapshot
+from leaders import compute_leaders
+from screener import build_table
+from precompress import ENCODINGS, MIN_BYTES, write_sidecars
+import serializer
 
 app = Flask(__name__)
+app.register_blueprint(api)
+
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+STATIC_DATA_DIR = os.path.join(BASE_DIR, 'static', 'data')
+STOCKS_FILE = os.path.join(STATIC_DATA_DIR, 'stocks.json')
+MANIFEST_FILE = os.path.join(DATA_DIR, 'manifest.json')
+LEADERS_FILE = os.path.join(DATA_DIR, 'leaders.json')
+# Entries per movers board on the dashboard page
+MOVERS = 5
+# Content-Encoding and sidecar suffix written by scripts/precompress.py, in order of preference
+SIDECARS = (('br', '.br'), ('gzip', '.gz'))
+# A URL versioned with the file's hash (?v=<hash>) always names the same bytes
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def _parse_stocks(data):
+    return tuple(data.get('stocks', [])), data.get('last_update', 'Never')
+
+manifest_snapshot = FileSnapshot(MANIFEST_FILE, lambda data: data.get('files', {}), default={})
+stocks_snapshot = FileSnapshot(STOCKS_FILE, _parse_stocks, default=((), 'Never'))
+leaders_snapshot = FileSnapshot(LEADERS_FILE, lambda data: data.get('boards', {}), default=None)
+
+def manifest_files():
+    """Per-file {'hash', 'bytes', 'changedAt'} from data/manifest.json"""
+    return manifest_snapshot.get()[1]
+
+# path -> ((mtime, inode, size, manifest hash), whether the file still has that hash)
+_entry_checks = {}
+_entry_checks_lock = threading.Lock()
+
+def manifest_entry(path):
+    """The manifest entry for `path`, or None if there is none or the file no longer matches it
+
+    A file rewritten without going through the manifest would otherwise keep its old
+    hash as ETag. Each version of a file is hashed once.
+    """
+    entry = manifest_files().get(os.path.relpath(path, BASE_DIR).replace(os.sep, '/'))
+    if entry is None:
+        return None
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_ino, st.st_size, entry['hash'])
+    with _entry_checks_lock:
+        checked = _entry_checks.get(path)
+    if checked is None or checked[0] != key:
+        try:
+            current = st.st_size == entry['bytes'] and serializer.content_hash(serializer.load(path)) == entry['hash']
+        except (OSError, ValueError):
+            current = False
+        checked = (key, current)
+        with _entry_checks_lock:
+            _entry_checks[path] = checked
+    return entry if checked[1] else None
+
+_sidecars_lock = threading.Lock()
+
+def _sidecars_current(path):
+    mtime = os.path.getmtime(path)
+    return all(os.path.isfile(path + suffix) and os.path.getmtime(path + suffix) >= mtime
+               for suffix in ENCODINGS.values())
+
+def ensure_sidecars(path):
+    """Write the .br/.gz copies of `path` when they are missing or older than it
+
+    Sidecars are gitignored, so a fresh checkout builds each one on first request.
+    """
+    if os.path.getsize(path) < MIN_BYTES or _sidecars_current(path):
+        return
+    with _sidecars_lock:
+        if not _sidecars_current(path):
+            write_sidecars(path)
+
+def send_precompressed(folder, filename):
+    """Send a data file, or its .br/.gz sidecar when the client accepts that encoding
+
+    Files whose manifest entry matches them get their content hash as ETag (answering
+    If-None-Match with 304) and are cacheable for good when requested as ?v=<hash>;
+    others fall back to Flask's file-based ETag.
+    """
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    entry = manifest_entry(path)
+    if any(request.accept_encodings[encoding] for encoding, _ in SIDECARS):
+        ensure_sidecars(path)
+    for encoding, suffix in SIDECARS:
+        sidecar = path + suffix
+        # An older sidecar belongs to a previous version of the file
+        if (request.accept_encodings[encoding] and os.path.isfile(sidecar)
+                and os.path.getmtime(sidecar) >= os.path.getmtime(path)):
+            response = send_file(sidecar, mimetype=mimetype, etag=entry is None, conditional=entry is None)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        encoding = None
+        response = send_file(path, mimetype=mimetype, etag=entry is None, conditional=entry is None)
+    response.vary.add('Accept-Encoding')
+
+    if entry is not None:
+        # Each encoding is a different representation, so it gets its own tag
+        response.set_etag(entry['hash'] + (f'-{encoding}' if encoding else ''))
+        if request.args.get('v') == entry['hash']:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        response.make_conditional(request)
+    return response
+
+@app.route('/data/<path:filename>')
+def serve_data(filename):
+    return send_precompressed(DATA_DIR, filename)
+
+@app.route('/static/data/<path:filename>')
+def serve_static_data(filename):
+    return send_precompressed(STATIC_DATA_DIR, filename)
+
+def _render_index(snapshot, boards):
+    stocks, last_update = snapshot
+    if boards is None:
+        # No pipeline leaderboards yet; select them from stocks.json instead
+        boards = compute_leaders(build_table(stocks), MOVERS)['boards']
+    movers = {board: boards.get(board, [])[:MOVERS] for board in ('gainers', 'losers', 'active')}
+    return render_template('index.html', stocks=stocks, last_update=last_update, movers=movers)
 
 @app.route('/')
 def index():
-    # Load stock data from JSON file
-    data_file = os.path.join('static', 'data', 'stocks.json')
-    
-    stocks = []
-    last_update = "Never"
-    
-    if os.path.exists(data_file):
-        with open(data_file, 'r') as f:
-            data = json.load(f)
-            stocks = data.get('stocks', [])
-            last_update = data.get('last_update', 'Never')
-    
-    return render_template('index.html', stocks=stocks, last_update=last_update)
+    # Rendered once per version of stocks.json and leaders.json
+    leaders_version, boards = leaders_snapshot.get()
+    return stocks_snapshot.memo('index.html', lambda snapshot: _render_index(snapshot, boards), leaders_version)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
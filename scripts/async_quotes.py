@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+asyncio quote snapshots from the Yahoo v8 chart endpoint
+Fetches many symbols concurrently with a semaphore-bounded number of requests in
+flight, a token bucket per host and a global deadline after which unfinished
+fetches are cancelled.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from rate_limiter import TokenBucket
+
+YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart'
+QUOTE_PARAMS = {'range': '5d', 'interval': '1d'}
+# Quotes older than this are treated as missing, as in the serial scraper
+MAX_QUOTE_AGE = timedelta(days=2)
+
+def parse_chart_quote(symbol: str, data: Dict) -> Optional[Dict]:
+    """Turn a v8 chart response into the stock snapshot fields; None if stale or incomplete"""
+    result = (data.get('chart', {}).get('result') or [{}])[0]
+    meta = result.get('meta', {})
+
+    # Check if data is fresh (within last 2 days)
+    market_time = meta.get('regularMarketTime')
+    if market_time:
+        data_date = datetime.fromtimestamp(market_time)
+        if datetime.now() - data_date > MAX_QUOTE_AGE:
+            print(f"  WARNING: {symbol} data is {datetime.now() - data_date} old!")
+            return None
+
+    current_price = meta.get('regularMarketPrice', 0)
+    previous_close = meta.get('previousClose', 0)
+    if not (current_price and previous_close):
+        return None
+
+    change = current_price - previous_close
+    change_percent = (change / previous_close * 100) if previous_close else 0
+    return {
+        'price': round(current_price, 2),
+        'change': round(change, 2),
+        'changePercent': round(change_percent, 2),
+        'volume': meta.get('regularMarketVolume', 0),
+        'dayHigh': meta.get('regularMarketDayHigh', 0),
+        'dayLow': meta.get('regularMarketDayLow', 0),
+        'marketCap': 0,  # Not available in this API
+        'fiftyTwoWeekHigh': 0,
+        'fiftyTwoWeekLow': 0,
+        'lastUpdate': data_date.strftime('%Y-%m-%d %H:%M:%S') if market_time else 'Unknown'
+    }
+
+def chart_meta(symbol: str, data: Dict) -> Optional[Dict]:
+    """The quote `meta` block of a v8 chart response, whatever its age; None without a price
+
+    Responses for multi-day ranges only carry `chartPreviousClose` (the close before
+    the range), so a missing `previousClose` is taken from the last daily close
+    before the quote's trading day.
+    """
+    result = (data.get('chart', {}).get('result') or [{}])[0]
+    meta = dict(result.get('meta') or {})
+    if not meta.get('regularMarketPrice'):
+        return None
+    if not meta.get('previousClose') and meta.get('regularMarketTime'):
+        offset = meta.get('gmtoffset') or 0
+        day = (meta['regularMarketTime'] + offset) // 86400
+        closes = ((result.get('indicators') or {}).get('quote') or [{}])[0].get('close') or []
+        earlier = [close for stamp, close in zip(result.get('timestamp') or [], closes)
+                   if close is not None and (stamp + offset) // 86400 < day]
+        if earlier:
+            meta['previousClose'] = earlier[-1]
+    return meta
+
+def _open_session(concurrency: int, timeout: float):
+    """curl_cffi's AsyncSession (installed with yfinance); None falls back to the pooled transport"""
+    try:
+        from curl_cffi.requests import AsyncSession
+    except ImportError:
+        return None
+    return AsyncSession(max_clients=concurrency, timeout=timeout)
+
+async def _get_json(session, url: str, timeout: float) -> Dict:
+    if session is None:
+        from http_transport import get_transport
+        # Blocking transport in worker threads: concurrent, but not cancellable mid-request
+        return await asyncio.to_thread(get_transport().get_json, url, params=QUOTE_PARAMS, budget=timeout)
+
+    response = await session.get(url, params=QUOTE_PARAMS, headers={'Accept': 'application/json'})
+    response.raise_for_status()
+    return response.json()
+
+async def fetch_quotes_async(symbols: List[str], concurrency: int = 16, rate: float = None,
+                             deadline: float = 30.0, timeout: float = 10.0,
+                             base_url: str = YAHOO_CHART_URL,
+                             parse: Callable[[str, Dict], Optional[Dict]] = parse_chart_quote) -> Dict:
+    """Fetch quote snapshots for `symbols`; returns {'quotes', 'errors', 'cancelled', 'elapsed'}
+
+    At most `concurrency` requests are in flight, each host is limited to `rate`
+    requests per second (unlimited when None), and whatever has not finished
+    `deadline` seconds after the start is cancelled and reported. `parse` turns a
+    chart response into the per-symbol value (`chart_meta` for the raw meta).
+    """
+    started = time.monotonic()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiters = {}
+    quotes, errors = {}, {}
+
+    async def fetch(session, symbol: str):
+        url = f"{base_url}/{symbol}"
+        host = urlparse(url).netloc
+        if rate and host not in limiters:
+            limiters[host] = TokenBucket(rate, capacity=concurrency)
+        async with semaphore:
+            if rate:
+                await limiters[host].acquire_async()
+            try:
+                quote = parse(symbol, await _get_json(session, url, timeout))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors[symbol] = str(e)
+                return
+        if quote:
+            quotes[symbol] = quote
+        else:
+            errors[symbol] = 'stale or incomplete quote'
+
+    session = _open_session(concurrency, timeout)
+    try:
+        tasks = {asyncio.ensure_future(fetch(session, symbol)): symbol for symbol in symbols}
+        done, pending = await asyncio.wait(tasks, timeout=deadline) if tasks else (set(), set())
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        if session is not None:
+            await session.close()
+
+    return {
+        'quotes': quotes,
+        'errors': errors,
+        'cancelled': sorted(tasks[task] for task in pending),
+        'elapsed': time.monotonic() - started
+    }
+
+def fetch_quotes(symbols: List[str], **kwargs) -> Dict:
+    """Synchronous entry point for `fetch_quotes_async`"""
+    return asyncio.run(fetch_quotes_async(symbols, **kwargs))
+
+def report(result: Dict, total: int) -> str:
+    return (f"Async quotes: {len(result['quotes'])}/{total} in {result['elapsed']:.2f}s "
+            f"({len(result['errors'])} failed, {len(result['cancelled'])} cancelled at deadline)")
+
+def benchmark(symbols: int = 500, concurrency: int = 32, rate: float = None, latency: float = 0.05,
+              deadline: float = 30.0):
+    """Fetch `symbols` quotes from the local stub, async versus one at a time"""
+    from http_fixture import ChartStubServer, synthetic_chart
+    from http_transport import Transport
+
+    names = [f'SYM{i:04d}.JK' for i in range(symbols)]
+    # Warm the stub's path cache so the benchmark measures the client, not the generator
+    now = int(time.time())
+    for symbol in names:
+        synthetic_chart(symbol, now - 5 * 86400, now)
+
+    with ChartStubServer(latency=latency) as server:
+        base_url = f"{server.base_url}/v8/finance/chart"
+        result = fetch_quotes(names, concurrency=concurrency, rate=rate, deadline=deadline, base_url=base_url)
+
+        # Serial baseline on a sample (without the old 0.5s sleep), extrapolated
+        sample = names[:min(20, symbols)]
+        transport = Transport()
+        started = time.perf_counter()
+        for symbol in sample:
+            parse_chart_quote(symbol, transport.get_json(f"{base_url}/{symbol}", params=QUOTE_PARAMS))
+        serial = (time.perf_counter() - started) / len(sample) * symbols
+        transport.close()
+
+    print(f"{symbols} symbols, {latency * 1000:.0f} ms stub latency, concurrency {concurrency}, rate {rate or 'unlimited'}")
+    print(f"  {report(result, symbols)}")
+    print(f"  serial (estimated): {serial:.2f}s, plus {symbols * 0.5:.0f}s of sleeps in scrape_stocks")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['fetch', 'benchmark'])
+    parser.add_argument('--symbols', type=int, default=500, help='benchmark universe size')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rate', type=float, default=None, help='requests per second per host')
+    parser.add_argument('--deadline', type=float, default=30.0, help='seconds before unfinished fetches are cancelled')
+    parser.add_argument('--latency', type=float, default=0.05, help='benchmark stub latency in seconds')
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        benchmark(args.symbols, args.concurrency, args.rate, args.latency, args.deadline)
+    else:
+        from stock_symbols import INDONESIAN_STOCKS
+        names = [symbol for symbol, name in INDONESIAN_STOCKS]
+        result = fetch_quotes(names, concurrency=args.concurrency, rate=args.rate, deadline=args.deadline)
+        for symbol, quote in result['quotes'].items():
+            print(f"  {symbol}: {quote['price']} ({quote['changePercent']:+.2f}%)")
+        print(report(result, len(names)))
@@ -0,0 +1,116 @@
+"""
+Batched multi-ticker OHLCV download
+Fetches history for the whole symbol list in a few multi-symbol calls and
+hands each symbol a column slice of one shared frame
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from rate_limiter import TokenBucket
+
+HISTORY_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+Downloader = Callable[[List[str], datetime, datetime, str], pd.DataFrame]
+
+def yfinance_downloader(symbols: List[str], start: datetime, end: datetime, interval: str = '1d') -> pd.DataFrame:
+    """Download one batch through yfinance, returning (symbol, field) columns"""
+    import yfinance as yf
+
+    frame = yf.download(
+        symbols, start=start, end=end, interval=interval,
+        group_by='ticker', auto_adjust=True, actions=False,
+        threads=True, progress=False
+    )
+    if not isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = pd.MultiIndex.from_product([symbols[:1], frame.columns])
+    return frame
+
+def chart_to_frame(result: Dict) -> pd.DataFrame:
+    """Convert one Yahoo v8 chart `result` object into an OHLCV frame"""
+    timestamps = result.get('timestamp') or []
+    quote = ((result.get('indicators') or {}).get('quote') or [{}])[0]
+    index = pd.to_datetime(timestamps, unit='s').normalize()
+    return pd.DataFrame(
+        {field: np.asarray(quote.get(field.lower(), [None] * len(timestamps)), dtype=float) for field in HISTORY_FIELDS},
+        index=pd.DatetimeIndex(index, name='Date')
+    )
+
+def download_history(symbols: List[str], start: datetime, end: datetime, interval: str = '1d',
+                     batch_size: int = 50, downloader: Optional[Downloader] = None,
+                     limiter: Optional[TokenBucket] = None) -> pd.DataFrame:
+    """Fetch OHLCV for every symbol in batches into one wide (symbol, field) frame
+
+    The result is a single float64 block with each symbol's five columns adjacent,
+    so `slice_symbol` can hand out views instead of copies.
+    """
+    downloader = downloader or yfinance_downloader
+    frames = []
+
+    for i in range(0, len(symbols), batch_size):
+        batch = symbols[i:i + batch_size]
+        if limiter is not None:
+            limiter.acquire(len(batch))
+        try:
+            frame = downloader(batch, start, end, interval)
+        except Exception as e:
+            print(f"Batch history download failed for {batch[0]}..{batch[-1]}: {e}")
+            continue
+        if frame is not None and not frame.empty:
+            frames.append(frame)
+
+    columns = pd.MultiIndex.from_product([symbols, HISTORY_FIELDS], names=['Symbol', 'Field'])
+    if not frames:
+        return pd.DataFrame(columns=columns, dtype=float)
+
+    combined = pd.concat(frames, axis=1).reindex(columns=columns)
+    combined.index = pd.DatetimeIndex(combined.index, name='Date')
+    if combined.index.tz is not None:
+        combined.index = combined.index.tz_localize(None)
+    combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+    values = np.ascontiguousarray(combined.to_numpy(dtype=float))
+    return pd.DataFrame(values, index=combined.index, columns=columns, copy=False)
+
+def slice_symbol(history: pd.DataFrame, symbol: str, start: datetime = None) -> pd.DataFrame:
+    """Return `symbol`'s OHLCV rows from a `download_history` frame
+
+    Columns and the leading run of rows before listing are trimmed with
+    positional slices, so the result is a view on the shared block. Only
+    symbols with gaps inside their history (suspensions) pay for a copy.
+    """
+    symbols = history.columns.get_level_values(0)
+    if symbol not in symbols:
+        return pd.DataFrame(columns=HISTORY_FIELDS, dtype=float)
+
+    first_col = int(np.argmax(symbols == symbol))
+    frame = history.iloc[:, first_col:first_col + len(HISTORY_FIELDS)]
+    frame.columns = HISTORY_FIELDS
+
+    if start is not None:
+        frame = frame.iloc[frame.index.searchsorted(pd.Timestamp(start).normalize()):]
+
+    closes = frame['Close'].to_numpy()
+    valid = ~np.isnan(closes)
+    if not valid.any():
+        return frame.iloc[:0]
+
+    first, last = int(np.argmax(valid)), len(valid) - int(np.argmax(valid[::-1]))
+    frame = frame.iloc[first:last]
+    if not valid[first:last].all():
+        frame = frame[valid[first:last]]
+    return frame
+
+def resample_ohlc(daily: pd.DataFrame, rule: str = 'MS') -> pd.DataFrame:
+    """Aggregate daily bars to a coarser OHLCV bar (month start labels by default)"""
+    if daily.empty:
+        return daily
+
+    bars = daily.resample(rule).agg({
+        'Open': 'first',
+        'High': 'max',
+        'Low': 'min',
+        'Close': 'last',
+        'Volume': 'sum'
+    })
+    return bars.dropna(subset=['Close'])
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Load test for the Flask dashboard page: cached snapshot vs reading stocks.json per request
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as dashboard
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+def legacy_index(path: str):
+    """The original handler: open, parse and render on every request"""
+    stocks = []
+    last_update = "Never"
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+            stocks = data.get('stocks', [])
+            last_update = data.get('last_update', 'Never')
+    return dashboard._render_index((stocks, last_update), None)
+
+def synthetic_stocks(count: int) -> dict:
+    stocks = [{
+        'symbol': f'SYM{i:04d}.JK', 'name': f'Synthetic {i}', 'price': 1000.0 + i, 'change': (-1) ** i * 5.0,
+        'changePercent': (-1) ** i * 0.5, 'volume': 1_000_000 + i, 'dayHigh': 1010.0 + i, 'dayLow': 990.0 + i,
+        'marketCap': 1e12 + i, 'fiftyTwoWeekHigh': 1200.0 + i, 'fiftyTwoWeekLow': 800.0 + i, 'lastUpdate': '2024-01-01 16:00:00'
+    } for i in range(count)]
+    return {'stocks': stocks, 'last_update': '2024-01-01 16:00:00 WIB'}
+
+def load(url: str, clients: int, seconds: float) -> float:
+    """Requests per second from `clients` keep-alive clients hammering `url`"""
+    counts = [0] * clients
+    deadline = time.monotonic() + seconds
+
+    def client(slot: int):
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                session.get(url).raise_for_status()
+                counts[slot] += 1
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.monotonic() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stocks', type=int, default=900, help='stocks in the synthetic stocks.json')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0, help='duration of each run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'stocks.json')
+        with open(path, 'w') as f:
+            json.dump(synthetic_stocks(args.stocks), f)
+        dashboard.stocks_snapshot = dashboard.FileSnapshot(path, dashboard._parse_stocks, default=((), 'Never'))
+        # Movers come from the synthetic stocks on both pages
+        dashboard.leaders_snapshot = dashboard.FileSnapshot(os.path.join(folder, 'leaders.json'), default=None)
+        dashboard.app.add_url_rule('/legacy', 'legacy', lambda: legacy_index(path))
+
+        server = make_server('127.0.0.1', 0, dashboard.app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+        try:
+            assert requests.get(f'{base}/').text == requests.get(f'{base}/legacy').text, 'cached page differs'
+            print(f"{args.stocks} stocks ({os.path.getsize(path) / 1e3:.0f} KB), {args.clients} clients, {os.cpu_count()} CPUs")
+            before = load(f'{base}/legacy', args.clients, args.seconds)
+            print(f"  per-request read + render: {before:8.1f} req/s")
+            after = load(f'{base}/', args.clients, args.seconds)
+            print(f"  cached snapshot:           {after:8.1f} req/s  ({after / before:.1f}x)")
+
+            # A rewrite (atomic replace, as the scrapers do) is picked up on the next request
+            data = synthetic_stocks(args.stocks)
+            data['last_update'] = 'reloaded'
+            with open(f'{path}.tmp', 'w') as f:
+                json.dump(data, f)
+            os.replace(f'{path}.tmp', path)
+            print(f"  reload after replace: {'ok' if 'reloaded' in requests.get(f'{base}/').text else 'FAILED'}")
+        finally:
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
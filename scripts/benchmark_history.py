@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-ticker history calls against the batched history stage
+Runs entirely against the local chart stub in http_fixture.py
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+import requests
+from batch_history import chart_to_frame, download_history, slice_symbol
+from http_fixture import ChartStubServer, fixture_downloader
+
+def per_ticker_path(base_url: str, symbols, start_1y, start_5y, end):
+    """Two chart requests per symbol, like Ticker.history(1y daily) + Ticker.history(5y monthly)"""
+    session = requests.Session()
+    for symbol in symbols:
+        for start, interval in ((start_1y, '1d'), (start_5y, '1mo')):
+            response = session.get(f"{base_url}/v8/finance/chart/{symbol}", params={
+                'period1': int(start.timestamp()),
+                'period2': int(end.timestamp()),
+                'interval': interval
+            }, timeout=30)
+            chart_to_frame(response.json()['chart']['result'][0])
+
+def batch_path(base_url: str, symbols, start_1y, start_5y, end, batch_size: int):
+    """One multi-symbol request per batch for 1y daily and one for 5y monthly; each symbol is sliced from them"""
+    downloader = fixture_downloader(base_url)
+    daily = download_history(symbols, start_1y, end, batch_size=batch_size, downloader=downloader)
+    monthly = download_history(symbols, start_5y, end, interval='1mo', batch_size=batch_size, downloader=downloader)
+    for symbol in symbols:
+        slice_symbol(daily, symbol)
+        slice_symbol(monthly, symbol)
+
+def run(path, server, *args):
+    before = server.request_count
+    started = time.perf_counter()
+    path(server.base_url, *args)
+    return time.perf_counter() - started, server.request_count - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated round trip per request (s)')
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:04d}.JK" for i in range(args.symbols)]
+    end = datetime.now()
+    start_1y = end - timedelta(days=365)
+    start_5y = end - timedelta(days=365 * 5)
+
+    with ChartStubServer(latency=args.latency) as server:
+        ticker_time, ticker_requests = run(per_ticker_path, server, symbols, start_1y, start_5y, end)
+        batch_time, batch_requests = run(batch_path, server, symbols, start_1y, start_5y, end, args.batch_size)
+
+    print(f"{args.symbols} symbols, {args.latency * 1000:.0f} ms simulated latency")
+    print(f"  per-ticker: {ticker_requests:5d} requests  {ticker_time:7.2f}s")
+    print(f"  batched:    {batch_requests:5d} requests  {batch_time:7.2f}s  (batch size {args.batch_size})")
+    print(f"  speedup:    {ticker_time / batch_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cross-sectional indicator engine against the per-stock rolling version
+"""
+
+import argparse
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from indicators import TAIL_BARS, TECHNICAL_FIELDS, compute_technicals
+
+def rolling_technicals(close: pd.Series) -> dict:
+    """The original per-stock computation: full rolling series, then the last value"""
+    ma_20 = close.rolling(window=20).mean().iloc[-1] if len(close) >= 20 else None
+    ma_50 = close.rolling(window=50).mean().iloc[-1] if len(close) >= 50 else None
+    ma_200 = close.rolling(window=200).mean().iloc[-1] if len(close) >= 200 else None
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rsi = 100 - (100 / (1 + gain / loss)).iloc[-1] if len(close) >= 14 else None
+    current = close.iloc[-1]
+    perf = {name: ((current / close.iloc[-n]) - 1) * 100 if len(close) >= n else None
+            for name, n in (('perf_1d', 2), ('perf_1w', 5), ('perf_1m', 22), ('perf_3m', 66))}
+    year = close[close.index >= pd.Timestamp(year=datetime.now().year, month=1, day=1)]
+    perf_ytd = ((current / year.iloc[0]) - 1) * 100 if len(year) else None
+    values = {'ma_20': ma_20, 'ma_50': ma_50, 'ma_200': ma_200, 'rsi_14': rsi, **perf, 'perf_ytd': perf_ytd}
+    return {k: round(float(v), 2) if v and not np.isnan(v) else None for k, v in values.items()}
+
+def synthetic_panel(symbols: int, days: int, seed: int = 7) -> pd.DataFrame:
+    """Random-walk closes with some late listings and suspension gaps"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days)
+    values = rng.uniform(100, 20000, symbols) * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+    values = values.round(2)
+    listed = rng.choice(symbols, max(1, symbols // 10), replace=False)
+    listing_row = rng.integers(0, days - 1, len(listed))
+    values[:, listed] = np.where(np.arange(days)[:, None] < listing_row, np.nan, values[:, listed])
+    suspended = rng.choice(symbols, max(1, symbols // 10), replace=False)
+    # Half the suspensions sit inside the indicator tail, half start before it and end inside it
+    inside, across = suspended[::2], suspended[1::2]
+    values[-30:-25, inside] = np.nan
+    values[-(TAIL_BARS + 20):-(TAIL_BARS - 10), across] = np.nan
+    return pd.DataFrame(values, index=index, columns=[f'S{i:05d}.JK' for i in range(symbols)])
+
+def check(panel: pd.DataFrame, engine: dict, sample: int = 200):
+    """Compare the engine against the rolling version on a sample of symbols
+
+    Rolling sums and tail means differ in the last few ulps, which can flip a
+    value sitting on a rounding boundary by 0.01; anything beyond that counts.
+    """
+    mismatches = 0
+    # Suspended and late-listed columns first, so the sample always covers them
+    ragged = panel.columns[panel.isna().any().to_numpy()]
+    for symbol in list(ragged) + [symbol for symbol in panel.columns[:sample] if symbol not in set(ragged)]:
+        expected = rolling_technicals(panel[symbol].dropna())
+        for field in TECHNICAL_FIELDS:
+            a, b = expected[field], engine[symbol][field]
+            if (a is None) != (b is None) or (a is not None and abs(a - b) > 0.0100001):
+                mismatches += 1
+                print(f"  mismatch {symbol}.{field}: {a} != {b}")
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='20,900,5000')
+    parser.add_argument('--days', type=int, default=260)
+    args = parser.parse_args()
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        panel = synthetic_panel(size, args.days)
+
+        started = time.perf_counter()
+        engine = compute_technicals(panel)
+        engine_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for symbol in panel.columns:
+            rolling_technicals(panel[symbol].dropna())
+        rolling_time = time.perf_counter() - started
+
+        mismatches = check(panel, engine)
+        print(f"{size:5d} symbols: engine {engine_time * 1000:8.1f} ms ({size / engine_time:10.0f} sym/s)  "
+              f"per-stock {rolling_time * 1000:9.1f} ms ({size / rolling_time:8.0f} sym/s)  "
+              f"speedup {rolling_time / engine_time:6.1f}x  mismatches {mismatches}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark column-wise record formatting against the per-record loop it replaced
+"""
+
+import argparse
+import json
+import time
+import pandas as pd
+from batch_history import chart_to_frame
+from history_store import frame_to_records
+from http_fixture import synthetic_chart
+
+def loop_records(frame: pd.DataFrame) -> list:
+    """The original formatting: to_dict('records'), then strftime/round/int per field"""
+    records = frame.reset_index().to_dict('records') if not frame.empty else []
+    for record in records:
+        record['Date'] = record['Date'].strftime('%Y-%m-%d')
+        for field in ['Open', 'High', 'Low', 'Close']:
+            if field in record:
+                record[field] = round(record[field], 2)
+        if 'Volume' in record:
+            record['Volume'] = int(record['Volume'])
+    return records
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--years', type=int, default=5)
+    args = parser.parse_args()
+
+    end = int(time.time())
+    start = end - args.years * 365 * 86400
+    frames = [chart_to_frame(synthetic_chart(f'SYM{i:04d}.JK', start, end)) for i in range(args.symbols)]
+    # Unrounded prices exercise the rounding, like fresh yfinance bars
+    frames = [frame * [1.0001, 0.9999, 1.00003, 1.000007, 1] for frame in frames]
+    bars = sum(len(frame) for frame in frames)
+
+    started = time.perf_counter()
+    expected = [loop_records(frame) for frame in frames]
+    loop_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = [frame_to_records(frame) for frame in frames]
+    column_time = time.perf_counter() - started
+
+    identical = all(json.dumps(a) == json.dumps(b) for a, b in zip(expected, actual))
+    print(f"{args.symbols} symbols x {args.years}y daily ({bars} bars)")
+    print(f"  per-record loop: {loop_time * 1000:8.1f} ms")
+    print(f"  column-wise:     {column_time * 1000:8.1f} ms  speedup {loop_time / column_time:4.1f}x  "
+          f"identical JSON: {identical}")
+
+if __name__ == '__main__':
+    main()
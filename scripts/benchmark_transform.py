@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the transform/serialize stage of the enhanced scraper: 1 process vs N
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from batch_history import chart_to_frame, resample_ohlc
+from enhanced_scraper import JKT_TZ, STATEMENT_FIELDS, transform_all
+from http_fixture import synthetic_chart
+from indicators import TECHNICAL_FIELDS
+
+def synthetic_raws(symbols: int, years: int):
+    """`fetch_stock_data`-shaped payloads with stub bars and a realistic info dict"""
+    rng = np.random.default_rng(3)
+    end = int(time.time())
+    start = end - years * 365 * 86400
+    raws = []
+    for i in range(symbols):
+        symbol = f'SYM{i:04d}.JK'
+        daily = chart_to_frame(synthetic_chart(symbol, start, end))
+        price = float(daily['Close'].iloc[-1])
+        info = {
+            'longName': f'Synthetic {i}', 'currentPrice': price, 'previousClose': float(daily['Close'].iloc[-2]),
+            'volume': 1_000_000, 'marketCap': price * 1e9, 'sharesOutstanding': 1e9, 'trailingPE': float(rng.uniform(5, 40)),
+            'priceToBook': float('nan'), 'returnOnEquity': float(rng.uniform(0, 0.3)), 'dividendYield': 0.03,
+            'sector': 'Financials', 'industry': 'Banks', 'longBusinessSummary': 'Lorem ipsum ' * 80
+        }
+        raws.append({
+            'symbol': symbol,
+            'info': info,
+            'technicals': {field: round(float(rng.uniform(0, 100)), 2) for field in TECHNICAL_FIELDS},
+            'financials': {field: float(rng.uniform(1e9, 1e13)) for field in STATEMENT_FIELDS},
+            'hist_1y': daily,
+            'hist_5y': resample_ohlc(daily),
+            'lastUpdate': datetime.now(JKT_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+        })
+    return raws
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--years', type=int, default=5, help='daily bars per symbol')
+    parser.add_argument('--processes', default=f'1,{os.cpu_count() or 1}', help='comma-separated process counts')
+    args = parser.parse_args()
+
+    raws = synthetic_raws(args.symbols, args.years)
+    print(f"{args.symbols} symbols x {args.years}y daily bars, {os.cpu_count()} CPUs")
+    baseline = None
+    for processes in sorted({int(p) for p in args.processes.split(',')}):
+        with tempfile.TemporaryDirectory() as data_dir:
+            os.makedirs(os.path.join(data_dir, 'stocks'))
+            os.makedirs(os.path.join(data_dir, 'historicals'))
+            started = time.perf_counter()
+            summaries = transform_all(raws, data_dir, processes)
+            elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"  {processes:2d} process(es): {elapsed:7.2f}s  ({len(summaries) / elapsed:7.1f} symbols/s, "
+              f"speedup {baseline / elapsed:4.1f}x)")
+
+if __name__ == '__main__':
+    main()
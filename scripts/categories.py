@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Bitmap index of categorical fields: sector, industry and tags (index membership)
+Every symbol has a stable ordinal: its position in `symbols`. New symbols are appended
+and existing ones never move. Each (dimension, value) pair maps to a bitset over those
+ordinals, held as a Python int. A membership test is one bit test, and combining
+filters is `&` / `|` on the ints. data/categories.json stores each bitset as a hex
+string and replaces the per-sector lists of full stock records.
+
+    index.select(sector=['Financials'], tag=['LQ45'])   # bitset of LQ45 banks
+"""
+
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import serializer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATEGORIES_PATH = os.path.join(BASE_DIR, 'data', 'categories.json')
+
+# Row fields indexed as single-valued dimensions; 'tag' holds multi-valued labels
+FIELDS = ('sector', 'industry')
+
+class CategoryIndex:
+    """{dimension: {value: bitset}} over a stable symbol ordinal"""
+
+    def __init__(self, symbols: Sequence[str] = (), bitsets: Dict[str, Dict[str, int]] = None):
+        self.symbols = list(symbols)
+        self.ordinals = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.bitsets = bitsets or {}
+
+    def ordinal(self, symbol: str) -> int:
+        """The symbol's bit position, appending it when it is new"""
+        if symbol not in self.ordinals:
+            self.ordinals[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self.ordinals[symbol]
+
+    def add(self, dimension: str, value: str, symbol: str):
+        if value:
+            values = self.bitsets.setdefault(dimension, {})
+            values[value] = values.get(value, 0) | 1 << self.ordinal(symbol)
+
+    def members(self, dimension: str, value: str) -> int:
+        return self.bitsets.get(dimension, {}).get(value, 0)
+
+    def select(self, **filters: Iterable[str]) -> int:
+        """Symbols in any of the given values of every dimension, e.g. select(sector=['Energy'], tag=['LQ45'])"""
+        bits = (1 << len(self.symbols)) - 1
+        for dimension, values in filters.items():
+            union = 0
+            for value in values:
+                union |= self.members(dimension, value)
+            bits &= union
+        return bits
+
+    def decode(self, bits: int) -> List[str]:
+        """Symbols whose bits are set, in ordinal order"""
+        symbols = []
+        while bits:
+            low = bits & -bits
+            symbols.append(self.symbols[low.bit_length() - 1])
+            bits ^= low
+        return symbols
+
+    def mask(self, bits: int, symbols: Sequence[str]) -> np.ndarray:
+        """Bitset as a boolean array over another symbol order (e.g. the screener's rows)"""
+        return np.array([symbol in self.ordinals and bool(bits >> self.ordinals[symbol] & 1) for symbol in symbols])
+
+    def values(self, dimension: str) -> List[str]:
+        return sorted(self.bitsets.get(dimension, {}))
+
+    def counts(self, dimension: str, within: int = None) -> Dict[str, int]:
+        """Members per value, optionally only those also in the `within` bitset"""
+        return {value: (bits if within is None else bits & within).bit_count()
+                for value, bits in sorted(self.bitsets.get(dimension, {}).items())}
+
+    def group(self, dimension: str, within: int = None) -> Dict[str, List[str]]:
+        """Symbols per value, optionally only those also in the `within` bitset"""
+        groups = {}
+        for value, bits in sorted(self.bitsets.get(dimension, {}).items()):
+            selected = bits if within is None else bits & within
+            if selected:
+                groups[value] = self.decode(selected)
+        return groups
+
+    def to_dict(self, last_update: str = None) -> Dict:
+        return {
+            'last_update': last_update,
+            'symbols': self.symbols,
+            'categories': {dimension: {value: format(bits, 'x') for value, bits in sorted(values.items())}
+                           for dimension, values in sorted(self.bitsets.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CategoryIndex':
+        return cls(data.get('symbols', []), {dimension: {value: int(bits, 16) for value, bits in values.items()}
+                                             for dimension, values in data.get('categories', {}).items()})
+
+def build_index(rows: Iterable[Dict], tags: Dict[str, Sequence[str]] = None,
+                previous: Optional[CategoryIndex] = None) -> CategoryIndex:
+    """Index the sector and industry of `rows` plus `tags` ({tag: symbols}), keeping `previous` ordinals"""
+    index = CategoryIndex(previous.symbols if previous else ())
+    for row in rows:
+        index.ordinal(row['symbol'])
+        for field in FIELDS:
+            index.add(field, row.get(field), row['symbol'])
+    for tag, symbols in (tags or {}).items():
+        for symbol in symbols:
+            if symbol in index.ordinals:
+                index.add('tag', tag, symbol)
+    return index
+
+def load_index(path: str = CATEGORIES_PATH) -> Optional[CategoryIndex]:
+    try:
+        return CategoryIndex.from_dict(serializer.load(path))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Discarding unreadable category index {path}: {e}")
+        return None
+
+def benchmark(symbols: int = 5000, repeat: int = 1000):
+    """Time a sector-and-tag intersection against filtering row dicts"""
+    sectors = ['Financials', 'Energy', 'Consumer', 'Materials', 'Industrials', 'Technology']
+    rows = [{'symbol': f'SYM{i:04d}.JK', 'sector': sectors[i % len(sectors)], 'industry': f'Industry {i % 40}'}
+            for i in range(symbols)]
+    lq45 = [row['symbol'] for row in rows[::100]]
+    index = build_index(rows, {'LQ45': lq45})
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        bits = index.select(sector=['Financials', 'Energy'], tag=['LQ45'])
+    bitmap_time = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat // 10):
+        members = set(lq45)
+        scanned = [row['symbol'] for row in rows if row['sector'] in ('Financials', 'Energy') and row['symbol'] in members]
+    scan_time = (time.perf_counter() - started) / (repeat // 10)
+
+    assert index.decode(bits) == scanned
+    artifact = serializer.dumps(index.to_dict())
+    print(f"{symbols} symbols, {len(scanned)} matches, artifact {len(artifact) / 1e3:.1f} KB")
+    print(f"  row scan: {scan_time * 1e6:8.1f} us/query")
+    print(f"  bitmap:   {bitmap_time * 1e6:8.1f} us/query  ({scan_time / bitmap_time:.1f}x)")
+
+if __name__ == '__main__':
+    import argparse
+    from manifest import publish
+    from stock_symbols import INDEX_MEMBERS
+    from screener import rows_from_files
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['build', 'benchmark'])
+    parser.add_argument('--path', default=CATEGORIES_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        rows, last_update = rows_from_files(os.path.dirname(args.path))
+        index = build_index(rows, INDEX_MEMBERS, load_index(args.path))
+        publish(index.to_dict(last_update), args.path)
+        print(f"Wrote {args.path}: {len(index.symbols)} symbols, "
+              + ', '.join(f"{len(values)} {dimension} values" for dimension, values in index.bitsets.items()))
+    else:
+        benchmark()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Correlation and beta across the symbol universe
+Builds a (days x symbols) float32 matrix of daily log returns from the stored
+histories. Pairwise correlation over the trailing window comes from blocked
+matrix products: one stripe of rows at a time, sized to a memory budget, so
+the full symbols x symbols matrix is never held at once. Beta is measured
+against a market-cap weighted composite of the same universe, now and as a
+rolling series. data/correlation.json keeps, per symbol, its beta, its average
+correlation and its most and least correlated peers.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import serializer
+from history_store import DATA_DIR, json_path, load_daily, records_to_frame, stored_symbols
+
+CORRELATION_PATH = os.path.join(DATA_DIR, 'correlation.json')
+
+# Trading days in the correlation window and in each beta estimate
+CORRELATION_WINDOW = 60
+BETA_WINDOW = 250
+# A symbol (or pair) needs returns on this share of the window's days
+MIN_COVERAGE = 0.8
+# Rolling beta is reported every BETA_STEP trading days over the last BETA_WINDOW
+BETA_STEP = 21
+PEERS = 5
+MEMORY_BUDGET_MB = 64
+
+def history_symbols(data_dir: str = DATA_DIR) -> List[str]:
+    """Symbols with a columnar store or an exported daily JSON file"""
+    folder = os.path.join(data_dir, 'historicals')
+    exported = {f'{name[:-len("_daily.json")]}.JK' for name in os.listdir(folder) if name.endswith('_daily.json')}
+    return sorted(exported.union(stored_symbols(data_dir)))
+
+def load_closes(symbol: str, data_dir: str = DATA_DIR) -> pd.Series:
+    daily = load_daily(symbol, data_dir)
+    if daily.empty and os.path.exists(json_path(symbol, data_dir)):
+        daily = records_to_frame(serializer.load(json_path(symbol, data_dir)))
+    return daily['Close'].astype(float)
+
+def returns_matrix(closes: Dict[str, pd.Series], days: int = None) -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+    """(dates, symbols, float32 log returns) on the union of trading days; NaN where a symbol has no bar"""
+    frame = pd.concat(closes, axis=1, sort=True)
+    if days is not None:
+        frame = frame.iloc[-(days + 1):]
+    prices = frame.to_numpy(dtype=np.float64)
+    prices[~(prices > 0)] = np.nan
+    returns = np.diff(np.log(prices), axis=0).astype(np.float32)
+    return frame.index[1:], list(frame.columns), returns
+
+def composite_returns(returns: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted mean return per day over the symbols that traded, renormalizing the weights"""
+    valid = ~np.isnan(returns)
+    total = valid.astype(np.float32) @ weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, np.nan_to_num(returns) @ weights / total, np.nan)
+
+def _standardize(window: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-symbol z-scores over its own valid days (0 elsewhere) and the float32 validity mask"""
+    valid = ~np.isnan(window)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, window, 0).astype(np.float32)
+    mean = filled.sum(axis=0) / np.maximum(count, 1)
+    centered = np.where(valid, window - mean, 0).astype(np.float32)
+    std = np.sqrt((centered ** 2).sum(axis=0) / np.maximum(count, 1))
+    thin = (count < MIN_COVERAGE * len(window)) | (std == 0)
+    std[thin] = np.inf
+    valid[:, thin] = False
+    return centered / std, valid.astype(np.float32)
+
+def stripe_rows(symbols: int, window: int, memory_mb: float) -> int:
+    """Rows per stripe so the products and temporaries of one stripe fit in `memory_mb`"""
+    # Two float32 products (sums and pair counts) plus about as much again in temporaries
+    per_row = 4 * symbols * 4 + 2 * 4 * window
+    return max(1, min(symbols, int(memory_mb * 2 ** 20 // per_row)))
+
+def correlation_stripes(returns: np.ndarray, memory_mb: float = MEMORY_BUDGET_MB):
+    """Yield (start, stripe) for rows start..start+len(stripe) of the pairwise correlation matrix
+
+    Each pair is scored over the days both symbols traded, using each symbol's own mean and
+    deviation; without gaps this is exactly Pearson's r. Pairs with too few common days are
+    NaN, as is the diagonal.
+    """
+    z, valid = _standardize(returns)
+    window, symbols = z.shape
+    rows = stripe_rows(symbols, window, memory_mb)
+    for start in range(0, symbols, rows):
+        stop = min(start + rows, symbols)
+        sums = z[:, start:stop].T @ z
+        pairs = valid[:, start:stop].T @ valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stripe = np.clip(sums / pairs, -1, 1)
+        stripe[pairs < MIN_COVERAGE * window] = np.nan
+        stripe[np.arange(stop - start), np.arange(start, stop)] = np.nan
+        yield start, stripe
+
+def _extremes(stripe: np.ndarray, k: int, largest: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Column positions of the k largest (or smallest) values per row, best first, with NaN pushed out"""
+    keys = np.where(np.isnan(stripe), np.inf, -stripe if largest else stripe)
+    k = min(k, keys.shape[1])
+    picked = np.argpartition(keys, k - 1, axis=1)[:, :k] if k < keys.shape[1] else np.argsort(keys, axis=1)
+    order = np.take_along_axis(keys, picked, axis=1).argsort(axis=1, kind='stable')
+    picked = np.take_along_axis(picked, order, axis=1)
+    return picked, np.take_along_axis(stripe, picked, axis=1)
+
+def rolling_beta(returns: np.ndarray, market: np.ndarray, window: int = BETA_WINDOW) -> np.ndarray:
+    """(days x symbols) beta of each symbol against `market` over the trailing `window` days"""
+    frame = pd.DataFrame(returns, dtype=np.float64)
+    index = pd.Series(market, dtype=np.float64)
+    minimum = int(MIN_COVERAGE * window)
+    covariance = frame.rolling(window, min_periods=minimum).cov(index)
+    variance = index.rolling(window, min_periods=minimum).var()
+    return covariance.div(variance, axis=0).to_numpy()
+
+def _round(values, digits: int = 3) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+def compute(closes: Dict[str, pd.Series], market_caps: Dict[str, float] = None, window: int = CORRELATION_WINDOW,
+            beta_window: int = BETA_WINDOW, peers: int = PEERS, memory_mb: float = MEMORY_BUDGET_MB) -> Dict:
+    """The correlation artifact for `closes` ({symbol: Close series})"""
+    dates, symbols, returns = returns_matrix(closes, 2 * beta_window)
+    caps = np.array([(market_caps or {}).get(symbol) or 0 for symbol in symbols], dtype=np.float32)
+    weights = caps if caps.sum() > 0 else np.ones(len(symbols), dtype=np.float32)
+    market = composite_returns(returns, weights)
+
+    most, most_corr, least, least_corr = [], [], [], []
+    average = np.full(len(symbols), np.nan)
+    for start, stripe in correlation_stripes(returns[-window:], memory_mb):
+        for picked, values, positions, correlations in ((most, most_corr, *_extremes(stripe, peers, True)),
+                                                         (least, least_corr, *_extremes(stripe, peers, False))):
+            for row_positions, row_values in zip(positions, correlations):
+                keep = ~np.isnan(row_values)
+                picked.append(row_positions[keep].tolist())
+                values.append(_round(row_values[keep], 2))
+        with np.errstate(invalid='ignore'):
+            counts = (~np.isnan(stripe)).sum(axis=1)
+            average[start:start + len(stripe)] = np.where(counts > 0, np.nansum(stripe, axis=1) / np.maximum(counts, 1), np.nan)
+
+    betas = rolling_beta(returns, market, beta_window)
+    steps = np.arange(len(dates) - 1, max(len(dates) - 1 - beta_window, -1), -BETA_STEP)[::-1]
+    return {
+        'as_of': dates[-1].strftime('%Y-%m-%d') if len(dates) else None,
+        'window': window,
+        'beta_window': beta_window,
+        'symbols': symbols,
+        'beta': _round(betas[-1]) if len(dates) else [None] * len(symbols),
+        'avg_corr': _round(average),
+        'peers': {'most': most, 'most_corr': most_corr, 'least': least, 'least_corr': least_corr},
+        'beta_series': {
+            'dates': [dates[i].strftime('%Y-%m-%d') for i in steps],
+            'values': [_round(betas[steps, i], 2) for i in range(len(symbols))]
+        }
+    }
+
+def build(data_dir: str = DATA_DIR, market_caps: Dict[str, float] = None, **kwargs) -> Dict:
+    """Correlation artifact over every symbol with stored history in `data_dir`"""
+    closes = {}
+    for symbol in history_symbols(data_dir):
+        series = load_closes(symbol, data_dir)
+        if len(series) > 1:
+            closes[symbol] = series
+    if not closes:
+        return {'as_of': None, 'symbols': []}
+    return compute(closes, market_caps, **kwargs)
+
+def benchmark(symbols: int = 900, days: int = 1250, memory_mb: float = MEMORY_BUDGET_MB):
+    """Time the full pipeline on a synthetic one-factor universe"""
+    rng = np.random.default_rng(17)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+    market = rng.normal(0, 0.01, days)
+    loadings = rng.uniform(0.3, 1.6, symbols)
+    returns = market[:, None] * loadings + rng.normal(0, 0.015, (days, symbols))
+    returns[rng.random((days, symbols)) < 0.02] = np.nan
+    closes = {f'SYM{i:04d}.JK': pd.Series(1000 * np.exp(np.nancumsum(returns[:, i])), index=dates)
+              for i in range(symbols)}
+
+    started = time.perf_counter()
+    _, _, matrix = returns_matrix(closes)
+    count = sum(len(stripe) for _, stripe in correlation_stripes(matrix[-CORRELATION_WINDOW:], memory_mb))
+    stripes_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    artifact = compute(closes, memory_mb=memory_mb)
+    total_time = time.perf_counter() - started
+
+    error = np.nanmean(np.abs(np.array(artifact['beta'], dtype=float) - loadings))
+    rows = stripe_rows(symbols, CORRELATION_WINDOW, memory_mb)
+    print(f"{symbols} symbols x {days} days, {memory_mb:g} MB budget ({rows} rows per stripe)")
+    print(f"  returns + {count}x{symbols} correlations: {stripes_time:.2f}s")
+    print(f"  full artifact (peers, rolling beta):  {total_time:.2f}s, {len(serializer.dumps(artifact)) / 1e3:.0f} KB")
+    print(f"  mean |beta - true loading|: {error:.3f}")
+
+if __name__ == '__main__':
+    import argparse
+    from manifest import publish
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['build', 'benchmark'])
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--memory-mb', type=float, default=MEMORY_BUDGET_MB, help='budget for one stripe of the matrix')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = serializer.load(os.path.join(args.data_dir, 'index.json'))
+        caps = {stock['symbol']: stock.get('marketCap') for stock in index.get('stocks', [])}
+        artifact = build(args.data_dir, caps, memory_mb=args.memory_mb)
+        path = os.path.join(args.data_dir, 'correlation.json')
+        publish(artifact, path, args.data_dir)
+        print(f"Wrote {path}: {len(artifact['symbols'])} symbols as of {artifact['as_of']}")
+    else:
+        benchmark(memory_mb=args.memory_mb)
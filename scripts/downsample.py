@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Downsampling for chart payloads
+OHLC-preserving resampling of daily bars to weekly (Monday labels) or monthly
+(month-start labels) bars, and Largest-Triangle-Three-Buckets point reduction
+for line charts. Works on the [{'Date', 'Open', ...}] records the browser reads
+and on Date-indexed frames from the columnar store.
+"""
+
+import os
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close']
+INTERVALS = ('1wk', '1mo')
+# Exported chart series never exceed this many bars (10 years of weeks)
+CHART_POINTS = 520
+
+def period_starts(days: np.ndarray, interval: str) -> np.ndarray:
+    """First day (days since 1970-01-01) of the week or month containing each day"""
+    if interval == '1wk':
+        # 1970-01-01 was a Thursday; step back to Monday
+        return days - (days + 3) % 7
+    if interval == '1mo':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype('int64')
+    raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+
+def resample_arrays(days: np.ndarray, columns: Dict[str, np.ndarray], interval: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Aggregate sorted daily bars: first Open, max High, min Low, last Close, summed Volume"""
+    if not len(days):
+        return days, columns
+    keys = period_starts(days, interval)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    bars = {
+        'Open': columns['Open'][starts],
+        'High': np.fmax.reduceat(columns['High'], starts),
+        'Low': np.fmin.reduceat(columns['Low'], starts),
+        'Close': columns['Close'][ends],
+        'Volume': np.add.reduceat(np.nan_to_num(columns['Volume']), starts)
+    }
+    return keys[starts], bars
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the `points` samples that best keep the shape of y(x); first and last always kept"""
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    # Bucket i spans [bounds[i], bounds[i + 1]); the last bound is the final point
+    bounds = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+    bounds = np.r_[bounds, n]
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = bounds[i], bounds[i + 1]
+        next_end = bounds[i + 2]
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Twice the triangle area between the last pick, each candidate and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def _record_columns(records: List[Dict]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    days = np.array([record['Date'] for record in records], dtype='datetime64[D]').astype('int64')
+    columns = {field: np.array([record.get(field) for record in records], dtype=float)
+               for field in PRICE_FIELDS + ['Volume']}
+    return days, columns
+
+def _to_records(days: np.ndarray, columns: Dict[str, np.ndarray]) -> List[Dict]:
+    dates = np.datetime_as_string(days.astype('datetime64[D]')).tolist()
+    values = {field: np.round(columns[field], 2).tolist() for field in PRICE_FIELDS}
+    volumes = columns['Volume'].astype('int64').tolist()
+    return [{'Date': date, **{field: values[field][i] for field in PRICE_FIELDS}, 'Volume': volumes[i]}
+            for i, date in enumerate(dates)]
+
+def resample_records(records: List[Dict], interval: str) -> List[Dict]:
+    """Daily records to weekly ('1wk') or monthly ('1mo') OHLCV records"""
+    if not records:
+        return []
+    return _to_records(*resample_arrays(*_record_columns(records), interval))
+
+def lttb_records(records: List[Dict], points: int, field: str = 'Close') -> List[Dict]:
+    """At most `points` of `records`, chosen by LTTB on `field` over time"""
+    if len(records) <= points:
+        return records
+    x = np.array([record['Date'] for record in records], dtype='datetime64[D]').astype(float)
+    y = np.array([record.get(field) for record in records], dtype=float)
+    keep = np.flatnonzero(~np.isnan(y))
+    return [records[keep[i]] for i in lttb_indices(x[keep], y[keep], points)]
+
+def chart_records(daily: pd.DataFrame, interval: str = '1wk', points: int = CHART_POINTS) -> List[Dict]:
+    """Bounded chart series from stored daily bars: resampled to `interval`, then LTTB down to `points`"""
+    if daily.empty:
+        return []
+    days = daily.index.values.astype('datetime64[D]').astype('int64')
+    columns = {field: daily[field].to_numpy(dtype=float) for field in PRICE_FIELDS + ['Volume']}
+    return lttb_records(_to_records(*resample_arrays(days, columns, interval)), points)
+
+def weekly_path(symbol: str, data_dir: str) -> str:
+    return os.path.join(data_dir, 'historicals', f"{symbol.replace('.JK', '')}_weekly.json")
+
+def benchmark(bars: int = 10000, points: int = 500):
+    """Time resampling and LTTB on a long synthetic daily series"""
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=bars)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    daily = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                          'Volume': rng.integers(1e5, 1e7, bars).astype(float)}, index=dates)
+    started = time.perf_counter()
+    weekly = chart_records(daily, '1wk', bars)
+    resample_time = time.perf_counter() - started
+    started = time.perf_counter()
+    reduced = lttb_records(weekly, points)
+    lttb_time = time.perf_counter() - started
+    print(f"{bars} daily bars -> {len(weekly)} weekly in {resample_time * 1000:.1f} ms -> "
+          f"{len(reduced)} LTTB points in {lttb_time * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    import argparse
+    from history_store import DATA_DIR, load_daily, stored_symbols
+    from manifest import Manifest, now_string
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['export', 'benchmark'])
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--points', type=int, default=CHART_POINTS, help='maximum bars per exported series')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        manifest = Manifest.for_data_dir(args.data_dir)
+        now = now_string()
+        for symbol in stored_symbols(args.data_dir):
+            records = chart_records(load_daily(symbol, args.data_dir), '1wk', args.points)
+            manifest.write(records, weekly_path(symbol, args.data_dir), now)
+            print(f"Exported {symbol}: {len(records)} weekly bars")
+        manifest.save(now)
+    else:
+        benchmark(points=args.points)
@@ -5,19 +5,45 @@ Collects fundamentals, technicals, historicals, and company info
 """
 
 import yfinance as yf
-import json
 import os
 from datetime import datetime, timedelta
 import pytz
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import argparse
 import time
 import numpy as np
 import pandas as pd
-from stock_symbols import INDONESIAN_STOCKS
+import serializer
+from stock_symbols import INDEX_MEMBERS, INDONESIAN_STOCKS
+from rate_limiter import TokenBucket
+from file_cache import FileCache
+from async_quotes import chart_meta, fetch_quotes, report
+from manifest import Manifest
+from batch_history import download_history, slice_symbol
+from indicators import compute_technicals
+from downsample import chart_records, weekly_path
+from screener import QUOTE_FIELDS, build_table
+from categories import build_index, load_index
+from leaders import compute_leaders
+import correlation
+from indicator_state import advance, load_state, rebuild, verify
+from history_store import (
+    DAILY_WINDOW_DAYS, empty_frame, frame_to_records, load_daily, load_stored, merge_bars, merge_monthly,
+    rebased, refetch_start, save_daily, window
+)
 
 # Jakarta timezone
 JKT_TZ = pytz.timezone('Asia/Jakarta')
 
+# Ticker.info fields that move with the price; the rest (profile, fundamentals) is cached
+PRICE_FIELDS = [
+    'currentPrice', 'previousClose', 'volume', 'dayHigh', 'dayLow', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow',
+    'marketCap', 'regularMarketTime', 'regularMarketPrice', 'regularMarketPreviousClose', 'regularMarketVolume',
+    'regularMarketDayHigh', 'regularMarketDayLow', 'regularMarketChange', 'regularMarketChangePercent',
+    'open', 'regularMarketOpen', 'bid', 'ask', 'bidSize', 'askSize'
+]
+
 def safe_get(data: Any, *keys, default=None):
     """Safely get nested dictionary values"""
     try:
@@ -39,168 +65,435 @@ def calculate_technical_indicators(hist_data: pd.DataFrame) -> Dict:
         return {}
     
     try:
-        close_prices = hist_data['Close']
-        
-        # Moving averages
-        ma_20 = close_prices.rolling(window=20).mean().iloc[-1] if len(close_prices) >= 20 else None
-        ma_50 = close_prices.rolling(window=50).mean().iloc[-1] if len(close_prices) >= 50 else None
-        ma_200 = close_prices.rolling(window=200).mean().iloc[-1] if len(close_prices) >= 200 else None
-        
-        # RSI (14 days)
-        delta = close_prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs)).iloc[-1] if len(close_prices) >= 14 else None
-        
-        # Price performance
-        current_price = close_prices.iloc[-1]
-        perf_1d = ((current_price / close_prices.iloc[-2]) - 1) * 100 if len(close_prices) >= 2 else None
-        perf_1w = ((current_price / close_prices.iloc[-5]) - 1) * 100 if len(close_prices) >= 5 else None
-        perf_1m = ((current_price / close_prices.iloc[-22]) - 1) * 100 if len(close_prices) >= 22 else None
-        perf_3m = ((current_price / close_prices.iloc[-66]) - 1) * 100 if len(close_prices) >= 66 else None
-        perf_ytd = ((current_price / close_prices[str(datetime.now().year):].iloc[0]) - 1) * 100 if str(datetime.now().year) in hist_data.index.astype(str) else None
-        
-        return {
-            'ma_20': round(ma_20, 2) if ma_20 else None,
-            'ma_50': round(ma_50, 2) if ma_50 else None,
-            'ma_200': round(ma_200, 2) if ma_200 else None,
-            'rsi_14': round(rsi, 2) if rsi and not np.isnan(rsi) else None,
-            'perf_1d': round(perf_1d, 2) if perf_1d else None,
-            'perf_1w': round(perf_1w, 2) if perf_1w else None,
-            'perf_1m': round(perf_1m, 2) if perf_1m else None,
-            'perf_3m': round(perf_3m, 2) if perf_3m else None,
-            'perf_ytd': round(perf_ytd, 2) if perf_ytd else None
-        }
+        return compute_technicals(hist_data[['Close']].rename(columns={'Close': 'close'}))['close']
     except Exception as e:
         print(f"Error calculating technical indicators: {e}")
         return {}
 
-def scrape_comprehensive_data(symbol: str) -> Dict:
-    """Scrape comprehensive data for a single stock"""
+def _throttle(limiter: Optional[TokenBucket]):
+    """Take one request token from the shared limiter, if any"""
+    if limiter is not None:
+        limiter.acquire()
+
+# A quote whose last trade is older than this (a long weekend plus a holiday) is marked stale
+QUOTE_MAX_AGE = timedelta(days=4)
+
+def quote_from_meta(meta: Dict, profile: Dict) -> Dict:
+    """Price fields of Ticker.info from a v8 chart `meta` block, unadjusted like Ticker.info"""
+    price = float(meta['regularMarketPrice'])
+    shares = profile.get('sharesOutstanding') or profile.get('impliedSharesOutstanding')
+    return {
+        'currentPrice': price,
+        'previousClose': meta.get('previousClose') or price,
+        'volume': meta.get('regularMarketVolume') or 0,
+        'dayHigh': meta.get('regularMarketDayHigh') or price,
+        'dayLow': meta.get('regularMarketDayLow') or price,
+        'fiftyTwoWeekHigh': meta.get('fiftyTwoWeekHigh') or 0,
+        'fiftyTwoWeekLow': meta.get('fiftyTwoWeekLow') or 0,
+        'marketCap': price * shares if shares else 0,
+        'regularMarketTime': meta.get('regularMarketTime')
+    }
+
+def quote_from_bars(bars: pd.DataFrame, profile: Dict) -> Dict:
+    """Price fields rebuilt from stored daily bars, when no quote could be fetched this run
+
+    The bars are auto-adjusted, so previous close and the 52-week range can differ
+    from the exchange's figures; `fetch_info` marks these quotes stale.
+    """
+    last = bars.iloc[-1]
+    price = float(last['Close'])
+    shares = profile.get('sharesOutstanding') or profile.get('impliedSharesOutstanding')
+    return {
+        'currentPrice': price,
+        'previousClose': float(bars['Close'].iloc[-2]) if len(bars) > 1 else price,
+        'volume': int(last['Volume']) if np.isfinite(last['Volume']) else 0,
+        'dayHigh': float(last['High']),
+        'dayLow': float(last['Low']),
+        'fiftyTwoWeekHigh': float(bars['High'].max()),
+        'fiftyTwoWeekLow': float(bars['Low'].min()),
+        'marketCap': price * shares if shares else 0,
+        'regularMarketTime': int(bars.index[-1].timestamp())
+    }
+
+def _profile_stale(ttl: float, market_time: Optional[int]):
+    """Slow-tier expiry: past `ttl`, unless nothing has traded since the entry was cached"""
+    def stale(entry: Dict, now: float) -> bool:
+        if now - entry.get('fetchedAt', 0) <= ttl:
+            return False
+        return market_time is None or entry['value'].get('quoteTime') != market_time
+    return stale
+
+def fetch_info(ticker, symbol: str, hist_1y: pd.DataFrame, cache: Optional[FileCache] = None,
+               limiter: Optional[TokenBucket] = None, quote: Optional[Dict] = None) -> Dict:
+    """Ticker.info with a two-tier cache
+    
+    The fast tier (price fields) comes from `quote`, the chart `meta` fetched for
+    every symbol on every run. The slow tier (company profile, fundamentals) is
+    served from `cache` while it is within its TTL, or past it while the quote's
+    `regularMarketTime` still matches the one the entry was cached with (nothing
+    has traded since). Only a slow-tier miss costs an info request. Without a
+    quote the price fields fall back to the stored bars; the result carries
+    `quoteStale` whenever its price is not current.
+    """
+    market_time = quote.get('regularMarketTime') if quote else None
+    bars = hist_1y.dropna(subset=['Close']) if not hist_1y.empty else hist_1y
+    info = None
+    if cache is not None and (quote or not bars.empty):
+        profile = cache.get(symbol, stale=_profile_stale(cache.ttl, market_time))
+        if profile is not None:
+            fast = quote_from_meta(quote, profile) if quote else quote_from_bars(bars, profile)
+            info = {**profile, **fast, 'quoteStale': not quote}
+    
+    if info is None:
+        _throttle(limiter)
+        info = dict(ticker.info)
+        if cache is not None and info:
+            profile = {key: value for key, value in info.items() if key not in PRICE_FIELDS}
+            # Keeps market cap moving with the price when Yahoo omits the share count
+            if not profile.get('impliedSharesOutstanding') and info.get('marketCap') and info.get('currentPrice'):
+                profile['impliedSharesOutstanding'] = info['marketCap'] / info['currentPrice']
+            profile['quoteTime'] = info.get('regularMarketTime') or market_time
+            cache.put(symbol, profile)
+        info['quoteStale'] = False
+    
+    quote_time = info.get('regularMarketTime')
+    if not quote_time or time.time() - quote_time > QUOTE_MAX_AGE.total_seconds():
+        info['quoteStale'] = True
+    if info['quoteStale']:
+        print(f"WARNING: {symbol} has no current quote; price is from "
+              + (f"{datetime.fromtimestamp(quote_time, JKT_TZ):%Y-%m-%d %H:%M %Z}" if quote_time else "an unknown time"))
+    return info
+
+# Latest statement row kept per financials field: (statement, row label)
+STATEMENT_FIELDS = {
+    'revenue': ('income', 'Total Revenue'),
+    'netIncome': ('income', 'Net Income'),
+    'totalAssets': ('balance', 'Total Assets'),
+    'totalLiabilities': ('balance', 'Total Liabilities Net Minority Interest'),
+    'totalEquity': ('balance', 'Total Equity Gross Minority Interest'),
+    'operatingCashFlow': ('cashflow', 'Operating Cash Flow'),
+    'freeCashFlow': ('cashflow', 'Free Cash Flow')
+}
+# IDX quarterly reports are due within a month of the period end (longer when
+# reviewed or audited); until one shows up, check again once a day
+REPORTING_LAG_DAYS = 30
+STATEMENTS_RETRY_SECONDS = 86400
+
+def statements_stale(entry: Dict, now: float) -> bool:
+    """Whether a newer quarter than the cached one could plausibly be published by now"""
+    if now - entry.get('fetchedAt', 0) < STATEMENTS_RETRY_SECONDS:
+        return False
+    period_end = entry['value'].get('periodEnd')
+    if not period_end:
+        return True
+    next_period_end = pd.Timestamp(period_end) + pd.offsets.QuarterEnd(1)
+    return now >= (next_period_end + pd.Timedelta(days=REPORTING_LAG_DAYS)).timestamp()
+
+def extract_financials(statements: Dict[str, pd.DataFrame]) -> Tuple[Dict, Optional[str]]:
+    """Latest-quarter `financials` fields and the period end date they belong to"""
+    financials = {}
+    for field, (statement, row) in STATEMENT_FIELDS.items():
+        frame = statements[statement]
+        financials[field] = float(frame.loc[row].iloc[0]) if not frame.empty and row in frame.index else None
+    
+    income = statements['income']
+    period_end = pd.Timestamp(income.columns[0]).strftime('%Y-%m-%d') if not income.empty else None
+    return financials, period_end
+
+def fetch_financials(ticker, symbol: str, cache: Optional[FileCache] = None,
+                     limiter: Optional[TokenBucket] = None) -> Dict:
+    """Quarterly statement figures, refetched only when a new report is due (see `statements_stale`)"""
+    if cache is not None:
+        cached = cache.get(symbol, stale=statements_stale)
+        if cached is not None:
+            return cached['financials']
+    
+    try:
+        _throttle(limiter)
+        income_stmt = ticker.quarterly_income_stmt
+        _throttle(limiter)
+        balance_sheet = ticker.quarterly_balance_sheet
+        _throttle(limiter)
+        cash_flow = ticker.quarterly_cashflow
+    except:
+        income_stmt = pd.DataFrame()
+        balance_sheet = pd.DataFrame()
+        cash_flow = pd.DataFrame()
+    
+    financials, period_end = extract_financials({'income': income_stmt, 'balance': balance_sheet, 'cashflow': cash_flow})
+    if cache is None:
+        return financials
+    
+    previous = cache.entry(symbol)
+    if period_end is None and previous is not None:
+        # Nothing usable came back: keep the cached quarter, retry tomorrow
+        financials, period_end = previous['value']['financials'], previous['value'].get('periodEnd')
+    cache.put(symbol, {'financials': financials, 'periodEnd': period_end})
+    return financials
+
+def fetch_stock_data(symbol: str, limiter: Optional[TokenBucket] = None,
+                     history: Optional[pd.DataFrame] = None,
+                     stored: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None,
+                     store_dir: Optional[str] = None,
+                     info_cache: Optional[FileCache] = None,
+                     statements_cache: Optional[FileCache] = None,
+                     monthly: Optional[pd.DataFrame] = None,
+                     quote: Optional[Dict] = None) -> Optional[Dict]:
+    """Fetch the raw inputs for one stock (info, bars, technicals, financials)
+    
+    Returns a picklable payload for `build_stock_data`; all network and store I/O
+    happens here, the formatting happens in the transform stage.
+    
+    `history` is a shared daily frame from `download_history` (and `monthly` its
+    monthly counterpart for new symbols); when the symbol is present there, no
+    per-ticker history requests are made. `stored` holds the (daily, monthly) bars
+    from the previous run, in which case `history` only needs bars from shortly
+    before the last stored date and is appended to them, unless a dividend or split
+    re-based the adjusted prices (see `history_store.rebased`) and the symbol's
+    history is refetched instead. With `store_dir` the symbol's full daily history
+    is written back to the columnar store and the technicals come from the symbol's
+    streaming indicator state. `info_cache` holds the slow-changing part of
+    Ticker.info and `quote` this run's chart meta for the symbol (see `fetch_info`);
+    `statements_cache` holds the latest quarterly statement figures (see
+    `fetch_financials`).
+    """
     try:
         ticker = yf.Ticker(symbol)
-        info = ticker.info
         
         # Get historical data (1 year daily, 5 years monthly)
         end_date = datetime.now()
         start_date_1y = end_date - timedelta(days=365)
         start_date_5y = end_date - timedelta(days=365*5)
         
-        hist_1y = ticker.history(start=start_date_1y, end=end_date)
-        hist_5y = ticker.history(start=start_date_5y, end=end_date, interval='1mo')
+        fresh = slice_symbol(history, symbol) if history is not None else pd.DataFrame()
+        stored_daily, stored_monthly = stored if stored is not None else (pd.DataFrame(), pd.DataFrame())
+        appended = False
+        if not stored_daily.empty:
+            if fresh.empty:
+                _throttle(limiter)
+                fresh = ticker.history(start=refetch_start(stored_daily), end=end_date)
+            full = pd.DataFrame()
+            if rebased(stored_daily, fresh):
+                # A dividend or split re-based every earlier adjusted price: replace the
+                # stored history instead of appending to it
+                print(f"Adjusted prices of {symbol} changed since the last run, refetching its history")
+                _throttle(limiter)
+                full = ticker.history(start=stored_daily.index[0], end=end_date)
+            if not full.empty:
+                daily = merge_bars(empty_frame(), full)
+                _throttle(limiter)
+                hist_5y = ticker.history(start=start_date_5y, end=end_date, interval='1mo')
+            else:
+                daily = merge_bars(stored_daily, fresh)
+                hist_5y = merge_monthly(stored_monthly, daily, now=end_date)
+                appended = True
+            hist_1y = window(daily, DAILY_WINDOW_DAYS, end_date)
+        elif not fresh.empty:
+            daily = fresh
+            hist_1y = window(daily, DAILY_WINDOW_DAYS, end_date)
+            hist_5y = slice_symbol(monthly, symbol) if monthly is not None else pd.DataFrame()
+            if hist_5y.empty:
+                _throttle(limiter)
+                hist_5y = ticker.history(start=start_date_5y, end=end_date, interval='1mo')
+        else:
+            _throttle(limiter)
+            hist_1y = ticker.history(start=start_date_1y, end=end_date)
+            _throttle(limiter)
+            hist_5y = ticker.history(start=start_date_5y, end=end_date, interval='1mo')
+            daily = merge_bars(empty_frame(), hist_1y)
+        
+        info = fetch_info(ticker, symbol, hist_1y, info_cache, limiter, quote)
         
-        # Calculate technical indicators
-        technicals = calculate_technical_indicators(hist_1y)
+        # Calculate technical indicators; appended bars advance the streaming state,
+        # anything else rebuilds it from the merged history
+        if store_dir and not daily.empty:
+            save_daily(symbol, daily, store_dir)
+            new_bars = fresh if appended else empty_frame()
+            technicals = advance(symbol, new_bars, daily, store_dir, end_date)
+        else:
+            technicals = calculate_technical_indicators(hist_1y)
         
-        # Get financials
-        try:
-            income_stmt = ticker.quarterly_income_stmt
-            balance_sheet = ticker.quarterly_balance_sheet
-            cash_flow = ticker.quarterly_cashflow
-        except:
-            income_stmt = pd.DataFrame()
-            balance_sheet = pd.DataFrame()
-            cash_flow = pd.DataFrame()
+        # Get financials (cached until a new quarterly report is due)
+        financials = fetch_financials(ticker, symbol, statements_cache, limiter)
         
-        # Extract comprehensive data
-        data = {
+        return {
             'symbol': symbol,
-            'basic': {
-                'name': info.get('longName', ''),
-                'price': info.get('currentPrice', 0),
-                'previousClose': info.get('previousClose', 0),
-                'dayChange': info.get('currentPrice', 0) - info.get('previousClose', 0),
-                'dayChangePercent': ((info.get('currentPrice', 0) / info.get('previousClose', 1)) - 1) * 100 if info.get('previousClose', 0) > 0 else 0,
-                'volume': info.get('volume', 0),
-                'avgVolume': info.get('averageVolume', 0),
-                'dayHigh': info.get('dayHigh', 0),
-                'dayLow': info.get('dayLow', 0),
-                'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh', 0),
-                'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow', 0),
-                'marketCap': info.get('marketCap', 0),
-                'sharesOutstanding': info.get('sharesOutstanding', 0),
-                'float': info.get('floatShares', 0),
-                'beta': info.get('beta', None),
-                'currency': info.get('currency', 'IDR')
-            },
-            'fundamentals': {
-                'pe': info.get('trailingPE', None),
-                'forwardPE': info.get('forwardPE', None),
-                'peg': info.get('pegRatio', None),
-                'pb': info.get('priceToBook', None),
-                'ps': info.get('priceToSalesTrailing12Months', None),
-                'eps': info.get('trailingEps', None),
-                'forwardEps': info.get('forwardEps', None),
-                'dividendYield': info.get('dividendYield', 0) * 100 if info.get('dividendYield') else None,
-                'dividendRate': info.get('dividendRate', None),
-                'payoutRatio': info.get('payoutRatio', None),
-                'roe': info.get('returnOnEquity', None),
-                'roa': info.get('returnOnAssets', None),
-                'grossMargin': info.get('grossMargins', None),
-                'operatingMargin': info.get('operatingMargins', None),
-                'profitMargin': info.get('profitMargins', None),
-                'debtToEquity': info.get('debtToEquity', None),
-                'currentRatio': info.get('currentRatio', None),
-                'quickRatio': info.get('quickRatio', None),
-                'bookValue': info.get('bookValue', None),
-                'revenuePerShare': info.get('revenuePerShare', None),
-                'totalCashPerShare': info.get('totalCashPerShare', None),
-                'enterpriseValue': info.get('enterpriseValue', None),
-                'evToRevenue': info.get('enterpriseToRevenue', None),
-                'evToEbitda': info.get('enterpriseToEbitda', None)
-            },
+            'info': info,
             'technicals': technicals,
-            'company': {
-                'sector': info.get('sector', ''),
-                'industry': info.get('industry', ''),
-                'fullTimeEmployees': info.get('fullTimeEmployees', None),
-                'website': info.get('website', ''),
-                'description': info.get('longBusinessSummary', ''),
-                'country': info.get('country', 'Indonesia'),
-                'city': info.get('city', ''),
-                'address': info.get('address1', '')
-            },
-            'financials': {
-                'revenue': float(income_stmt.loc['Total Revenue'].iloc[0]) if not income_stmt.empty and 'Total Revenue' in income_stmt.index else None,
-                'netIncome': float(income_stmt.loc['Net Income'].iloc[0]) if not income_stmt.empty and 'Net Income' in income_stmt.index else None,
-                'totalAssets': float(balance_sheet.loc['Total Assets'].iloc[0]) if not balance_sheet.empty and 'Total Assets' in balance_sheet.index else None,
-                'totalLiabilities': float(balance_sheet.loc['Total Liabilities Net Minority Interest'].iloc[0]) if not balance_sheet.empty and 'Total Liabilities Net Minority Interest' in balance_sheet.index else None,
-                'totalEquity': float(balance_sheet.loc['Total Equity Gross Minority Interest'].iloc[0]) if not balance_sheet.empty and 'Total Equity Gross Minority Interest' in balance_sheet.index else None,
-                'operatingCashFlow': float(cash_flow.loc['Operating Cash Flow'].iloc[0]) if not cash_flow.empty and 'Operating Cash Flow' in cash_flow.index else None,
-                'freeCashFlow': float(cash_flow.loc['Free Cash Flow'].iloc[0]) if not cash_flow.empty and 'Free Cash Flow' in cash_flow.index else None
-            },
-            'historical': {
-                'daily': hist_1y.reset_index().to_dict('records') if not hist_1y.empty else [],
-                'monthly': hist_5y.reset_index().to_dict('records') if not hist_5y.empty else []
-            },
+            'financials': financials,
+            'hist_1y': hist_1y,
+            'hist_5y': hist_5y,
             'lastUpdate': datetime.now(JKT_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
         }
         
-        # Clean up data
-        for key in ['basic', 'fundamentals', 'financials']:
-            for field, value in data[key].items():
-                if isinstance(value, float):
-                    if np.isnan(value) or np.isinf(value):
-                        data[key][field] = None
-                    else:
-                        data[key][field] = round(value, 2)
+    except Exception as e:
+        print(f"Error scraping {symbol}: {e}")
+        return None
+
+def build_stock_data(raw: Dict) -> Dict:
+    """Turn a `fetch_stock_data` payload into the stock file structure (CPU only)"""
+    symbol, info = raw['symbol'], raw['info']
+    technicals, financials = raw['technicals'], raw['financials']
+    
+    # Extract comprehensive data
+    data = {
+        'symbol': symbol,
+        'basic': {
+            'name': info.get('longName', ''),
+            'price': info.get('currentPrice', 0),
+            'previousClose': info.get('previousClose', 0),
+            'dayChange': info.get('currentPrice', 0) - info.get('previousClose', 0),
+            'dayChangePercent': ((info.get('currentPrice', 0) / info.get('previousClose', 1)) - 1) * 100 if info.get('previousClose', 0) > 0 else 0,
+            'volume': info.get('volume', 0),
+            'avgVolume': info.get('averageVolume', 0),
+            'dayHigh': info.get('dayHigh', 0),
+            'dayLow': info.get('dayLow', 0),
+            'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh', 0),
+            'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow', 0),
+            'marketCap': info.get('marketCap', 0),
+            'sharesOutstanding': info.get('sharesOutstanding', 0),
+            'float': info.get('floatShares', 0),
+            'beta': info.get('beta', None),
+            'currency': info.get('currency', 'IDR'),
+            'quoteTime': datetime.fromtimestamp(info['regularMarketTime'], JKT_TZ).strftime('%Y-%m-%d %H:%M:%S %Z') if info.get('regularMarketTime') else None,
+            'quoteStale': bool(info.get('quoteStale'))
+        },
+        'fundamentals': {
+            'pe': info.get('trailingPE', None),
+            'forwardPE': info.get('forwardPE', None),
+            'peg': info.get('pegRatio', None),
+            'pb': info.get('priceToBook', None),
+            'ps': info.get('priceToSalesTrailing12Months', None),
+            'eps': info.get('trailingEps', None),
+            'forwardEps': info.get('forwardEps', None),
+            'dividendYield': info.get('dividendYield', 0) * 100 if info.get('dividendYield') else None,
+            'dividendRate': info.get('dividendRate', None),
+            'payoutRatio': info.get('payoutRatio', None),
+            'roe': info.get('returnOnEquity', None),
+            'roa': info.get('returnOnAssets', None),
+            'grossMargin': info.get('grossMargins', None),
+            'operatingMargin': info.get('operatingMargins', None),
+            'profitMargin': info.get('profitMargins', None),
+            'debtToEquity': info.get('debtToEquity', None),
+            'currentRatio': info.get('currentRatio', None),
+            'quickRatio': info.get('quickRatio', None),
+            'bookValue': info.get('bookValue', None),
+            'revenuePerShare': info.get('revenuePerShare', None),
+            'totalCashPerShare': info.get('totalCashPerShare', None),
+            'enterpriseValue': info.get('enterpriseValue', None),
+            'evToRevenue': info.get('enterpriseToRevenue', None),
+            'evToEbitda': info.get('enterpriseToEbitda', None)
+        },
+        'technicals': technicals,
+        'company': {
+            'sector': info.get('sector', ''),
+            'industry': info.get('industry', ''),
+            'fullTimeEmployees': info.get('fullTimeEmployees', None),
+            'website': info.get('website', ''),
+            'description': info.get('longBusinessSummary', ''),
+            'country': info.get('country', 'Indonesia'),
+            'city': info.get('city', ''),
+            'address': info.get('address1', '')
+        },
+        'financials': financials,
+        'historical': {
+            'daily': frame_to_records(raw['hist_1y']),
+            'monthly': frame_to_records(raw['hist_5y'])
+        },
+        'lastUpdate': raw['lastUpdate']
+    }
+    
+    # Clean up data
+    for key in ['basic', 'fundamentals', 'financials']:
+        for field, value in data[key].items():
+            if isinstance(value, float):
+                if np.isnan(value) or np.isinf(value):
+                    data[key][field] = None
+                else:
+                    data[key][field] = round(value, 2)
+    
+    return data
+
+def scrape_comprehensive_data(symbol: str, *args, **kwargs) -> Optional[Dict]:
+    """Scrape comprehensive data for a single stock (fetch and build in one step)"""
+    raw = fetch_stock_data(symbol, *args, **kwargs)
+    return build_stock_data(raw) if raw else None
+
+def save_json(obj: Any, path: str, manifest: Optional[Manifest], now: str):
+    """Write a served data file, skipping it when `manifest` says its data is unchanged"""
+    if manifest is None:
+        serializer.dump(obj, path, sidecars=True)
+    else:
+        manifest.write(obj, path, now)
+
+def write_stock(raw: Dict, data_dir: str, manifest: Optional[Manifest] = None) -> Optional[Dict]:
+    """Build and write one stock's files; returns its index row, fundamentals and screener fields"""
+    symbol = raw['symbol']
+    try:
+        data = build_stock_data(raw)
         
-        # Format historical data
-        for period in ['daily', 'monthly']:
-            for record in data['historical'][period]:
-                record['Date'] = record['Date'].strftime('%Y-%m-%d')
-                for field in ['Open', 'High', 'Low', 'Close']:
-                    if field in record:
-                        record[field] = round(record[field], 2)
-                if 'Volume' in record:
-                    record['Volume'] = int(record['Volume'])
+        # Save individual stock file
+        stock_file = os.path.join(data_dir, 'stocks', f'{symbol.replace(".JK", "")}.json')
+        save_json(data, stock_file, manifest, raw['lastUpdate'])
         
-        return data
+        # Export the trailing year from the columnar store for the browser
+        hist_file = os.path.join(data_dir, 'historicals', f'{symbol.replace(".JK", "")}_daily.json')
+        save_json(data['historical']['daily'], hist_file, manifest, raw['lastUpdate'])
         
+        # Weekly bars over the whole stored history, bounded for long-range charts
+        daily = load_daily(symbol, data_dir)
+        if not daily.empty:
+            save_json(chart_records(daily), weekly_path(symbol, data_dir), manifest, raw['lastUpdate'])
     except Exception as e:
-        print(f"Error scraping {symbol}: {e}")
+        print(f"Error writing {symbol}: {e}")
         return None
+    
+    return {
+        'index': {
+            'symbol': symbol,
+            'name': data['basic']['name'],
+            'price': data['basic']['price'],
+            'change': data['basic']['dayChange'],
+            'changePercent': data['basic']['dayChangePercent'],
+            'volume': data['basic']['volume'],
+            'marketCap': data['basic']['marketCap'],
+            'pe': data['fundamentals']['pe'],
+            'sector': data['company']['sector']
+        },
+        'fundamentals': data['fundamentals'],
+        'technicals': data['technicals'],
+        'industry': data['company']['industry'],
+        'quote': {field: data['basic'][field] for field in QUOTE_FIELDS}
+    }
+
+def _write_chunk(raws: List[Dict], data_dir: str, manifest: Optional[Manifest]):
+    """Write a chunk in a worker; also hands back the serializer stats and manifest changes"""
+    results = [(raw['symbol'], write_stock(raw, data_dir, manifest)) for raw in raws]
+    changes = (manifest.changed, manifest.skipped) if manifest is not None else None
+    return results, serializer.stats(reset=True), changes
+
+def transform_all(raws: List[Dict], data_dir: str, processes: int = 1, chunk_size: int = 16,
+                  manifest: Optional[Manifest] = None) -> Dict[str, Dict]:
+    """Build and write stock files for fetched payloads, on a process pool when `processes` > 1
+    
+    Cleanup, record formatting and JSON encoding are pure-Python CPU work, so they
+    scale with processes rather than threads. Workers only send back the small
+    index/fundamentals summaries. With a `manifest`, files whose data is unchanged
+    are not rewritten.
+    """
+    if processes <= 1:
+        return {raw['symbol']: write_stock(raw, data_dir, manifest) for raw in raws}
+    
+    chunks = [raws[i:i + chunk_size] for i in range(0, len(raws), chunk_size)]
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for results, json_stats, changes in executor.map(_write_chunk, chunks, [data_dir] * len(chunks),
+                                                        [manifest] * len(chunks)):
+            summaries.update(results)
+            serializer.merge_stats(json_stats)
+            if changes:
+                manifest.merge(*changes)
+    return summaries
 
 def generate_data_structure():
     """Generate the new data directory structure"""
@@ -218,9 +511,121 @@ def generate_data_structure():
         full_path = os.path.join(base_dir, dir_path)
         os.makedirs(full_path, exist_ok=True)
 
-def main():
-    """Main scraping function"""
-    print("Starting enhanced data scraping...")
+def scrape_all(symbols: List[str], workers: int = 4, limiter: Optional[TokenBucket] = None,
+               history: Optional[Dict[str, pd.DataFrame]] = None,
+               stored: Optional[Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]] = None,
+               store_dir: Optional[str] = None,
+               info_cache: Optional[FileCache] = None,
+               statements_cache: Optional[FileCache] = None,
+               monthly: Optional[Dict[str, pd.DataFrame]] = None,
+               quotes: Optional[Dict[str, Dict]] = None) -> Tuple[Dict[str, Dict], Dict[str, float]]:
+    """Fetch symbols on a bounded worker pool; returns (raw payloads, latency seconds) keyed by symbol
+    
+    `history` and `monthly` map each symbol to the batch frames holding its daily and
+    monthly bars, `stored` to its previously stored (daily, monthly) bars and
+    `quotes` to its chart meta from this run.
+    """
+    results = {}
+    latencies = {}
+    history = history or {}
+    stored = stored or {}
+    monthly = monthly or {}
+    quotes = quotes or {}
+    
+    def timed_scrape(symbol):
+        started = time.monotonic()
+        data = fetch_stock_data(symbol, limiter, history.get(symbol), stored.get(symbol), store_dir,
+                                info_cache, statements_cache, monthly.get(symbol), quotes.get(symbol))
+        return data, time.monotonic() - started
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(timed_scrape, symbol): symbol for symbol in symbols}
+        for done, future in enumerate(as_completed(futures), start=1):
+            symbol = futures[future]
+            data, elapsed = future.result()
+            results[symbol] = data
+            latencies[symbol] = elapsed
+            status = "ok" if data else "failed"
+            print(f"Scraped {symbol} ({done}/{len(symbols)}) in {elapsed:.2f}s [{status}]")
+    
+    return results, latencies
+
+def summarize_latencies(latencies: Dict[str, float], wall_time: float) -> Dict:
+    """Summarize per-symbol fetch latency for the run report"""
+    if not latencies:
+        return {}
+    
+    values = np.array(list(latencies.values()))
+    slowest = sorted(latencies.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        'symbols': len(values),
+        'wall_seconds': round(wall_time, 2),
+        'symbols_per_minute': round(len(values) / wall_time * 60, 1) if wall_time > 0 else None,
+        'latency_p50': round(float(np.percentile(values, 50)), 2),
+        'latency_p95': round(float(np.percentile(values, 95)), 2),
+        'latency_max': round(float(values.max()), 2),
+        'slowest': {symbol: round(elapsed, 2) for symbol, elapsed in slowest}
+    }
+
+def check_technicals(results: Dict[str, Dict], data_dir: str):
+    """Check streamed technicals against a full recompute, rebuilding any state that drifted"""
+    scraped = [symbol for symbol, data in results.items() if data]
+    mismatches = verify(scraped, data_dir)
+    if mismatches:
+        rebuild(list(mismatches), data_dir)
+        for symbol in mismatches:
+            results[symbol]['technicals'] = load_state(symbol, data_dir).technicals()
+    print(f"Technicals check: {len(scraped) - len(mismatches)}/{len(scraped)} streamed states match a full recompute"
+          + (f", rebuilt {', '.join(mismatches)}" if mismatches else ""))
+
+def download_histories(symbols: List[str], stored: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]],
+                       batch_size: int, limiter: Optional[TokenBucket] = None
+                       ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+    """Batch-download (daily, monthly) history frames keyed by symbol
+    
+    New symbols get 1y daily plus 5y monthly bars, the same ranges as the per-ticker
+    path; symbols already on disk only get daily bars from shortly before the oldest
+    last stored bar (see `history_store.refetch_start`).
+    """
+    end_date = datetime.now()
+    known = [s for s in symbols if s in stored and not stored[s][0].empty]
+    new = [s for s in symbols if s not in known]
+    history, monthly = {}, {}
+    
+    if new:
+        print(f"Downloading 1y daily and 5y monthly history for {len(new)} symbols in batches of {batch_size}...")
+        frame = download_history(new, end_date - timedelta(days=365), end_date, batch_size=batch_size, limiter=limiter)
+        history.update({symbol: frame for symbol in new})
+        frame = download_history(new, end_date - timedelta(days=365*5), end_date, interval='1mo',
+                                 batch_size=batch_size, limiter=limiter)
+        monthly.update({symbol: frame for symbol in new})
+    
+    if known:
+        since = min(refetch_start(stored[s][0]) for s in known)
+        print(f"Downloading daily bars since {since:%Y-%m-%d} for {len(known)} stored symbols...")
+        frame = download_history(known, since, end_date, batch_size=batch_size, limiter=limiter)
+        history.update({symbol: frame for symbol in known})
+    
+    return history, monthly
+
+def main(workers: int = 4, rate: float = 5.0, burst: float = None, batch_size: int = 50,
+         full_refresh: bool = False, verify_technicals: bool = True, info_ttl_hours: float = 24,
+         refresh_financials: Optional[List[str]] = None, processes: int = 1, pretty: bool = None):
+    """Main scraping function
+    
+    `rate` is the shared request budget (Yahoo calls per second) for all workers.
+    Unless `full_refresh` is set, stored historicals are extended with new bars
+    instead of being downloaded again. Quotes are fetched for every symbol on every
+    run; company profile and fundamentals are re-downloaded once they are older than
+    `info_ttl_hours` (0 = every run) and something has traded since.
+    Quarterly statements are re-downloaded when a new report is due, or for the
+    symbols in `refresh_financials` (['all'] for every symbol). Stock files are
+    built and written by `processes` worker processes after all fetches finish.
+    Data files are compact JSON unless `pretty` (or STOCKS_JSON_PRETTY=1) is set.
+    """
+    if pretty is not None:
+        serializer.set_pretty(pretty)
+    print(f"Starting enhanced data scraping with {workers} workers at {rate} req/s...")
     
     # Generate directory structure
     generate_data_structure()
@@ -236,71 +641,90 @@ def main():
         'total_stocks': len(INDONESIAN_STOCKS)
     }
     
-    for i, (symbol, name) in enumerate(INDONESIAN_STOCKS.items()):
-        print(f"Scraping {symbol} ({i+1}/{len(INDONESIAN_STOCKS)})...")
-        
-        data = scrape_comprehensive_data(symbol)
-        
-        if data:
-            # Save individual stock file
-            stock_file = os.path.join(data_dir, 'stocks', f'{symbol.replace(".JK", "")}.json')
-            with open(stock_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-            # Save historical data separately for better performance
-            hist_file = os.path.join(data_dir, 'historicals', f'{symbol.replace(".JK", "")}_daily.json')
-            with open(hist_file, 'w') as f:
-                json.dump(data['historical']['daily'], f)
-            
-            # Add to index
-            index_data['stocks'].append({
-                'symbol': symbol,
-                'name': data['basic']['name'],
-                'price': data['basic']['price'],
-                'change': data['basic']['dayChange'],
-                'changePercent': data['basic']['dayChangePercent'],
-                'volume': data['basic']['volume'],
-                'marketCap': data['basic']['marketCap'],
-                'pe': data['fundamentals']['pe'],
-                'sector': data['company']['sector']
-            })
-            
-            # Add to fundamentals
-            fundamentals_data[symbol] = data['fundamentals']
-            
-            # Delay to avoid rate limiting
-            time.sleep(1)
+    symbols = [symbol for symbol, name in INDONESIAN_STOCKS]
+    limiter = TokenBucket(rate, burst)
+    
+    started = time.monotonic()
+    stored = {} if full_refresh else {symbol: load_stored(symbol, data_dir) for symbol in symbols}
+    history, monthly = {}, {}
+    if batch_size > 0:
+        history, monthly = download_histories(symbols, stored, batch_size, limiter)
+        print(f"Batch history done in {time.monotonic() - started:.1f}s")
+    
+    # Fast tier: every symbol's quote, fetched concurrently on every run
+    quote_result = fetch_quotes(symbols, concurrency=max(1, workers), rate=rate, parse=chart_meta)
+    print(report(quote_result, len(symbols)))
+    
+    info_cache = FileCache('info', ttl=info_ttl_hours * 3600, folder=os.path.join(data_dir, 'cache'))
+    statements_cache = FileCache('statements', ttl=STATEMENTS_RETRY_SECONDS, folder=os.path.join(data_dir, 'cache'))
+    for symbol in (symbols if refresh_financials == ['all'] else refresh_financials or []):
+        statements_cache.invalidate(symbol if symbol.endswith('.JK') else f'{symbol}.JK')
+    results, latencies = scrape_all(symbols, workers, limiter, history, stored, store_dir=data_dir,
+                                    info_cache=info_cache, statements_cache=statements_cache, monthly=monthly,
+                                    quotes=quote_result['quotes'])
+    if verify_technicals:
+        check_technicals(results, data_dir)
+    latency_report = summarize_latencies(latencies, time.monotonic() - started)
+    
+    # Transform and serialize off the fetch path, across processes
+    transform_started = time.monotonic()
+    raws = [results[symbol] for symbol in symbols if results.get(symbol)]
+    manifest = Manifest(os.path.join(data_dir, 'manifest.json'), base_dir)
+    summaries = transform_all(raws, data_dir, processes, manifest=manifest)
+    print(f"Wrote {len(raws)} stock files with {processes} process(es) in {time.monotonic() - transform_started:.2f}s")
+    
+    for symbol in symbols:
+        summary = summaries.get(symbol)
+        if summary:
+            index_data['stocks'].append(summary['index'])
+            fundamentals_data[symbol] = summary['fundamentals']
     
     # Save index file
     index_file = os.path.join(data_dir, 'index.json')
-    with open(index_file, 'w') as f:
-        json.dump(index_data, f, indent=2)
+    manifest.write(index_data, index_file, index_data['last_update'])
     
     # Save fundamentals file
     fundamentals_file = os.path.join(data_dir, 'fundamentals.json')
-    with open(fundamentals_file, 'w') as f:
-        json.dump(fundamentals_data, f, indent=2)
-    
-    # Save screener cache with pre-calculated filters
-    screener_cache = {
-        'value_stocks': [s for s in index_data['stocks'] if s['pe'] and s['pe'] < 15],
-        'growth_stocks': [s for s in index_data['stocks'] if s['pe'] and s['pe'] > 20],
-        'large_cap': [s for s in index_data['stocks'] if s['marketCap'] and s['marketCap'] > 10000000000000],  # > 10T IDR
-        'sectors': {}
-    }
+    manifest.write(fundamentals_data, fundamentals_file, index_data['last_update'])
+    
+    # Columnar screener snapshot; queries run against its indexes instead of fixed buckets
+    screener_rows = [{**stock, **summaries[stock['symbol']]['quote'], **fundamentals_data[stock['symbol']],
+                      'industry': summaries[stock['symbol']]['industry'], **(summaries[stock['symbol']]['technicals'] or {})}
+                     for stock in index_data['stocks']]
+    screener_file = os.path.join(data_dir, 'screener.json')
+    screener_table = build_table(screener_rows, index_data['last_update'])
+    manifest.write(screener_table, screener_file, index_data['last_update'])
+    
+    # Sector/industry/index-membership bitsets over stable symbol ordinals
+    categories_file = os.path.join(data_dir, 'categories.json')
+    categories = build_index(screener_rows, INDEX_MEMBERS, load_index(categories_file))
+    manifest.write(categories.to_dict(index_data['last_update']), categories_file, index_data['last_update'])
     
-    # Group by sector
-    for stock in index_data['stocks']:
-        sector = stock.get('sector', 'Unknown')
-        if sector not in screener_cache['sectors']:
-            screener_cache['sectors'][sector] = []
-        screener_cache['sectors'][sector].append(stock)
+    # Movers boards, selected from the same snapshot
+    leaders_file = os.path.join(data_dir, 'leaders.json')
+    manifest.write(compute_leaders(screener_table), leaders_file, index_data['last_update'])
     
-    screener_file = os.path.join(data_dir, 'screener_cache.json')
-    with open(screener_file, 'w') as f:
-        json.dump(screener_cache, f, indent=2)
+    # Pairwise correlation and beta against the market-cap weighted composite
+    correlation_started = time.monotonic()
+    caps = {stock['symbol']: stock['marketCap'] for stock in index_data['stocks']}
+    correlation_file = os.path.join(data_dir, 'correlation.json')
+    manifest.write(correlation.build(data_dir, caps), correlation_file, index_data['last_update'])
+    print(f"Computed correlations in {time.monotonic() - correlation_started:.2f}s")
     
     print(f"Enhanced scraping completed! Scraped {len(index_data['stocks'])} stocks.")
+    if latency_report:
+        print(f"Fetch latency: p50 {latency_report['latency_p50']}s, p95 {latency_report['latency_p95']}s, "
+              f"max {latency_report['latency_max']}s ({latency_report['symbols_per_minute']} symbols/min, "
+              f"{limiter.waited:.1f}s rate-limit wait)")
+    stale_quotes = [raw['symbol'] for raw in raws if raw['info'].get('quoteStale')]
+    if stale_quotes:
+        print(f"WARNING: {len(stale_quotes)} stale quotes: {', '.join(stale_quotes)}")
+    cache_report = info_cache.stats()
+    print(f"Info cache: {cache_report['hits']} slow-tier hits, {cache_report['misses']} misses, "
+          f"{cache_report['expired']} expired (hit ratio {cache_report['hit_ratio']})")
+    statements_report = statements_cache.stats()
+    print(f"Statements cache: {statements_report['hits']} hits, {statements_report['misses']} misses, "
+          f"{statements_report['expired']} due for a new quarter (hit ratio {statements_report['hit_ratio']})")
     
     # Also update the old format for backward compatibility
     old_data = {
@@ -322,13 +746,34 @@ def main():
         'data_quality': {
             'real_data_count': len(index_data['stocks']),
             'total_stocks': len(INDONESIAN_STOCKS),
-            'real_data_percentage': (len(index_data['stocks']) / len(INDONESIAN_STOCKS)) * 100
+            'real_data_percentage': (len(index_data['stocks']) / len(INDONESIAN_STOCKS)) * 100,
+            'fetch': latency_report,
+            'quotes': {'fetched': len(quote_result['quotes']), 'stale': stale_quotes},
+            'info_cache': cache_report,
+            'statements_cache': statements_report
         }
     }
     
     old_file = os.path.join(base_dir, 'static', 'data', 'stocks.json')
-    with open(old_file, 'w') as f:
-        json.dump(old_data, f, indent=2)
+    manifest.write(old_data, old_file, index_data['last_update'])
+    manifest.save(index_data['last_update'])
+    serializer.report(base_dir)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4, help='concurrent symbol fetches')
+    parser.add_argument('--rate', type=float, default=5.0, help='shared Yahoo request budget per second')
+    parser.add_argument('--burst', type=float, default=None, help='token bucket capacity (defaults to rate)')
+    parser.add_argument('--batch-size', type=int, default=50, help='symbols per batched history download (0 = per-ticker history)')
+    parser.add_argument('--full-refresh', action='store_true', help='re-download full history instead of appending new bars')
+    parser.add_argument('--skip-verify', action='store_true', help='skip checking streamed technicals against a full recompute')
+    parser.add_argument('--info-ttl', type=float, default=24, help='hours before cached company profile and fundamentals are refetched')
+    parser.add_argument('--refresh-financials', nargs='?', const='all', default=None, metavar='SYMBOLS',
+                        help='refetch quarterly statements now, for all symbols or a comma-separated list')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='processes for building and writing stock files')
+    parser.add_argument('--pretty', action='store_true', help='indent the generated JSON files (larger and slower, for debugging)')
+    args = parser.parse_args()
+    main(workers=args.workers, rate=args.rate, burst=args.burst, batch_size=args.batch_size,
+         full_refresh=args.full_refresh, verify_technicals=not args.skip_verify, info_ttl_hours=args.info_ttl,
+         refresh_financials=args.refresh_financials.split(',') if args.refresh_financials else None,
+         processes=args.processes, pretty=args.pretty or None)
\ No newline at end of file
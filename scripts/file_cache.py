@@ -0,0 +1,79 @@
+"""
+TTL cache of JSON values on disk, one file per key
+Used to keep slow-changing Yahoo data (company profile, fundamentals) between
+runs; the files live under data/cache so they are committed with the data.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import serializer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
+
+class FileCache:
+    """`name` entries stored as <folder>/<KEY>_<name>.json with a fetch timestamp"""
+
+    def __init__(self, name: str, ttl: float, folder: str = CACHE_DIR):
+        self.name = name
+        self.ttl = ttl
+        self.folder = folder
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key.replace('.JK', '')}_{self.name}.json")
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def entry(self, key: str) -> Optional[Dict]:
+        """The raw {'fetchedAt', 'value'} entry regardless of age, or None"""
+        try:
+            return serializer.load(self.path(key))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable {self.name} cache entry for {key}: {e}")
+            return None
+
+    def get(self, key: str, now: float = None, stale: Callable[[Dict, float], bool] = None) -> Optional[Any]:
+        """Cached value if still fresh; counts a hit, miss or expiry
+
+        Entries expire after the TTL, or when `stale(entry, now)` says so if given.
+        """
+        entry = self.entry(key)
+        if entry is None:
+            self._count('misses')
+            return None
+        now = now or time.time()
+        if stale(entry, now) if stale else now - entry.get('fetchedAt', 0) > self.ttl:
+            self._count('expired')
+            return None
+        self._count('hits')
+        return entry['value']
+
+    def put(self, key: str, value: Any, now: float = None):
+        serializer.dump({'fetchedAt': now or time.time(), 'value': value}, self.path(key))
+
+    def invalidate(self, key: str):
+        """Drop an entry so the next lookup refetches it"""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses + self.expired
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None
+        }
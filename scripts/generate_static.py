@@ -1,7 +1,8 @@
-import json
 import os
 from datetime import datetime
 from jinja2 import Template
+import serializer
+from precompress import write_sidecars
 
 # Static HTML template
 HTML_TEMPLATE = """<!DOCTYPE html>
@@ -250,11 +251,10 @@ def generate_static_html():
     data_quality = None
     
     if os.path.exists(data_file):
-        with open(data_file, 'r') as f:
-            data = json.load(f)
-            stocks = data.get('stocks', [])
-            last_update = data.get('last_update', 'Never')
-            data_quality = data.get('data_quality')
+        data = serializer.load(data_file)
+        stocks = data.get('stocks', [])
+        last_update = data.get('last_update', 'Never')
+        data_quality = data.get('data_quality')
     
     # Generate HTML
     template = Template(HTML_TEMPLATE)
@@ -264,6 +264,7 @@ def generate_static_html():
     output_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'index.html')
     with open(output_file, 'w') as f:
         f.write(html_content)
+    write_sidecars(output_file)
     
     print(f"Static HTML generated: {output_file}")
 
@@ -1,19 +1,42 @@
 #!/usr/bin/env python3
 """
-Generate test data for Bloomberg-style interface
-Creates JSON files in the new data structure
+Generate synthetic market data in the layout the pipeline writes
+Prices are seeded geometric Brownian motion paths with a market factor, sector
+factors, fat-tailed shocks, overnight gaps and IDX auto-rejection limits and
+tick sizes. Volume follows each symbol's baseline and rises with the size of
+the move. Some symbols list partway through the history and some are suspended
+for a stretch. Everything is simulated as (days x symbols) arrays, so thousands
+of symbols with multi-year histories take seconds. The output is a fixture for
+benchmarking every other stage offline, e.g.
+
+    python generate_test_data.py --symbols 2000 --years 5 --data-dir /tmp/fixture
+    python correlation.py build --data-dir /tmp/fixture
 """
 
-import json
+import argparse
 import os
-import random
+import time
 from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
 import pytz
+from screener import QUOTE_FIELDS, build_table
+from categories import build_index
+from leaders import compute_leaders
+from manifest import Manifest
+from downsample import chart_records, period_starts, resample_arrays, weekly_path
+from indicators import compute_technicals
+from indicator_state import IndicatorState, save_state
+from batch_history import HISTORY_FIELDS
+from history_store import DAILY_WINDOW_DAYS, MONTHLY_WINDOW_DAYS, empty_frame, frame_to_records, save_daily, window
+import correlation
+from stock_symbols import INDEX_MEMBERS
 
 # Jakarta timezone
 JKT_TZ = pytz.timezone('Asia/Jakarta')
 
-# Stock symbols and names
+# Real names and sectors for the first symbols; the rest get generated tickers
 STOCKS = {
     'BBCA.JK': {'name': 'Bank Central Asia', 'sector': 'Financials'},
     'BBRI.JK': {'name': 'Bank Rakyat Indonesia', 'sector': 'Financials'},
@@ -36,229 +59,296 @@ STOCKS = {
     'BRIS.JK': {'name': 'Bank Syariah Indonesia', 'sector': 'Financials'},
     'TOWR.JK': {'name': 'Sarana Menara Nusantara', 'sector': 'Communication Services'}
 }
+SECTORS = sorted({info['sector'] for info in STOCKS.values()} | {'Technology', 'Real Estate'})
 
-def generate_historical_data(base_price, days=365):
-    """Generate historical price data"""
-    historical = []
-    current_price = base_price
-    end_date = datetime.now()
-    
-    for i in range(days):
-        date = end_date - timedelta(days=days-i-1)
-        
-        # Random daily change between -3% and 3%
-        change_percent = random.uniform(-0.03, 0.03)
-        current_price *= (1 + change_percent)
-        
-        # Daily OHLC
-        open_price = current_price * random.uniform(0.98, 1.02)
-        high_price = max(open_price, current_price) * random.uniform(1.0, 1.02)
-        low_price = min(open_price, current_price) * random.uniform(0.98, 1.0)
-        close_price = current_price
-        volume = random.randint(1000000, 50000000)
-        
-        historical.append({
-            'Date': date.strftime('%Y-%m-%d'),
-            'Open': round(open_price, 2),
-            'High': round(high_price, 2),
-            'Low': round(low_price, 2),
-            'Close': round(close_price, 2),
-            'Volume': volume
-        })
-    
-    return historical
+TRADING_DAYS = 250
+# Auto-rejection: a close never moves more than this from the previous one
+PRICE_LIMIT = 0.25
+MIN_PRICE = 50
+# (upper bound of the price band, tick size)
+TICKS = [(200, 1), (500, 2), (2000, 5), (5000, 10), (np.inf, 25)]
+LOT = 100
+# Share of symbols that list partway through the history, and that have one suspension
+LISTING_SHARE = 0.1
+SUSPENSION_SHARE = 0.05
 
-def generate_test_stock_data(symbol, info):
-    """Generate comprehensive test data for a single stock"""
-    base_price = random.uniform(500, 25000)
-    current_price = base_price * random.uniform(0.9, 1.1)
-    prev_close = current_price / random.uniform(0.97, 1.03)
-    day_change = current_price - prev_close
-    day_change_percent = (day_change / prev_close) * 100
-    
-    # Generate historical data
-    historical = generate_historical_data(base_price)
-    
-    # Calculate technical indicators from historical
-    closes = [h['Close'] for h in historical]
-    ma_20 = sum(closes[-20:]) / 20 if len(closes) >= 20 else None
-    ma_50 = sum(closes[-50:]) / 50 if len(closes) >= 50 else None
-    ma_200 = sum(closes[-200:]) / 200 if len(closes) >= 200 else None
-    
-    # Performance metrics
-    perf_1d = ((closes[-1] / closes[-2]) - 1) * 100 if len(closes) >= 2 else 0
-    perf_1w = ((closes[-1] / closes[-5]) - 1) * 100 if len(closes) >= 5 else 0
-    perf_1m = ((closes[-1] / closes[-22]) - 1) * 100 if len(closes) >= 22 else 0
-    
-    return {
-        'symbol': symbol,
-        'basic': {
-            'name': info['name'],
-            'price': round(current_price, 2),
-            'previousClose': round(prev_close, 2),
-            'dayChange': round(day_change, 2),
-            'dayChangePercent': round(day_change_percent, 2),
-            'volume': random.randint(1000000, 100000000),
-            'avgVolume': random.randint(5000000, 50000000),
-            'dayHigh': round(current_price * random.uniform(1.0, 1.02), 2),
-            'dayLow': round(current_price * random.uniform(0.98, 1.0), 2),
-            'fiftyTwoWeekHigh': round(max(closes) * 1.05, 2),
-            'fiftyTwoWeekLow': round(min(closes) * 0.95, 2),
-            'marketCap': random.randint(10000000000, 500000000000000),
-            'sharesOutstanding': random.randint(1000000000, 50000000000),
-            'float': random.randint(500000000, 25000000000),
-            'beta': round(random.uniform(0.5, 1.5), 2),
-            'currency': 'IDR'
-        },
-        'fundamentals': {
-            'pe': round(random.uniform(5, 35), 2) if random.random() > 0.1 else None,
-            'forwardPE': round(random.uniform(5, 30), 2) if random.random() > 0.2 else None,
-            'peg': round(random.uniform(0.5, 3), 2) if random.random() > 0.3 else None,
-            'pb': round(random.uniform(0.5, 5), 2) if random.random() > 0.1 else None,
-            'ps': round(random.uniform(0.5, 10), 2) if random.random() > 0.2 else None,
-            'eps': round(random.uniform(50, 2000), 2) if random.random() > 0.1 else None,
-            'forwardEps': round(random.uniform(60, 2200), 2) if random.random() > 0.2 else None,
-            'dividendYield': round(random.uniform(0, 5), 2) if random.random() > 0.3 else None,
-            'dividendRate': round(random.uniform(0, 500), 2) if random.random() > 0.4 else None,
-            'payoutRatio': round(random.uniform(0.1, 0.7), 2) if random.random() > 0.4 else None,
-            'roe': round(random.uniform(0.05, 0.3), 4) if random.random() > 0.2 else None,
-            'roa': round(random.uniform(0.01, 0.15), 4) if random.random() > 0.2 else None,
-            'grossMargin': round(random.uniform(0.1, 0.6), 4) if random.random() > 0.3 else None,
-            'operatingMargin': round(random.uniform(0.05, 0.3), 4) if random.random() > 0.3 else None,
-            'profitMargin': round(random.uniform(0.02, 0.2), 4) if random.random() > 0.3 else None,
-            'debtToEquity': round(random.uniform(0.1, 2), 2) if random.random() > 0.2 else None,
-            'currentRatio': round(random.uniform(0.8, 3), 2) if random.random() > 0.2 else None,
-            'quickRatio': round(random.uniform(0.5, 2.5), 2) if random.random() > 0.3 else None,
-            'bookValue': round(random.uniform(100, 5000), 2) if random.random() > 0.2 else None,
-            'revenuePerShare': round(random.uniform(500, 10000), 2) if random.random() > 0.3 else None,
-            'totalCashPerShare': round(random.uniform(50, 2000), 2) if random.random() > 0.3 else None,
-            'enterpriseValue': random.randint(10000000000, 600000000000000) if random.random() > 0.2 else None,
-            'evToRevenue': round(random.uniform(1, 20), 2) if random.random() > 0.3 else None,
-            'evToEbitda': round(random.uniform(5, 25), 2) if random.random() > 0.3 else None
-        },
-        'technicals': {
-            'ma_20': round(ma_20, 2) if ma_20 else None,
-            'ma_50': round(ma_50, 2) if ma_50 else None,
-            'ma_200': round(ma_200, 2) if ma_200 else None,
-            'rsi_14': round(random.uniform(30, 70), 2),
-            'perf_1d': round(perf_1d, 2),
-            'perf_1w': round(perf_1w, 2),
-            'perf_1m': round(perf_1m, 2),
-            'perf_3m': round(random.uniform(-20, 30), 2),
-            'perf_ytd': round(random.uniform(-15, 25), 2)
-        },
-        'company': {
-            'sector': info['sector'],
-            'industry': f"{info['sector']} Industry",
-            'fullTimeEmployees': random.randint(100, 50000) if random.random() > 0.3 else None,
-            'website': f"https://www.{symbol.lower().replace('.jk', '')}.co.id",
-            'description': f"{info['name']} is a leading company in the {info['sector']} sector in Indonesia.",
-            'country': 'Indonesia',
-            'city': 'Jakarta',
-            'address': f"{random.randint(1, 100)} Jl. Sudirman"
-        },
-        'financials': {
-            'revenue': random.randint(1000000000, 100000000000000) if random.random() > 0.2 else None,
-            'netIncome': random.randint(100000000, 10000000000000) if random.random() > 0.2 else None,
-            'totalAssets': random.randint(5000000000, 500000000000000) if random.random() > 0.2 else None,
-            'totalLiabilities': random.randint(2000000000, 300000000000000) if random.random() > 0.3 else None,
-            'totalEquity': random.randint(1000000000, 200000000000000) if random.random() > 0.3 else None,
-            'operatingCashFlow': random.randint(500000000, 50000000000000) if random.random() > 0.3 else None,
-            'freeCashFlow': random.randint(200000000, 30000000000000) if random.random() > 0.4 else None
-        },
-        'historical': {
-            'daily': historical[-30:],  # Last 30 days for preview
-            'monthly': historical[::30]  # Monthly samples
-        },
-        'lastUpdate': datetime.now(JKT_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+def tickers(count: int) -> List[str]:
+    """The STOCKS symbols, then generated four-letter tickers"""
+    symbols = list(STOCKS)[:count]
+    i = 0
+    while len(symbols) < count:
+        code = ''.join(chr(65 + i // 26 ** power % 26) for power in (3, 2, 1, 0))
+        if f'{code}.JK' not in STOCKS:
+            symbols.append(f'{code}.JK')
+        i += 1
+    return symbols
+
+def to_tick(prices: np.ndarray) -> np.ndarray:
+    """Round prices to the IDX tick size of their price band"""
+    tick = np.select([prices < bound for bound, _ in TICKS], [size for _, size in TICKS])
+    return np.maximum(np.round(prices / tick) * tick, MIN_PRICE)
+
+def simulate(symbols: int, days: int, rng: np.random.Generator, sectors: np.ndarray) -> Dict[str, np.ndarray]:
+    """(days x symbols) Open/High/Low/Close/Volume arrays; NaN rows before listing and while suspended"""
+    dt = 1 / TRADING_DAYS
+    drift = rng.normal(0.08, 0.1, symbols)
+    vol = rng.uniform(0.2, 0.6, symbols)
+    beta = rng.uniform(0.5, 1.5, symbols)
+    sector_load = rng.uniform(0.2, 0.8, symbols)
+
+    market = rng.normal(0, 0.15 * np.sqrt(dt), days)
+    sector_moves = rng.normal(0, 0.1 * np.sqrt(dt), (days, len(SECTORS)))[:, sectors]
+    # Student-t shocks (4 degrees of freedom) scaled to unit variance for fat tails
+    shocks = rng.standard_t(4, (days, symbols)) / np.sqrt(2)
+    idiosyncratic = vol * np.sqrt(dt) * shocks
+    returns = (drift - 0.5 * vol ** 2) * dt + beta * market[:, None] + sector_load * sector_moves + idiosyncratic
+    returns = np.clip(returns, np.log(1 - PRICE_LIMIT), np.log(1 + PRICE_LIMIT))
+
+    # Part of each day's move happens overnight, plus occasional news gaps
+    news = rng.random((days, symbols)) < 0.01
+    gap = np.clip(0.3 * returns + news * rng.normal(0, 0.04, (days, symbols)),
+                  np.log(1 - PRICE_LIMIT), np.log(1 + PRICE_LIMIT))
+    start = np.exp(rng.normal(np.log(2000), 1.2, symbols)).clip(MIN_PRICE * 2, 50000)
+    close = start * np.exp(np.cumsum(returns, axis=0))
+    previous = np.vstack([start, close[:-1]])
+    open_ = previous * np.exp(gap)
+    spread = np.abs(rng.normal(0, 0.5, (2, days, symbols))) * vol * np.sqrt(dt)
+    high = np.maximum(open_, close) * np.exp(spread[0])
+    low = np.minimum(open_, close) * np.exp(-spread[1])
+    open_, high, low, close = (to_tick(prices) for prices in (open_, high, low, close))
+
+    # Volume: a lognormal baseline per symbol, persistent daily noise, and spikes on large moves
+    baseline = np.exp(rng.normal(np.log(5e6), 1.0, symbols))
+    noise = pd.DataFrame(rng.normal(0, 0.35, (days, symbols))).ewm(alpha=0.3).mean().to_numpy()
+    activity = np.exp(noise + 12 * np.abs(returns))
+    volume = np.round(baseline * activity / LOT) * LOT
+
+    missing = np.zeros((days, symbols), dtype=bool)
+    listed = rng.random(symbols) < LISTING_SHARE
+    missing[np.arange(days)[:, None] < np.where(listed, rng.integers(0, days // 2, symbols), 0)] = True
+    for column in np.flatnonzero(rng.random(symbols) < SUSPENSION_SHARE):
+        first = rng.integers(days // 2, days - 5)
+        missing[first:first + rng.integers(5, 60), column] = True
+    bars = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+    for values in bars.values():
+        values[missing] = np.nan
+    return bars
+
+def draws(rng: np.random.Generator, count: int, low: float, high: float, present: float, digits: int = 2) -> List:
+    """`count` uniform values, each None with probability 1 - `present`"""
+    values = np.round(rng.uniform(low, high, count), digits).tolist()
+    keep = (rng.random(count) < present).tolist()
+    return [value if kept else None for value, kept in zip(values, keep)]
+
+def fundamentals(rng: np.random.Generator, count: int, prices: np.ndarray) -> List[Dict]:
+    """Fundamentals per symbol, drawn column-wise; EPS is consistent with price and P/E"""
+    columns = {
+        'pe': draws(rng, count, 5, 35, 0.9),
+        'forwardPE': draws(rng, count, 5, 30, 0.8),
+        'peg': draws(rng, count, 0.5, 3, 0.7),
+        'pb': draws(rng, count, 0.5, 5, 0.9),
+        'ps': draws(rng, count, 0.5, 10, 0.8),
+        'eps': None,
+        'forwardEps': None,
+        'dividendYield': draws(rng, count, 0, 5, 0.7),
+        'dividendRate': draws(rng, count, 0, 500, 0.6),
+        'payoutRatio': draws(rng, count, 0.1, 0.7, 0.6),
+        'roe': draws(rng, count, 0.05, 0.3, 0.8, 4),
+        'roa': draws(rng, count, 0.01, 0.15, 0.8, 4),
+        'grossMargin': draws(rng, count, 0.1, 0.6, 0.7, 4),
+        'operatingMargin': draws(rng, count, 0.05, 0.3, 0.7, 4),
+        'profitMargin': draws(rng, count, 0.02, 0.2, 0.7, 4),
+        'debtToEquity': draws(rng, count, 0.1, 2, 0.8),
+        'currentRatio': draws(rng, count, 0.8, 3, 0.8),
+        'quickRatio': draws(rng, count, 0.5, 2.5, 0.7),
+        'bookValue': draws(rng, count, 100, 5000, 0.8),
+        'revenuePerShare': draws(rng, count, 500, 10000, 0.7),
+        'totalCashPerShare': draws(rng, count, 50, 2000, 0.7),
+        'enterpriseValue': None,
+        'evToRevenue': draws(rng, count, 1, 20, 0.7),
+        'evToEbitda': draws(rng, count, 5, 25, 0.7)
     }
+    columns['eps'] = [round(price / pe, 2) if pe else None for price, pe in zip(prices.tolist(), columns['pe'])]
+    columns['forwardEps'] = [round(price / pe, 2) if pe else None for price, pe in zip(prices.tolist(), columns['forwardPE'])]
+    columns['enterpriseValue'] = [int(value) if value else None for value in draws(rng, count, 1e10, 6e14, 0.8, 0)]
+    return [{field: values[i] for field, values in columns.items()} for i in range(count)]
 
-def main():
-    # Create directory structure
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(base_dir, 'data')
-    
+def financials(rng: np.random.Generator, count: int) -> List[Dict]:
+    columns = {
+        'revenue': draws(rng, count, 1e9, 1e14, 0.8, 0),
+        'netIncome': draws(rng, count, 1e8, 1e13, 0.8, 0),
+        'totalAssets': draws(rng, count, 5e9, 5e14, 0.8, 0),
+        'totalLiabilities': draws(rng, count, 2e9, 3e14, 0.7, 0),
+        'totalEquity': draws(rng, count, 1e9, 2e14, 0.7, 0),
+        'operatingCashFlow': draws(rng, count, 5e8, 5e13, 0.7, 0),
+        'freeCashFlow': draws(rng, count, 2e8, 3e13, 0.6, 0)
+    }
+    return [{field: int(values[i]) if values[i] is not None else None for field, values in columns.items()}
+            for i in range(count)]
+
+def _value(array: np.ndarray, digits: int = 2):
+    return round(float(array), digits) if np.isfinite(array) else None
+
+def monthly_bars(days: np.ndarray, columns: Dict[str, np.ndarray], cutoff: int) -> pd.DataFrame:
+    """Month-start bars from day `cutoff` on, as merge_monthly builds them for an empty store
+
+    `days` are one symbol's traded days (days since 1970-01-01). As in merge_monthly,
+    a partial first month is left out.
+    """
+    if not len(days):
+        return empty_frame()
+    months = period_starts(days, '1mo')
+    start = 0 if days[0] == months[0] else int(np.searchsorted(months, months[0], side='right'))
+    keys, bars = resample_arrays(days[start:], {field: values[start:] for field, values in columns.items()}, '1mo')
+    keep = keys >= cutoff
+    return pd.DataFrame({field: bars[field][keep] for field in HISTORY_FIELDS},
+                        index=pd.DatetimeIndex(keys[keep].astype('datetime64[D]'), name='Date'))
+
+def generate(data_dir: str, count: int = len(STOCKS), years: float = 5, seed: int = 42,
+             sidecars: bool = False) -> Tuple[int, float, float]:
+    """Write `count` symbols with `years` of daily bars to `data_dir`; returns (bars, simulate s, write s)"""
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    now = datetime.now(JKT_TZ)
+    last_update = now.strftime('%Y-%m-%d %H:%M:%S %Z')
+    symbols = tickers(count)
+    info = [STOCKS.get(symbol) or {'name': f"{symbol[:-3]} Tbk", 'sector': SECTORS[i % len(SECTORS)]}
+            for i, symbol in enumerate(symbols)]
+    sectors = np.array([SECTORS.index(entry['sector']) for entry in info])
+    days = int(years * TRADING_DAYS)
+    dates = pd.bdate_range(end=pd.Timestamp(now.date()) - pd.offsets.BDay(1), periods=days)
+    bars = simulate(count, days, rng, sectors)
+    day_numbers = dates.values.astype('datetime64[D]').astype('int64')
+    monthly_cutoff = np.datetime64((now - timedelta(days=MONTHLY_WINDOW_DAYS)).date(), 'D').astype('int64')
+
+    # Latest quote per symbol from its last traded bar
+    traded = ~np.isnan(bars['Close'])
+    last = days - 1 - np.argmax(traded[::-1], axis=0)
+    column = np.arange(count)
+    price = bars['Close'][last, column]
+    previous = pd.DataFrame(bars['Close']).ffill().shift(1).to_numpy()[last, column]
+    year = slice(-TRADING_DAYS, None)
+    quote = {
+        'volume': bars['Volume'][last, column],
+        'avgVolume': np.nanmean(bars['Volume'][-63:], axis=0),
+        'dayHigh': bars['High'][last, column],
+        'dayLow': bars['Low'][last, column],
+        'fiftyTwoWeekHigh': np.nanmax(bars['High'][year], axis=0),
+        'fiftyTwoWeekLow': np.nanmin(bars['Low'][year], axis=0)
+    }
+    shares = np.round(np.exp(rng.normal(np.log(5e9), 1.0, count)), -6)
+    market_caps = np.round(price * shares)
+    technicals = compute_technicals(pd.DataFrame(bars['Close'], index=dates, columns=symbols), now.replace(tzinfo=None))
+    fundamentals_rows = fundamentals(rng, count, price)
+    financials_rows = financials(rng, count)
+    employees = draws(rng, count, 100, 50000, 0.7, 0)
+    simulate_time = time.perf_counter() - started
+
+    started = time.perf_counter()
     os.makedirs(os.path.join(data_dir, 'stocks'), exist_ok=True)
     os.makedirs(os.path.join(data_dir, 'historicals'), exist_ok=True)
-    
-    # Generate data for each stock
-    index_data = {
-        'stocks': [],
-        'last_update': datetime.now(JKT_TZ).strftime('%Y-%m-%d %H:%M:%S %Z'),
-        'total_stocks': len(STOCKS)
-    }
-    
+    manifest = Manifest(os.path.join(data_dir, 'manifest.json'), os.path.dirname(os.path.abspath(data_dir)))
+    write = lambda obj, path: manifest.write(obj, path, last_update, sidecars)
+    index_data = {'stocks': [], 'last_update': last_update, 'total_stocks': count}
     fundamentals_data = {}
-    screener_cache = {
-        'value_stocks': [],
-        'growth_stocks': [],
-        'large_cap': [],
-        'sectors': {}
-    }
-    
-    for symbol, info in STOCKS.items():
-        print(f"Generating test data for {symbol}...")
-        
-        # Generate comprehensive stock data
-        stock_data = generate_test_stock_data(symbol, info)
-        
-        # Save individual stock file
-        stock_file = os.path.join(data_dir, 'stocks', f'{symbol.replace(".JK", "")}.json')
-        with open(stock_file, 'w') as f:
-            json.dump(stock_data, f, indent=2)
-        
-        # Save historical data
-        hist_file = os.path.join(data_dir, 'historicals', f'{symbol.replace(".JK", "")}_daily.json')
-        historical_full = generate_historical_data(stock_data['basic']['price'], 365)
-        with open(hist_file, 'w') as f:
-            json.dump(historical_full, f)
-        
-        # Add to index
+    screener_rows = []
+    total_bars = 0
+
+    for i, symbol in enumerate(symbols):
+        clean = symbol.replace('.JK', '')
+        rows = traded[:, i]
+        columns = {field: values[rows, i] for field, values in bars.items()}
+        daily = pd.DataFrame(columns, index=pd.DatetimeIndex(dates[rows], name='Date'))
+        total_bars += len(daily)
+        save_daily(symbol, daily, data_dir)
+        save_state(symbol, IndicatorState.from_history(daily), data_dir)
+        recent = frame_to_records(window(daily, DAILY_WINDOW_DAYS, now.replace(tzinfo=None)))
+        write(recent, os.path.join(data_dir, 'historicals', f'{clean}_daily.json'))
+        write(chart_records(daily), weekly_path(symbol, data_dir))
+
+        basic = {
+            'name': info[i]['name'],
+            'price': _value(price[i]),
+            'previousClose': _value(previous[i]),
+            'dayChange': _value(price[i] - previous[i]),
+            'dayChangePercent': _value((price[i] / previous[i] - 1) * 100),
+            'volume': int(quote['volume'][i]),
+            'avgVolume': int(quote['avgVolume'][i]),
+            'dayHigh': _value(quote['dayHigh'][i]),
+            'dayLow': _value(quote['dayLow'][i]),
+            'fiftyTwoWeekHigh': _value(quote['fiftyTwoWeekHigh'][i]),
+            'fiftyTwoWeekLow': _value(quote['fiftyTwoWeekLow'][i]),
+            'marketCap': int(market_caps[i]),
+            'sharesOutstanding': int(shares[i]),
+            'float': int(shares[i] * 0.4),
+            'beta': None,
+            'currency': 'IDR'
+        }
+        stock_data = {
+            'symbol': symbol,
+            'basic': basic,
+            'fundamentals': fundamentals_rows[i],
+            'technicals': technicals[symbol],
+            'company': {
+                'sector': info[i]['sector'],
+                'industry': f"{info[i]['sector']} Industry",
+                'fullTimeEmployees': int(employees[i]) if employees[i] is not None else None,
+                'website': f"https://www.{clean.lower()}.co.id",
+                'description': f"{info[i]['name']} is a listed company in the {info[i]['sector']} sector in Indonesia.",
+                'country': 'Indonesia',
+                'city': 'Jakarta',
+                'address': f"{i % 100 + 1} Jl. Sudirman"
+            },
+            'financials': financials_rows[i],
+            'historical': {
+                'daily': recent,
+                'monthly': frame_to_records(monthly_bars(day_numbers[rows], columns, monthly_cutoff))
+            },
+            'lastUpdate': last_update
+        }
+        write(stock_data, os.path.join(data_dir, 'stocks', f'{clean}.json'))
+
         index_entry = {
             'symbol': symbol,
-            'name': info['name'],
-            'price': stock_data['basic']['price'],
-            'change': stock_data['basic']['dayChange'],
-            'changePercent': stock_data['basic']['dayChangePercent'],
-            'volume': stock_data['basic']['volume'],
-            'marketCap': stock_data['basic']['marketCap'],
-            'pe': stock_data['fundamentals']['pe'],
-            'sector': info['sector']
+            'name': basic['name'],
+            'price': basic['price'],
+            'change': basic['dayChange'],
+            'changePercent': basic['dayChangePercent'],
+            'volume': basic['volume'],
+            'marketCap': basic['marketCap'],
+            'pe': fundamentals_rows[i]['pe'],
+            'sector': info[i]['sector']
         }
         index_data['stocks'].append(index_entry)
-        
-        # Add to fundamentals
-        fundamentals_data[symbol] = stock_data['fundamentals']
-        
-        # Categorize for screener cache
-        if stock_data['fundamentals']['pe'] and stock_data['fundamentals']['pe'] < 15:
-            screener_cache['value_stocks'].append(index_entry)
-        if stock_data['fundamentals']['pe'] and stock_data['fundamentals']['pe'] > 20:
-            screener_cache['growth_stocks'].append(index_entry)
-        if stock_data['basic']['marketCap'] > 10000000000000:  # > 10T IDR
-            screener_cache['large_cap'].append(index_entry)
-        
-        # Group by sector
-        sector = info['sector']
-        if sector not in screener_cache['sectors']:
-            screener_cache['sectors'][sector] = []
-        screener_cache['sectors'][sector].append(index_entry)
-    
-    # Save index file
-    with open(os.path.join(data_dir, 'index.json'), 'w') as f:
-        json.dump(index_data, f, indent=2)
-    
-    # Save fundamentals file
-    with open(os.path.join(data_dir, 'fundamentals.json'), 'w') as f:
-        json.dump(fundamentals_data, f, indent=2)
-    
-    # Save screener cache
-    with open(os.path.join(data_dir, 'screener_cache.json'), 'w') as f:
-        json.dump(screener_cache, f, indent=2)
-    
-    print(f"\nTest data generation completed!")
-    print(f"Generated data for {len(STOCKS)} stocks")
-    print(f"Files saved in: {data_dir}")
+        fundamentals_data[symbol] = fundamentals_rows[i]
+        screener_rows.append({**index_entry, **{field: basic[field] for field in QUOTE_FIELDS}, **fundamentals_rows[i],
+                              'industry': stock_data['company']['industry'], **technicals[symbol]})
+
+    write(index_data, os.path.join(data_dir, 'index.json'))
+    write(fundamentals_data, os.path.join(data_dir, 'fundamentals.json'))
+    screener_table = build_table(screener_rows, last_update)
+    write(screener_table, os.path.join(data_dir, 'screener.json'))
+    write(build_index(screener_rows, INDEX_MEMBERS).to_dict(last_update), os.path.join(data_dir, 'categories.json'))
+    write(compute_leaders(screener_table), os.path.join(data_dir, 'leaders.json'))
+    caps = {stock['symbol']: stock['marketCap'] for stock in index_data['stocks']}
+    write(correlation.build(data_dir, caps), os.path.join(data_dir, 'correlation.json'))
+    manifest.save(last_update)
+    return total_bars, simulate_time, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=len(STOCKS))
+    parser.add_argument('--years', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', required=True,
+                        help="where to write the fixture; pass the repo's data/ explicitly to replace the live files")
+    parser.add_argument('--sidecars', action='store_true', help='also write the .gz/.br copies (the app builds missing ones on request)')
+    args = parser.parse_args()
+
+    bars, simulate_time, write_time = generate(args.data_dir, args.symbols, args.years, args.seed, args.sidecars)
+    print(f"Generated {args.symbols} symbols, {bars} daily bars (seed {args.seed})")
+    print(f"  simulate: {simulate_time:.2f}s, write: {write_time:.2f}s")
+    print(f"Files saved in: {args.data_dir}")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,132 @@
+"""
+Hedged first-wins racing over an ordered list of data sources
+A source that has not answered within its recent latency percentile gets the
+next source launched alongside it; the first valid answer wins and the rest are
+cancelled, or abandoned (left to finish, result ignored) if already running.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from rate_limiter import TokenBucket
+
+class SourceStats:
+    """Per-source launches, wins and latencies, shared across symbols"""
+
+    def __init__(self, percentile: Optional[float] = 0.9, default_delay: float = 1.0, min_samples: int = 5):
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.hedged = 0
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def _source(self, name: str) -> Dict:
+        return self._sources.setdefault(name, {
+            'launched': 0, 'wins': 0, 'failures': 0, 'cancelled': 0, 'abandoned': 0, 'latencies': []
+        })
+
+    def count(self, name: str, field: str):
+        with self._lock:
+            self._source(name)[field] += 1
+
+    def count_hedge(self):
+        with self._lock:
+            self.hedged += 1
+
+    def record(self, name: str, elapsed: float, ok: bool):
+        with self._lock:
+            source = self._source(name)
+            source['latencies'].append(elapsed)
+            if not ok:
+                source['failures'] += 1
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds to wait on `name` before hedging: its latency percentile once it has enough samples
+
+        Without a percentile there is no hedging: each source is waited on until it
+        answers, as in a plain cascade.
+        """
+        if self.percentile is None:
+            return None
+        with self._lock:
+            latencies = sorted(self._source(name)['latencies'])
+        if len(latencies) < self.min_samples:
+            return self.default_delay
+        return latencies[min(len(latencies) - 1, int(self.percentile * len(latencies)))]
+
+    def summary(self) -> Dict:
+        """Win rates and latency percentiles per source, for `data_quality`"""
+        with self._lock:
+            sources = {name: dict(source, latencies=sorted(source['latencies'])) for name, source in self._sources.items()}
+        report = {}
+        for name, source in sources.items():
+            latencies = source.pop('latencies')
+            pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+            report[name] = {
+                **source,
+                'win_rate': round(source['wins'] / source['launched'], 3) if source['launched'] else 0.0,
+                'p50_ms': pick(0.5),
+                'p95_ms': pick(0.95)
+            }
+        return {'sources': report, 'hedged': self.hedged, 'hedge_percentile': self.percentile}
+
+def first_valid(executor: Executor, sources: List[Tuple[str, Callable[[], Any]]], stats: SourceStats,
+                valid: Callable[[Any], bool] = bool, limiter: Optional[TokenBucket] = None) -> Tuple[Optional[str], Any]:
+    """Race `sources` in order with hedging; returns (winning source name, result) or (None, None)
+
+    Source callables should return None (or raise) when they have no usable answer;
+    a failure launches the next source straight away. With a `limiter`, each launch
+    takes a token first, so hedges and fallbacks share the request budget.
+    """
+    queue = list(sources)
+    pending = {}
+    latest = None
+
+    def timed(name: str, fn: Callable[[], Any]):
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            print(f"  {name} error: {e}")
+            result = None
+        # Recorded even for losers, so slow sources keep a realistic percentile
+        stats.record(name, time.perf_counter() - started, valid(result) if result is not None else False)
+        return result
+
+    def launch():
+        nonlocal latest
+        name, fn = queue.pop(0)
+        if limiter is not None:
+            limiter.acquire()
+        stats.count(name, 'launched')
+        pending[executor.submit(timed, name, fn)] = name
+        latest = name
+
+    launch()
+    while pending:
+        done, _ = wait(pending, timeout=stats.hedge_delay(latest) if queue else None, return_when=FIRST_COMPLETED)
+        if not done:
+            # The newest source is slower than usual: hedge with the next one
+            stats.count_hedge()
+            launch()
+            continue
+
+        # `pending` is in launch (priority) order, so of several answers in one wait the earliest source wins
+        for future in [future for future in pending if future in done]:
+            name = pending.pop(future)
+            result = future.result()
+            if result is not None and valid(result):
+                for loser, loser_name in pending.items():
+                    # A loser that already finished just goes unused; one that is running
+                    # cannot be cancelled and finishes in the background
+                    if not loser.done():
+                        stats.count(loser_name, 'cancelled' if loser.cancel() else 'abandoned')
+                stats.count(name, 'wins')
+                return name, result
+        # Everything that finished failed, so move on without waiting out the delay
+        if queue:
+            launch()
+
+    return None, None
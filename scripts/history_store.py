@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Columnar store for daily OHLCV bars
+Each symbol's full daily history lives in data/historicals/<SYM>_daily.npy as a
+(bars x 6) float64 array: day number since 1970-01-01, then Open/High/Low/Close/Volume.
+The <SYM>_daily.json files read by the browser are exported from it. The store
+is not committed (the update workflow keeps it in the Actions cache); without it,
+histories start again from the exported JSON.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import serializer
+from batch_history import HISTORY_FIELDS, resample_ohlc
+from manifest import Manifest, now_string
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Trailing windows exported to data/historicals/*.json and the stock files
+DAILY_WINDOW_DAYS = 365
+MONTHLY_WINDOW_DAYS = 365 * 5
+# Refetches overlap the stored history by this many days; auto-adjusted closes that
+# moved by more than REBASE_TOLERANCE on those days mean a dividend or split re-based them
+REBASE_OVERLAP_DAYS = 10
+REBASE_TOLERANCE = 0.001
+
+def _clean(symbol: str) -> str:
+    return symbol.replace('.JK', '')
+
+def store_path(symbol: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, 'historicals', f'{_clean(symbol)}_daily.npy')
+
+def json_path(symbol: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, 'historicals', f'{_clean(symbol)}_daily.json')
+
+def empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=HISTORY_FIELDS, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+
+def records_to_frame(records) -> pd.DataFrame:
+    """Turn stored [{'Date': ..., 'Open': ...}, ...] records into a Date-indexed frame"""
+    if not records:
+        return empty_frame()
+
+    frame = pd.DataFrame.from_records(records)
+    frame.index = pd.DatetimeIndex(pd.to_datetime(frame.pop('Date')), name='Date')
+    return frame.reindex(columns=HISTORY_FIELDS).astype(float)
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """Vectorized round(v, 2) with the exact results of Python's round
+
+    np.round scales by 100 and rounds half to even, which can only disagree with
+    Python's correctly rounded decimal result when v * 100 sits within float error
+    of a .5 boundary; those few values go through round() itself.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    suspect = (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | (np.abs(values) >= 1e13)
+    suspect &= np.isfinite(values)
+    if suspect.any():
+        rounded[suspect] = [round(v, 2) for v in values[suspect].tolist()]
+    return rounded
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict]:
+    """Format bars as the JSON records the browser reads (Date string, 2dp prices, int volume)
+
+    Formatting is done per column; the records are only zipped together at the end.
+    """
+    if frame.empty:
+        return []
+
+    columns = {'Date': frame.index.strftime('%Y-%m-%d').tolist()}
+    for field in frame.columns:
+        values = frame[field].to_numpy()
+        if field in ('Open', 'High', 'Low', 'Close'):
+            values = _round2(values.astype(float))
+        elif field == 'Volume':
+            if np.isnan(values.astype(float)).any():
+                raise ValueError("cannot convert float NaN to integer")
+            values = values.astype(np.int64)
+        columns[field] = values.tolist()
+
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+def load_daily(symbol: str, data_dir: str = DATA_DIR, mmap: bool = True) -> pd.DataFrame:
+    """Load a symbol's stored daily bars; OHLCV columns are a view on the memory-mapped file"""
+    path = store_path(symbol, data_dir)
+    if not os.path.exists(path):
+        return empty_frame()
+
+    array = np.load(path, mmap_mode='r' if mmap else None)
+    index = pd.DatetimeIndex(array[:, 0].astype('int64').astype('datetime64[D]'), name='Date')
+    return pd.DataFrame(array[:, 1:], index=index, columns=HISTORY_FIELDS, copy=False)
+
+def save_daily(symbol: str, frame: pd.DataFrame, data_dir: str = DATA_DIR):
+    """Write a symbol's full daily history to the store (atomic replace)"""
+    frame = frame.reindex(columns=HISTORY_FIELDS)
+    days = frame.index.values.astype('datetime64[D]').astype('int64').astype(float)
+    array = np.column_stack([days, frame.to_numpy(dtype=float)])
+
+    path = store_path(symbol, data_dir)
+    tmp_path = f'{path}.tmp.npy'
+    np.save(tmp_path, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+
+def export_json(symbol: str, frame: pd.DataFrame, manifest: Manifest, data_dir: str = DATA_DIR,
+                window_days: int = DAILY_WINDOW_DAYS, now: datetime = None) -> List[Dict]:
+    """Write the trailing window of `frame` as <SYM>_daily.json through `manifest`; returns the records"""
+    records = frame_to_records(window(frame, window_days, now))
+    manifest.write(records, json_path(symbol, data_dir), now_string())
+    return records
+
+def load_stored(symbol: str, data_dir: str = DATA_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Load the stored (daily, monthly) bars for `symbol`; empty frames if none
+
+    Daily bars come from the columnar store, falling back to the exported JSON for
+    symbols that have not been migrated yet.
+    """
+    daily = monthly = empty_frame()
+
+    try:
+        daily = load_daily(symbol, data_dir)
+        if daily.empty and os.path.exists(json_path(symbol, data_dir)):
+            daily = records_to_frame(serializer.load(json_path(symbol, data_dir)))
+        stock = serializer.load(os.path.join(data_dir, 'stocks', f'{_clean(symbol)}.json'))
+        monthly = records_to_frame(stock.get('historical', {}).get('monthly', []))
+    except (OSError, ValueError, KeyError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Could not read stored history for {symbol}: {e}")
+
+    return daily, monthly
+
+def last_stored_date(daily: pd.DataFrame) -> Optional[datetime]:
+    """Date of the newest stored bar, or None when nothing is stored"""
+    return daily.index[-1].to_pydatetime() if not daily.empty else None
+
+def refetch_start(daily: pd.DataFrame) -> Optional[datetime]:
+    """Where a refetch for `daily` should start: a few days before its newest bar, see `rebased`"""
+    last = last_stored_date(daily)
+    return last - timedelta(days=REBASE_OVERLAP_DAYS) if last is not None else None
+
+def rebased(stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """Whether `fresh` adjusted closes disagree with `stored` on the complete bars both hold
+
+    Yahoo's auto-adjusted history is rescaled back to the first bar whenever a dividend
+    or split goes ex, so appending to bars adjusted before the action would leave a step
+    in the stored series. The newest stored bar is left out: it may be a partial bar.
+    """
+    if stored.empty or fresh.empty:
+        return False
+    fresh = _naive(fresh)
+    closes = pd.Series(fresh['Close'].to_numpy(dtype=float), index=fresh.index.normalize())
+    shared = stored.index[:-1].intersection(closes.index)
+    if shared.empty:
+        return False
+    ratio = closes.loc[shared].to_numpy() / stored['Close'].loc[shared].to_numpy()
+    return bool((np.abs(ratio - 1) > REBASE_TOLERANCE).any())
+
+def window(frame: pd.DataFrame, days: int, now: datetime = None) -> pd.DataFrame:
+    """Trailing `days` of bars, as a positional slice"""
+    cutoff = pd.Timestamp((now or datetime.now()) - timedelta(days=days)).normalize()
+    return frame.iloc[frame.index.searchsorted(cutoff):]
+
+def _naive(frame: pd.DataFrame) -> pd.DataFrame:
+    if frame.index.tz is not None:
+        frame = frame.tz_localize(None)
+    return frame
+
+def merge_bars(stored: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Append `fresh` bars to `stored` and dedupe on Date (fresh wins)
+
+    The newest stored bar may be a partial intraday bar from an earlier run, which
+    is why refetches start before the last stored date and fresh rows replace it.
+    Check `rebased` first: appending only holds while the adjusted prices are unchanged.
+    """
+    fresh = _naive(fresh.reindex(columns=HISTORY_FIELDS))
+    fresh.index = fresh.index.normalize()
+    merged = pd.concat([stored, fresh]) if not stored.empty else fresh
+    return merged[~merged.index.duplicated(keep='last')].sort_index()
+
+def merge_monthly(stored_monthly: pd.DataFrame, daily: pd.DataFrame, now: datetime = None) -> pd.DataFrame:
+    """Rebuild monthly bars for months fully covered by `daily`, keeping older stored months"""
+    if daily.empty:
+        return stored_monthly
+
+    # The first month in the daily history is usually partial, so it stays as stored
+    first_full_month = (daily.index[0] + pd.offsets.MonthBegin(1)).normalize()
+    if daily.index[0].day == 1:
+        first_full_month = daily.index[0].normalize()
+
+    recent = resample_ohlc(daily.iloc[daily.index.searchsorted(first_full_month):])
+    older = stored_monthly.iloc[:stored_monthly.index.searchsorted(first_full_month)]
+    merged = pd.concat([older, recent]) if not older.empty else recent
+    return window(merged, MONTHLY_WINDOW_DAYS, now)
+
+def stored_symbols(data_dir: str = DATA_DIR) -> List[str]:
+    """Symbols with a columnar daily store on disk"""
+    folder = os.path.join(data_dir, 'historicals')
+    return sorted(f'{name[:-len("_daily.npy")]}.JK' for name in os.listdir(folder) if name.endswith('_daily.npy'))
+
+def migrate(data_dir: str = DATA_DIR):
+    """Build the columnar store from existing <SYM>_daily.json files"""
+    folder = os.path.join(data_dir, 'historicals')
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('_daily.json'):
+            symbol = f'{name[:-len("_daily.json")]}.JK'
+            frame = records_to_frame(serializer.load(os.path.join(folder, name)))
+            merged = merge_bars(load_daily(symbol, data_dir, mmap=False), frame)
+            save_daily(symbol, merged, data_dir)
+            print(f"Migrated {symbol}: {len(merged)} bars")
+
+def export_all(data_dir: str = DATA_DIR):
+    """Regenerate every browser JSON file from the columnar store"""
+    manifest = Manifest.for_data_dir(data_dir)
+    for symbol in stored_symbols(data_dir):
+        records = export_json(symbol, load_daily(symbol, data_dir), manifest, data_dir)
+        print(f"Exported {symbol}: {len(records)} bars")
+    manifest.save(now_string())
+
+def benchmark(symbols: int = 100, years: int = 5):
+    """Compare size and load time of full histories as JSON records against the store"""
+    import tempfile
+    from batch_history import chart_to_frame
+    from http_fixture import synthetic_chart
+
+    end = int(time.time())
+    start = end - years * 365 * 86400
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.makedirs(os.path.join(data_dir, 'historicals'))
+        names = [f'SYM{i:04d}.JK' for i in range(symbols)]
+        for symbol in names:
+            frame = chart_to_frame(synthetic_chart(symbol, start, end))
+            save_daily(symbol, frame, data_dir)
+            with open(json_path(symbol, data_dir), 'w') as f:
+                json.dump(frame_to_records(frame), f)
+
+        json_bytes = sum(os.path.getsize(json_path(s, data_dir)) for s in names)
+        store_bytes = sum(os.path.getsize(store_path(s, data_dir)) for s in names)
+
+        started = time.perf_counter()
+        for symbol in names:
+            with open(json_path(symbol, data_dir)) as f:
+                records_to_frame(json.load(f))['Close'].iloc[-1]
+        json_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for symbol in names:
+            load_daily(symbol, data_dir)['Close'].iloc[-1]
+        store_time = time.perf_counter() - started
+
+    print(f"{symbols} symbols x {years}y daily")
+    print(f"  json:  {json_bytes / 1e6:8.2f} MB  load {json_time * 1000:8.1f} ms")
+    print(f"  store: {store_bytes / 1e6:8.2f} MB  load {store_time * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['migrate', 'export', 'benchmark'])
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--symbols', type=int, default=100, help='benchmark universe size')
+    parser.add_argument('--years', type=int, default=5, help='benchmark history length')
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        benchmark(args.symbols, args.years)
+    else:
+        {'migrate': migrate, 'export': export_all}[args.command](args.data_dir)
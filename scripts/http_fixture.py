@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stub of the Yahoo chart endpoint for offline benchmarks
+Serves deterministic synthetic OHLCV for any symbol, per symbol and in batches
+"""
+
+import functools
+import json
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+
+DAY = 86400
+# Paths start here so any [period1, period2] window of a symbol sees the same bars
+EPOCH = pd.Timestamp('2010-01-01')
+
+# Lookback of the `range` query parameter, in days
+RANGE_DAYS = {'1d': 1, '5d': 5, '1mo': 31, '3mo': 92, '6mo': 183, '1y': 365, '2y': 730, '5y': 1826}
+
+@functools.lru_cache(maxsize=1024)
+def _synthetic_path(symbol: str, end: pd.Timestamp) -> pd.DataFrame:
+    """Seeded daily OHLCV random walk for `symbol` from EPOCH to `end`"""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    days = pd.bdate_range(EPOCH, end)
+    closes = rng.uniform(500, 20000) * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+    opens = closes * rng.uniform(0.98, 1.02, len(days))
+    return pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, closes) * rng.uniform(1.0, 1.02, len(days)),
+        'low': np.minimum(opens, closes) * rng.uniform(0.98, 1.0, len(days)),
+        'close': closes,
+        'volume': rng.integers(1_000_000, 50_000_000, len(days)).astype(float)
+    }, index=days)
+
+def synthetic_chart(symbol: str, period1: int, period2: int, interval: str = '1d') -> Dict:
+    """Build a v8 chart `result` with a seeded random walk for `symbol`"""
+    frame = _synthetic_path(symbol, pd.Timestamp(period2, unit='s').normalize())
+    frame = frame.iloc[frame.index.searchsorted(pd.Timestamp(period1, unit='s').normalize()):]
+
+    if interval == '1mo':
+        frame = frame.resample('MS').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    elif interval == '1wk':
+        frame = frame.resample('W-MON', label='left', closed='left').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    frame = frame.dropna()
+
+    last_close = float(frame['close'].iloc[-1]) if len(frame) else 0.0
+    previous_close = float(frame['close'].iloc[-2]) if len(frame) > 1 else last_close
+    return {
+        'meta': {
+            'symbol': symbol,
+            'currency': 'IDR',
+            'regularMarketPrice': round(last_close, 2),
+            'previousClose': round(previous_close, 2),
+            'chartPreviousClose': round(previous_close, 2),
+            'regularMarketTime': int(time.time()),
+            'regularMarketVolume': int(frame['volume'].iloc[-1]) if len(frame) else 0,
+            'regularMarketDayHigh': round(float(frame['high'].iloc[-1]), 2) if len(frame) else 0,
+            'regularMarketDayLow': round(float(frame['low'].iloc[-1]), 2) if len(frame) else 0,
+            'fiftyTwoWeekHigh': round(float(frame['high'].max()), 2) if len(frame) else 0,
+            'fiftyTwoWeekLow': round(float(frame['low'].min()), 2) if len(frame) else 0
+        },
+        'timestamp': [int(ts.timestamp()) for ts in frame.index],
+        'indicators': {'quote': [{column: frame[column].round(2).tolist() for column in frame.columns}]}
+    }
+
+class ChartStubHandler(BaseHTTPRequestHandler):
+    """Answers /v8/finance/chart/<SYM> and /batch/chart?symbols=A,B (period1/period2 or range)"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        now = int(time.time())
+        lookback = RANGE_DAYS.get(params.get('range'), 365)
+        period1 = int(params.get('period1', now - lookback * DAY))
+        period2 = int(params.get('period2', now))
+        interval = params.get('interval', '1d')
+
+        with server.lock:
+            server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        if url.path.startswith('/v8/finance/chart/'):
+            symbol = url.path.rsplit('/', 1)[-1]
+            body = {'chart': {'result': [synthetic_chart(symbol, period1, period2, interval)], 'error': None}}
+        elif url.path == '/batch/chart':
+            symbols = [s for s in params.get('symbols', '').split(',') if s]
+            body = {symbol: synthetic_chart(symbol, period1, period2, interval) for symbol in symbols}
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class ChartStubServer(ThreadingHTTPServer):
+    """Threaded stub server with request/connection counters and optional latency
+
+    `latency` is added to every response and `handshake` to every new connection,
+    standing in for the TCP + TLS setup a real HTTPS host costs.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, handshake: float = 0.0):
+        super().__init__(('127.0.0.1', port), ChartStubHandler)
+        self.latency = latency
+        self.handshake = handshake
+        self.request_count = 0
+        self.connection_count = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Clients that hang up early (deadlines, timeouts) are expected
+        import sys
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def start(self) -> 'ChartStubServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def fixture_downloader(base_url: str, session=None):
+    """Return a `batch_history` downloader that fetches one batch per request from the stub"""
+    import requests
+    from batch_history import chart_to_frame
+
+    session = session or requests.Session()
+
+    def download(symbols: List[str], start: datetime, end: datetime, interval: str = '1d') -> pd.DataFrame:
+        response = session.get(f"{base_url}/batch/chart", params={
+            'symbols': ','.join(symbols),
+            'period1': int(pd.Timestamp(start).timestamp()),
+            'period2': int(pd.Timestamp(end).timestamp()),
+            'interval': interval
+        }, timeout=30)
+        response.raise_for_status()
+        frames = {symbol: chart_to_frame(result) for symbol, result in response.json().items()}
+        return pd.concat(frames, axis=1)
+
+    return download
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--handshake', type=float, default=0.0, help='seconds added to every new connection')
+    args = parser.parse_args()
+
+    server = ChartStubServer(args.port, args.latency, args.handshake)
+    print(f"Serving Yahoo chart stub on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
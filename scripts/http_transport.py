@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the scrapers
+One pooled keep-alive session per process with gzip, retries with exponential
+backoff and a per-call timeout budget, plus connection and per-host latency stats.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+# Statuses worth another attempt; anything else is returned to the caller as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TransportTimeout(requests.Timeout):
+    """The call's timeout budget ran out before a usable response arrived"""
+
+class HostStats:
+    """Request, retry and latency counters for one host"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.latencies = []
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'p50_ms': pick(0.5),
+            'p95_ms': pick(0.95),
+            'max_ms': round(latencies[-1] * 1000, 1) if latencies else None
+        }
+
+class Transport:
+    """Pooled requests session with retries, backoff and a timeout budget
+
+    `timeout` bounds a single attempt and `budget` bounds a whole call including
+    retries and backoff sleeps, so a flaky host cannot stall a scrape run.
+    """
+
+    def __init__(self, pool_size: int = 10, retries: int = 3, backoff: float = 0.5,
+                 timeout: float = 10.0, budget: float = 30.0, headers: Optional[Dict] = None):
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.budget = budget
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.headers.update(headers or {})
+        # Retries are handled in `request` so they stay inside the budget
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._adapter = adapter
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> HostStats:
+        with self._lock:
+            return self._stats.setdefault(host, HostStats())
+
+    def request(self, method: str, url: str, budget: float = None, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors and retryable statuses within the budget"""
+        stats = self._host(urlparse(url).netloc)
+        deadline = time.monotonic() + (budget if budget is not None else self.budget)
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    stats.errors += 1
+                raise TransportTimeout(f"timeout budget exhausted for {url}")
+
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=min(self.timeout, remaining), **kwargs)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                stats.requests += 1
+                stats.latencies.append(elapsed)
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            if not retryable or attempt >= self.retries:
+                if error is not None:
+                    with self._lock:
+                        stats.errors += 1
+                    raise error
+                return response
+
+            delay = self.backoff * 2 ** attempt
+            retry_after = response.headers.get('Retry-After') if response is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            if delay >= deadline - time.monotonic():
+                with self._lock:
+                    stats.errors += 1
+                if error is not None:
+                    raise error
+                return response
+
+            with self._lock:
+                stats.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def get_json(self, url: str, **kwargs) -> Dict:
+        """GET `url` and decode the JSON body; raises for non-2xx statuses"""
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def connections(self) -> Dict[str, int]:
+        """Connections opened so far, by host (from the live urllib3 pools)"""
+        pools = self._adapter.poolmanager.pools
+        with pools.lock:
+            live = list(pools._container.items())
+        return {f"{key.key_host}:{key.key_port}": pool.num_connections for key, pool in live}
+
+    def stats(self) -> Dict:
+        """Connection counts plus request/retry/latency stats per host"""
+        connections = self.connections()
+        with self._lock:
+            hosts = {host: stats.summary() for host, stats in self._stats.items()}
+        for host, summary in hosts.items():
+            summary['connections'] = sum(count for key, count in connections.items()
+                                         if key == host or key.split(':')[0] == host)
+        return hosts
+
+    def close(self):
+        self.session.close()
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_transport(**kwargs) -> Transport:
+    """Process-wide transport shared by all scrapers; `kwargs` only apply on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Transport(**kwargs)
+        return _shared
+
+def print_stats(transport: Transport = None):
+    """Print the per-host summary line used at the end of a scrape"""
+    for host, summary in (transport or get_transport()).stats().items():
+        print(f"HTTP {host}: {summary['requests']} requests over {summary['connections']} connections, "
+              f"{summary['retries']} retries, {summary['errors']} errors, "
+              f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms")
+
+def benchmark(requests_count: int = 200, latency: float = 0.0, handshake: float = 0.05):
+    """Compare a fresh connection per request (requests.get) with the pooled transport"""
+    from http_fixture import ChartStubServer
+
+    with ChartStubServer(latency=latency, handshake=handshake) as server:
+        urls = [f"{server.base_url}/v8/finance/chart/SYM{i % 20:02d}.JK" for i in range(requests_count)]
+
+        started = time.perf_counter()
+        for url in urls:
+            requests.get(url, headers=DEFAULT_HEADERS, timeout=10).json()
+        unpooled_time = time.perf_counter() - started
+
+        transport = Transport(pool_size=4)
+        started = time.perf_counter()
+        for url in urls:
+            transport.get_json(url)
+        pooled_time = time.perf_counter() - started
+        stats = transport.stats()[urlparse(server.base_url).netloc]
+        transport.close()
+        unpooled_connections = server.connection_count - stats['connections']
+
+    print(f"{requests_count} chart requests against the local stub ({handshake * 1000:.0f} ms per new connection)")
+    print(f"  requests.get: {unpooled_time * 1000:8.1f} ms  {unpooled_connections} connections")
+    print(f"  transport:    {pooled_time * 1000:8.1f} ms  {stats['connections']} connections  "
+          f"(p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms)")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['benchmark'])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='stub seconds added to every response')
+    parser.add_argument('--handshake', type=float, default=0.05, help='stub seconds added to every new connection')
+    args = parser.parse_args()
+    benchmark(args.requests, args.latency, args.handshake)
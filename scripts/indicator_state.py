@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Streaming indicator state
+Keeps running sums, a 200-close ring buffer and RSI gain/loss sums per symbol in
+data/historicals/<SYM>_state.json, so each new bar updates `technicals` in
+constant time instead of recomputing over the full history.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import serializer
+from indicators import MA_WINDOWS, PERF_LOOKBACK, RSI_PERIOD, TAIL_BARS, TECHNICAL_FIELDS, _finite_or_none
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Running sums are recomputed from the ring this often to stop float drift
+RESYNC_EVERY = TAIL_BARS
+
+class IndicatorState:
+    """O(1)-per-bar state behind MA20/50/200, RSI14 and the performance windows"""
+
+    def __init__(self):
+        self.ring = [0.0] * TAIL_BARS
+        self.pos = 0            # slot the next close goes into
+        self.count = 0          # bars seen so far
+        self.last_date = None   # 'YYYY-MM-DD' of the newest bar
+        self.sums = {window: 0.0 for window in MA_WINDOWS}
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.year = None
+        self.year_first = None  # first close of `year`
+        self.year_start = 0     # bar count at which that close arrived
+        self.updates = 0
+
+    def close_at(self, back: int) -> float:
+        """Close `back` bars ago (1 = newest); NaN before the first bar"""
+        if back > self.count or back > TAIL_BARS:
+            return float('nan')
+        return self.ring[(self.pos - back) % TAIL_BARS]
+
+    def _delta_at(self, back: int) -> float:
+        """Close-to-close change ending `back` bars ago; 0 for the first bar (as rolling did)"""
+        if back >= self.count:
+            return 0.0
+        return self.close_at(back) - self.close_at(back + 1)
+
+    def append(self, date: str, close: float):
+        """Add a bar after the newest one"""
+        year = int(date[:4])
+        delta = close - self.close_at(1) if self.count else 0.0
+        leaving_delta = self._delta_at(RSI_PERIOD) if self.count >= RSI_PERIOD else 0.0
+
+        for window in MA_WINDOWS:
+            leaving = self.close_at(window) if self.count >= window else 0.0
+            self.sums[window] += close - leaving
+        self.gain_sum += max(delta, 0.0) - max(leaving_delta, 0.0)
+        self.loss_sum += max(-delta, 0.0) - max(-leaving_delta, 0.0)
+
+        self.ring[self.pos] = close
+        self.pos = (self.pos + 1) % TAIL_BARS
+        self.count += 1
+        self.last_date = date
+        if year != self.year:
+            self.year, self.year_first, self.year_start = year, close, self.count
+        self._tick()
+
+    def replace_last(self, close: float):
+        """Overwrite the newest bar, e.g. a partial intraday bar from an earlier run"""
+        old = self.close_at(1)
+        if close == old:
+            return
+        old_delta = self._delta_at(1)
+        for window in MA_WINDOWS:
+            self.sums[window] += close - old
+        self.ring[(self.pos - 1) % TAIL_BARS] = close
+        new_delta = self._delta_at(1)
+        self.gain_sum += max(new_delta, 0.0) - max(old_delta, 0.0)
+        self.loss_sum += max(-new_delta, 0.0) - max(-old_delta, 0.0)
+        if self.year_start == self.count:
+            self.year_first = close
+        self._tick()
+
+    def update(self, date: str, close: float):
+        """Apply one bar; same date replaces the newest bar, older dates are rejected"""
+        if self.last_date is None or date > self.last_date:
+            self.append(date, close)
+        elif date == self.last_date:
+            self.replace_last(close)
+        else:
+            raise ValueError(f"bar {date} is older than state {self.last_date}")
+
+    def _tick(self):
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self.resync()
+
+    def resync(self):
+        """Recompute the running sums exactly from the ring buffer"""
+        for window in MA_WINDOWS:
+            self.sums[window] = float(sum(self.close_at(back) for back in range(1, min(window, self.count) + 1)))
+        deltas = [self._delta_at(back) for back in range(1, min(RSI_PERIOD, self.count) + 1)]
+        self.gain_sum = float(sum(d for d in deltas if d > 0))
+        self.loss_sum = float(sum(-d for d in deltas if d < 0))
+
+    def technicals(self, now: datetime = None) -> Dict:
+        """The `technicals` dict, same fields and rounding as indicators.compute_technicals"""
+        if not self.count:
+            return {}
+
+        last = self.close_at(1)
+        values = {}
+        for window in MA_WINDOWS:
+            values[f'ma_{window}'] = self.sums[window] / window if self.count >= window else None
+        if self.count >= RSI_PERIOD:
+            gain, loss = self.gain_sum / RSI_PERIOD, self.loss_sum / RSI_PERIOD
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values['rsi_14'] = float(100 - 100 / (1 + np.float64(gain) / np.float64(loss)))
+        else:
+            values['rsi_14'] = None
+        for field, lookback in PERF_LOOKBACK.items():
+            values[field] = (last / self.close_at(lookback) - 1) * 100 if self.count >= lookback else None
+        this_year = (now or datetime.now()).year
+        values['perf_ytd'] = (last / self.year_first - 1) * 100 if self.year == this_year and self.year_first else None
+
+        return {field: _finite_or_none(values[field]) if values[field] is not None else None for field in TECHNICAL_FIELDS}
+
+    def to_dict(self) -> Dict:
+        return {
+            'ring': self.ring, 'pos': self.pos, 'count': self.count, 'last_date': self.last_date,
+            'sums': {str(window): value for window, value in self.sums.items()},
+            'gain_sum': self.gain_sum, 'loss_sum': self.loss_sum,
+            'year': self.year, 'year_first': self.year_first, 'year_start': self.year_start,
+            'updates': self.updates
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IndicatorState':
+        state = cls()
+        state.ring = [float(v) for v in data['ring']]
+        state.pos, state.count, state.last_date = data['pos'], data['count'], data['last_date']
+        state.sums = {int(window): float(value) for window, value in data['sums'].items()}
+        state.gain_sum, state.loss_sum = data['gain_sum'], data['loss_sum']
+        state.year, state.year_first, state.year_start = data['year'], data['year_first'], data['year_start']
+        state.updates = data.get('updates', 0)
+        return state
+
+    @classmethod
+    def from_history(cls, daily: pd.DataFrame) -> 'IndicatorState':
+        """Build state from a daily history: the ring holds its last closes, then the sums are resynced
+
+        Gives the same state as appending every bar, without the per-bar Python loop.
+        """
+        state = cls()
+        closes = daily['Close'].dropna()
+        if closes.empty:
+            return state
+        tail = closes.iloc[-TAIL_BARS:]
+        state.ring[:len(tail)] = tail.to_numpy(dtype=float).tolist()
+        state.pos = len(tail) % TAIL_BARS
+        state.count = len(closes)
+        state.last_date = closes.index[-1].strftime('%Y-%m-%d')
+        state.year = closes.index[-1].year
+        first = int(np.argmax(closes.index.year == state.year))
+        state.year_first, state.year_start = float(closes.iloc[first]), first + 1
+        state.updates = len(tail)
+        state.resync()
+        return state
+
+def state_path(symbol: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, 'historicals', f"{symbol.replace('.JK', '')}_state.json")
+
+def load_state(symbol: str, data_dir: str = DATA_DIR) -> Optional[IndicatorState]:
+    try:
+        return IndicatorState.from_dict(serializer.load(state_path(symbol, data_dir)))
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Discarding unreadable indicator state for {symbol}: {e}")
+        return None
+
+def save_state(symbol: str, state: IndicatorState, data_dir: str = DATA_DIR):
+    serializer.dump(state.to_dict(), state_path(symbol, data_dir))
+
+def advance(symbol: str, fresh: pd.DataFrame, daily: pd.DataFrame, data_dir: str = DATA_DIR,
+            now: datetime = None) -> Dict:
+    """Apply newly fetched bars to the symbol's state and return its technicals
+
+    `fresh` must start at or before the state's newest bar (refetches start before the
+    last stored date); otherwise the state is rebuilt from the full `daily` history.
+    """
+    state = load_state(symbol, data_dir)
+    stored = state.to_dict() if state is not None else None
+    closes = fresh['Close'].dropna() if not fresh.empty else fresh
+    covered = (state is not None and state.last_date is not None and len(closes)
+               and closes.index[0].strftime('%Y-%m-%d') <= state.last_date)
+
+    if covered:
+        try:
+            for date, close in closes.items():
+                day = date.strftime('%Y-%m-%d')
+                if day >= state.last_date:
+                    state.update(day, float(close))
+        except ValueError:
+            covered = False
+    if not covered:
+        state = IndicatorState.from_history(daily)
+
+    # Refetching an unchanged bar leaves the state as it was; skip the rewrite
+    if state.to_dict() != stored:
+        save_state(symbol, state, data_dir)
+    return state.technicals(now)
+
+def verify(symbols: List[str], data_dir: str = DATA_DIR, now: datetime = None) -> Dict[str, List[str]]:
+    """Compare streamed technicals with a full panel recompute; returns mismatching fields by symbol"""
+    from history_store import load_daily
+    from indicators import close_panel, compute_technicals
+
+    states = {symbol: load_state(symbol, data_dir) for symbol in symbols}
+    frames = {symbol: load_daily(symbol, data_dir) for symbol in symbols if states[symbol]}
+    # Align full histories: slicing each symbol to its own last N bars first would start
+    # the panel at different dates per symbol and put their gaps where they never traded
+    expected = compute_technicals(close_panel(frames), now)
+
+    mismatches = {}
+    for symbol, frame in frames.items():
+        streamed = states[symbol].technicals(now)
+        bad = [field for field in TECHNICAL_FIELDS
+               if (streamed.get(field) is None) != (expected[symbol].get(field) is None)
+               or (streamed.get(field) is not None and abs(streamed[field] - expected[symbol][field]) > 0.0100001)]
+        if bad:
+            mismatches[symbol] = bad
+    return mismatches
+
+def rebuild(symbols: List[str], data_dir: str = DATA_DIR):
+    """Recreate the state files from the columnar store"""
+    from history_store import load_daily
+
+    for symbol in symbols:
+        save_state(symbol, IndicatorState.from_history(load_daily(symbol, data_dir)), data_dir)
+
+if __name__ == '__main__':
+    import argparse
+    from history_store import stored_symbols
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['verify', 'rebuild'])
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    symbols = stored_symbols(args.data_dir)
+    if args.command == 'rebuild':
+        rebuild(symbols, args.data_dir)
+        print(f"Rebuilt indicator state for {len(symbols)} symbols")
+    else:
+        mismatches = verify(symbols, args.data_dir)
+        for symbol, fields in mismatches.items():
+            print(f"  {symbol}: {', '.join(fields)}")
+        print(f"{len(symbols) - len(mismatches)}/{len(symbols)} symbols match a full recompute")
@@ -0,0 +1,106 @@
+"""
+Cross-sectional technical indicator engine
+Computes the `technicals` block for every symbol of a dates x symbols close
+panel in one NumPy pass, reading only the trailing bars each indicator needs.
+"""
+
+from datetime import datetime
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+MA_WINDOWS = (20, 50, 200)
+RSI_PERIOD = 14
+# Bars back to the reference close for each performance window (as in the per-stock version)
+PERF_LOOKBACK = {'perf_1d': 2, 'perf_1w': 5, 'perf_1m': 22, 'perf_3m': 66}
+TAIL_BARS = max(max(MA_WINDOWS), RSI_PERIOD + 1, max(PERF_LOOKBACK.values()))
+
+TECHNICAL_FIELDS = ['ma_20', 'ma_50', 'ma_200', 'rsi_14', 'perf_1d', 'perf_1w', 'perf_1m', 'perf_3m', 'perf_ytd']
+
+def close_panel(frames: Dict[str, pd.DataFrame], days: int = None) -> pd.DataFrame:
+    """Align each symbol's Close column into a dates x symbols panel"""
+    closes = {}
+    for symbol, frame in frames.items():
+        series = frame['Close']
+        closes[symbol] = series.iloc[-days:] if days else series
+    return pd.concat(closes, axis=1).sort_index() if closes else pd.DataFrame()
+
+def _justified_tail(values: np.ndarray, valid: np.ndarray, rows: int) -> np.ndarray:
+    """Last `rows` valid values of each column, bottom-aligned with NaN padding on top
+
+    Columns whose tail is a NaN run followed by valid bars holding all of their
+    last `rows` values (the normal case, e.g. a recent listing) are sliced as-is.
+    Columns with gaps or stale trailing bars in the tail, or with fewer valid bars
+    there than they have overall (a suspension that started before the tail), are
+    re-packed with a stable sort.
+    """
+    tail = values[-rows:].copy()
+    tail_valid = valid[-rows:]
+    gaps = (tail_valid[:-1] & ~tail_valid[1:]).any(axis=0) if rows > 1 else np.zeros(values.shape[1], bool)
+    short = tail_valid.sum(axis=0) < np.minimum(valid.sum(axis=0), rows)
+    irregular = np.flatnonzero(gaps | short)
+
+    if irregular.size:
+        order = np.argsort(valid[:, irregular], axis=0, kind='stable')[-rows:]
+        packed = np.take_along_axis(values[:, irregular], order, axis=0)
+        packed[~np.take_along_axis(valid[:, irregular], order, axis=0)] = np.nan
+        tail[:, irregular] = packed[-tail.shape[0]:]
+    return tail
+
+def _finite_or_none(value: float):
+    """Round like the per-stock version: falsy or non-finite values become None"""
+    return round(float(value), 2) if value and np.isfinite(value) else None
+
+def compute_technicals(close: pd.DataFrame, now: datetime = None) -> Dict[str, Dict]:
+    """Compute the `technicals` dict for every column of a dates x symbols close panel"""
+    if close.empty:
+        return {symbol: {} for symbol in close.columns}
+
+    values = close.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    rows = min(TAIL_BARS, len(values))
+    tail = _justified_tail(values, valid, rows)
+    last = tail[-1]
+
+    results = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for window in MA_WINDOWS:
+            ma = tail[-window:].mean(axis=0) if rows >= window else np.full(len(last), np.nan)
+            results[f'ma_{window}'] = np.where(counts >= window, ma, np.nan)
+
+        if rows >= RSI_PERIOD:
+            # A symbol with exactly 14 closes has a NaN first delta, which counts as
+            # a zero gain/loss day, like the rolling version's where(..., 0)
+            recent = tail[-(RSI_PERIOD + 1):]
+            if len(recent) == RSI_PERIOD:
+                recent = np.vstack([np.full(len(last), np.nan), recent])
+            delta = np.diff(recent, axis=0)
+            gain = np.where(delta > 0, delta, 0).mean(axis=0)
+            loss = np.where(delta < 0, -delta, 0).mean(axis=0)
+            rsi = 100 - 100 / (1 + gain / loss)
+            results['rsi_14'] = np.where(counts >= RSI_PERIOD, rsi, np.nan)
+        else:
+            results['rsi_14'] = np.full(len(last), np.nan)
+
+        for field, lookback in PERF_LOOKBACK.items():
+            if rows >= lookback:
+                perf = (last / tail[-lookback] - 1) * 100
+                results[field] = np.where(counts >= lookback, perf, np.nan)
+            else:
+                results[field] = np.full(len(last), np.nan)
+
+        year_start = close.index.searchsorted(pd.Timestamp(year=(now or datetime.now()).year, month=1, day=1))
+        year_valid = valid[year_start:]
+        if len(year_valid):
+            first_row = year_valid.argmax(axis=0)
+            first_close = values[year_start + first_row, np.arange(values.shape[1])]
+            results['perf_ytd'] = np.where(year_valid.any(axis=0), (last / first_close - 1) * 100, np.nan)
+        else:
+            results['perf_ytd'] = np.full(len(last), np.nan)
+
+    columns = {field: results[field].tolist() for field in TECHNICAL_FIELDS}
+    return {
+        symbol: ({field: _finite_or_none(columns[field][j]) for field in TECHNICAL_FIELDS} if counts[j] else {})
+        for j, symbol in enumerate(close.columns)
+    }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Leaderboards over the columnar screener snapshot
+Top gainers, losers, volume leaders, unusual volume (volume / avgVolume) and
+proximity to the 52-week high and low. Each board is a partial selection with
+np.argpartition, so only the top N rows get sorted. The boards are written to
+data/leaders.json, which the terminal UI and the Flask page read directly.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEADERS_PATH = os.path.join(BASE_DIR, 'data', 'leaders.json')
+
+TOP_N = 10
+# Board -> (numerator, denominator or None, largest first); the metric is the ratio when there is a denominator
+BOARDS = {
+    'gainers': ('changePercent', None, True),
+    'losers': ('changePercent', None, False),
+    'active': ('volume', None, True),
+    'unusual_volume': ('volume', 'avgVolume', True),
+    'near_high': ('price', 'fiftyTwoWeekHigh', True),
+    'near_low': ('price', 'fiftyTwoWeekLow', False)
+}
+# Index-row fields carried on each board entry
+ENTRY_FIELDS = ('name', 'price', 'change', 'changePercent', 'volume')
+
+def top_n(values: np.ndarray, n: int, largest: bool = True) -> np.ndarray:
+    """Positions of the `n` largest (or smallest) non-NaN values, best first; O(len + n log n)"""
+    keys = -values if largest else values.copy()
+    missing = np.isnan(keys)
+    keys[missing] = np.inf
+    n = min(n, len(keys) - int(missing.sum()))
+    if n <= 0:
+        return np.array([], dtype=np.int64)
+    picked = np.argpartition(keys, n - 1)[:n] if n < len(keys) else np.arange(len(keys))
+    return picked[np.argsort(keys[picked], kind='stable')]
+
+def _column(columns: Dict[str, List], field: str, size: int) -> np.ndarray:
+    values = columns.get(field, [None] * size)
+    return np.array([value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                     for value in values], dtype=float)
+
+def metric(columns: Dict[str, List], size: int, numerator: str, denominator: Optional[str]) -> np.ndarray:
+    values = _column(columns, numerator, size)
+    if denominator is None:
+        return values
+    base = _column(columns, denominator, size)
+    base[~(base > 0)] = np.nan
+    return values / base
+
+def compute_leaders(table: Dict, n: int = TOP_N) -> Dict:
+    """{'last_update', 'n', 'boards': {board: [entry, ...]}} from a screener table"""
+    symbols, columns = table.get('symbols', []), table.get('columns', {})
+    size = len(symbols)
+    boards = {}
+    for board, (numerator, denominator, largest) in BOARDS.items():
+        values = metric(columns, size, numerator, denominator)
+        boards[board] = [{
+            'symbol': symbols[i],
+            **{field: columns[field][i] for field in ENTRY_FIELDS if field in columns},
+            'value': round(float(values[i]), 4)
+        } for i in top_n(values, n, largest)]
+    return {'last_update': table.get('last_update'), 'n': n, 'boards': boards}
+
+def benchmark(symbols: int = 100000, n: int = TOP_N, repeat: int = 50):
+    """Time one board by argpartition against a full sort"""
+    rng = np.random.default_rng(3)
+    values = rng.normal(0, 2, symbols)
+    values[rng.random(symbols) < 0.05] = np.nan
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        partial = top_n(values, n)
+    partial_time = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        order = np.argsort(np.where(np.isnan(values), -np.inf, values))[::-1][:n]
+    sort_time = (time.perf_counter() - started) / repeat
+
+    assert np.array_equal(values[partial], values[order])
+    print(f"{symbols} symbols, top {n}")
+    print(f"  full sort:     {sort_time * 1e3:7.2f} ms")
+    print(f"  argpartition:  {partial_time * 1e3:7.2f} ms  ({sort_time / partial_time:.1f}x)")
+
+if __name__ == '__main__':
+    import argparse
+    from manifest import publish
+    from screener import build_table, rows_from_files
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['build', 'benchmark'])
+    parser.add_argument('-n', type=int, default=TOP_N, help='entries per board')
+    parser.add_argument('--path', default=LEADERS_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        rows, last_update = rows_from_files(os.path.dirname(args.path))
+        publish(compute_leaders(build_table(rows, last_update), args.n), args.path)
+        print(f"Wrote {args.path}: {len(BOARDS)} boards of up to {args.n}")
+    else:
+        benchmark(n=args.n)
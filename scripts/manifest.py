@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Content-hash manifest for the generated data files
+data/manifest.json records a hash of each file's data (ignoring run timestamps),
+its size and when that data last changed. Every writer of a served file goes
+through `Manifest.write` (one-off writers such as the build CLIs through
+`publish`), which leaves a file untouched when its data is the same as last run,
+so hourly runs only rewrite (and commit) what actually changed and the app's
+hash ETags always describe the file on disk.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict
+import pytz
+import serializer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(BASE_DIR, 'data', 'manifest.json')
+JKT_TZ = pytz.timezone('Asia/Jakarta')
+
+class Manifest:
+    """Per-file {'hash', 'bytes', 'changedAt'} keyed by path relative to the repo root"""
+
+    def __init__(self, path: str = MANIFEST_PATH, root: str = BASE_DIR):
+        self.path = path
+        self.root = root
+        self.files = {}
+        self.changed = {}
+        self.skipped = 0
+        try:
+            self.files = serializer.load(path).get('files', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Discarding unreadable manifest {path}: {e}")
+
+    @classmethod
+    def for_data_dir(cls, data_dir: str) -> 'Manifest':
+        """The manifest inside `data_dir`, keyed relative to its parent (the repo root for data/)"""
+        return cls(os.path.join(data_dir, 'manifest.json'), os.path.dirname(os.path.abspath(data_dir)))
+
+    def key(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def write(self, obj: Any, path: str, now: str, sidecars: bool = True) -> bool:
+        """Write `obj` to `path` unless its data is unchanged; returns whether it was written
+
+        `now` is recorded as the file's changedAt when it is written.
+        """
+        key = self.key(path)
+        digest = serializer.content_hash(obj)
+        entry = self.files.get(key)
+        if entry and entry['hash'] == digest and os.path.exists(path):
+            self.skipped += 1
+            return False
+        size = serializer.dump(obj, path, sidecars=sidecars)
+        self.files[key] = self.changed[key] = {'hash': digest, 'bytes': size, 'changedAt': now}
+        return True
+
+    def merge(self, changed: Dict[str, Dict], skipped: int):
+        """Fold in the writes made by a worker process"""
+        self.files.update(changed)
+        self.changed.update(changed)
+        self.skipped += skipped
+
+    def save(self, generated_at: str):
+        """Write the manifest itself; `generated_at` is when the run checked every file"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        serializer.dump({'generatedAt': generated_at, 'files': dict(sorted(self.files.items()))}, self.path, sidecars=True)
+        print(f"Manifest: {len(self.changed)} files changed, {self.skipped} unchanged and left as they were")
+
+def now_string() -> str:
+    """Current time in the last_update format, for changedAt"""
+    return datetime.now(JKT_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+
+def publish(obj: Any, path: str, data_dir: str = None, now: str = None, sidecars: bool = True) -> bool:
+    """Write one served file through the manifest of `data_dir` (default: the file's folder) and save it
+
+    For one-off writers such as the build CLIs; a run writing many files holds one
+    `Manifest` and saves it once at the end.
+    """
+    now = now or now_string()
+    manifest = Manifest.for_data_dir(data_dir or os.path.dirname(path))
+    written = manifest.write(obj, path, now, sidecars)
+    manifest.save(now)
+    return written
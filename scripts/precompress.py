@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Precompressed .gz/.br sidecars for the static data files
+Each served artifact (data/*.json, static/data/stocks.json, index.html) gets
+<file>.gz and, when the brotli package is installed, <file>.br next to it, so
+the Flask app (or any static server) can send them with Content-Encoding.
+Sidecars are not committed: the app builds a missing or stale one on first
+request, and running this script builds them all ahead of time for a static server.
+"""
+
+import gzip
+import os
+import time
+from typing import Dict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files below this size are served as-is; compressing them saves less than a packet
+MIN_BYTES = 512
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# Encodings in order of preference, with the file suffix each one uses
+ENCODINGS = {'br': '.br', 'gzip': '.gz'} if brotli is not None else {'gzip': '.gz'}
+SIDECAR_SUFFIXES = ('.gz', '.br')
+
+def _write(path: str, payload: bytes):
+    with open(f'{path}.tmp', 'wb') as f:
+        f.write(payload)
+    os.replace(f'{path}.tmp', path)
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def write_sidecars(path: str, payload: bytes = None) -> Dict[str, int]:
+    """Write compressed copies of `path` (contents `payload` if given); returns bytes per encoding
+
+    gzip output carries no timestamp, so unchanged files give byte-identical sidecars.
+    Sidecars for files under MIN_BYTES, or for an encoding that is no longer
+    available, are removed so they cannot go stale.
+    """
+    if payload is None:
+        with open(path, 'rb') as f:
+            payload = f.read()
+    sizes = {}
+    for encoding, suffix in {'br': '.br', 'gzip': '.gz'}.items():
+        if len(payload) < MIN_BYTES or encoding not in ENCODINGS:
+            _remove(path + suffix)
+            continue
+        if encoding == 'gzip':
+            compressed = gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+        else:
+            compressed = brotli.compress(payload, quality=BROTLI_QUALITY)
+        _write(path + suffix, compressed)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+def compress_tree(root: str, extensions=('.json', '.html')) -> Dict[str, int]:
+    """Write sidecars for every matching file under `root`; returns total bytes per encoding"""
+    totals = {'identity': 0, **{encoding: 0 for encoding in ENCODINGS}}
+    for folder, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(extensions) and not name.endswith(SIDECAR_SUFFIXES):
+                path = os.path.join(folder, name)
+                totals['identity'] += os.path.getsize(path)
+                for encoding, size in write_sidecars(path).items():
+                    totals[encoding] += size
+    return totals
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('paths', nargs='*', default=[os.path.join(BASE_DIR, 'data'), os.path.join(BASE_DIR, 'static', 'data'),
+                                                     os.path.join(BASE_DIR, 'index.html')])
+    args = parser.parse_args()
+    started = time.perf_counter()
+    totals = {}
+    for path in args.paths:
+        if os.path.isdir(path):
+            for encoding, size in compress_tree(path).items():
+                totals[encoding] = totals.get(encoding, 0) + size
+        elif os.path.exists(path):
+            totals['identity'] = totals.get('identity', 0) + os.path.getsize(path)
+            for encoding, size in write_sidecars(path).items():
+                totals[encoding] = totals.get(encoding, 0) + size
+    print(f"Compressed in {time.perf_counter() - started:.2f}s: " +
+          ', '.join(f"{encoding} {size / 1e6:.2f} MB" for encoding, size in totals.items()))
@@ -0,0 +1,69 @@
+"""
+Token-bucket rate limiting shared between scraper worker threads and asyncio tasks
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if they are available right now, without blocking"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def _take_or_delay(self, tokens: float, waited: float) -> float:
+        """Take tokens and return 0, or return the seconds until they could be taken"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= min(tokens, self.capacity):
+                self._tokens -= tokens
+                self.waited += waited
+                return 0.0
+            return (min(tokens, self.capacity) - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until `tokens` are available; returns the seconds spent waiting
+
+        Requests larger than the capacity wait for a full bucket and then leave it
+        in debt, so later callers pay for the overdraft and the average rate holds.
+        """
+        waited = 0.0
+        while True:
+            delay = self._take_or_delay(tokens, waited)
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """`acquire` for asyncio tasks: sleeps without blocking the event loop"""
+        waited = 0.0
+        while True:
+            delay = self._take_or_delay(tokens, waited)
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
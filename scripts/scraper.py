@@ -1,56 +1,32 @@
-import json
 import os
-import time
-import requests
 from datetime import datetime, timedelta
 import urllib.request
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from async_quotes import YAHOO_CHART_URL, fetch_quotes, parse_chart_quote, report
+from hedging import SourceStats, first_valid
+from http_transport import get_transport, print_stats
+from manifest import Manifest
+from rate_limiter import TokenBucket
 from stock_symbols import INDONESIAN_STOCKS
 
+# Fallback cascade request budget (requests per second) when no --rate is given
+CASCADE_RATE = 2.0
+
 def get_stock_from_direct_api(symbol):
     """Try to get stock data directly from Yahoo Finance API with fresh data"""
     try:
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+        url = f"{YAHOO_CHART_URL}/{symbol}"
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/json',
             'Cache-Control': 'no-cache'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_transport().get(url, headers=headers)
         
         if response.status_code == 200:
-            data = response.json()
-            result = data.get('chart', {}).get('result', [{}])[0]
-            meta = result.get('meta', {})
-            
-            # Check if data is fresh (within last 24 hours)
-            market_time = meta.get('regularMarketTime')
-            if market_time:
-                data_date = datetime.fromtimestamp(market_time)
-                if datetime.now() - data_date > timedelta(days=2):
-                    print(f"  WARNING: {symbol} data is {datetime.now() - data_date} old!")
-                    return None
-            
-            current_price = meta.get('regularMarketPrice', 0)
-            previous_close = meta.get('previousClose', 0)
-            
-            if current_price and previous_close:
-                change = current_price - previous_close
-                change_percent = (change / previous_close * 100) if previous_close else 0
-                
-                return {
-                    'price': round(current_price, 2),
-                    'change': round(change, 2),
-                    'changePercent': round(change_percent, 2),
-                    'volume': meta.get('regularMarketVolume', 0),
-                    'dayHigh': meta.get('regularMarketDayHigh', 0),
-                    'dayLow': meta.get('regularMarketDayLow', 0),
-                    'marketCap': 0,  # Not available in this API
-                    'fiftyTwoWeekHigh': 0,
-                    'fiftyTwoWeekLow': 0,
-                    'lastUpdate': data_date.strftime('%Y-%m-%d %H:%M:%S') if market_time else 'Unknown'
-                }
+            return parse_chart_quote(symbol, response.json())
     except Exception as e:
         print(f"  Direct API error for {symbol}: {e}")
     
@@ -122,75 +98,91 @@ def get_fallback_realistic_data(symbol, name):
         'lastUpdate': 'Estimated (Yahoo Finance data unreliable)'
     }
 
-def scrape_stocks():
-    """Main scraper with multiple data sources and freshness validation"""
+def get_stock_from_yfinance(symbol):
+    """Get stock data from yfinance, validating that the quote is fresh"""
+    import yfinance as yf
+    ticker = yf.Ticker(symbol)
+    info = ticker.info
+    
+    # Get timestamps and validate freshness
+    reg_time = info.get('regularMarketTime')
+    if not isinstance(reg_time, int):
+        return None
+    
+    data_date = datetime.fromtimestamp(reg_time)
+    age = datetime.now() - data_date
+    if age > timedelta(days=2):
+        print(f"  YFinance data too old: {age}")
+        return None
+    
+    current_price = info.get('regularMarketPrice') or info.get('currentPrice', 0)
+    previous_close = info.get('regularMarketPreviousClose') or info.get('previousClose', 0)
+    if not (current_price and previous_close):
+        return None
+    
+    change = current_price - previous_close
+    change_percent = (change / previous_close * 100) if previous_close else 0
+    return {
+        'price': round(current_price, 2),
+        'change': round(change, 2),
+        'changePercent': round(change_percent, 2),
+        'volume': info.get('regularMarketVolume', 0),
+        'dayHigh': info.get('regularMarketDayHigh', 0),
+        'dayLow': info.get('regularMarketDayLow', 0),
+        'marketCap': info.get('marketCap', 0),
+        'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh', 0),
+        'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow', 0),
+        'lastUpdate': data_date.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def scrape_stocks(async_mode=False, concurrency=16, rate=None, deadline=30.0, hedge_percentile=None):
+    """Main scraper with multiple data sources and freshness validation
+
+    Sources are tried in order: Yahoo Direct API, Investing.com, then yfinance.
+    With `hedge_percentile` set, the next source is launched alongside a source
+    that is slower than that percentile of its recent latencies, and the first
+    valid answer wins. In async mode all Yahoo quotes are fetched concurrently up
+    front; only the symbols that failed go through the fallback chain. Cascade
+    requests share a `rate` (default CASCADE_RATE) per second token bucket.
+    """
     stock_data = []
     successful_real_data = 0
+    source_stats = SourceStats(percentile=hedge_percentile)
+    executor = ThreadPoolExecutor(max_workers=4)
+    limiter = TokenBucket(rate or CASCADE_RATE)
     
     print("Starting enhanced stock data scraping...")
     print(f"Target: More current data for {len(INDONESIAN_STOCKS)} stocks")
     print("=" * 60)
     
+    prefetched = {}
+    if async_mode:
+        result = fetch_quotes([symbol for symbol, name in INDONESIAN_STOCKS],
+                              concurrency=concurrency, rate=rate, deadline=deadline)
+        prefetched = result['quotes']
+        print(report(result, len(INDONESIAN_STOCKS)))
+    
     for symbol, name in INDONESIAN_STOCKS:
+        if symbol in prefetched:
+            stock_data.append({'symbol': symbol, 'name': name, **prefetched[symbol]})
+            successful_real_data += 1
+            continue
+        
         print(f"\nProcessing {symbol} ({name})...")
         
-        stock_info = None
-        data_source = "Unknown"
+        sources = [
+            ("Yahoo Direct API", lambda symbol=symbol: get_stock_from_direct_api(symbol)),
+            ("Investing.com", lambda symbol=symbol: get_stock_from_investing_com(symbol)),
+            ("YFinance (validated)", lambda symbol=symbol: get_stock_from_yfinance(symbol))
+        ]
+        if async_mode:
+            # Already tried concurrently above
+            sources = sources[1:]
         
-        # Try Method 1: Direct Yahoo Finance API
-        stock_info = get_stock_from_direct_api(symbol)
+        data_source, stock_info = first_valid(executor, sources, source_stats, limiter=limiter)
         if stock_info:
-            data_source = "Yahoo Direct API"
             successful_real_data += 1
         
-        # Try Method 2: Alternative source (if available)
-        if not stock_info:
-            stock_info = get_stock_from_investing_com(symbol)
-            if stock_info:
-                data_source = "Investing.com"
-                successful_real_data += 1
-        
-        # Try Method 3: YFinance with validation
-        if not stock_info:
-            try:
-                import yfinance as yf
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                
-                # Get timestamps and validate freshness
-                reg_time = info.get('regularMarketTime')
-                if reg_time:
-                    if isinstance(reg_time, int):
-                        data_date = datetime.fromtimestamp(reg_time)
-                        age = datetime.now() - data_date
-                        
-                        if age > timedelta(days=2):
-                            print(f"  YFinance data too old: {age}")
-                        else:
-                            current_price = info.get('regularMarketPrice') or info.get('currentPrice', 0)
-                            previous_close = info.get('regularMarketPreviousClose') or info.get('previousClose', 0)
-                            
-                            if current_price and previous_close:
-                                change = current_price - previous_close
-                                change_percent = (change / previous_close * 100) if previous_close else 0
-                                
-                                stock_info = {
-                                    'price': round(current_price, 2),
-                                    'change': round(change, 2),
-                                    'changePercent': round(change_percent, 2),
-                                    'volume': info.get('regularMarketVolume', 0),
-                                    'dayHigh': info.get('regularMarketDayHigh', 0),
-                                    'dayLow': info.get('regularMarketDayLow', 0),
-                                    'marketCap': info.get('marketCap', 0),
-                                    'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh', 0),
-                                    'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow', 0),
-                                    'lastUpdate': data_date.strftime('%Y-%m-%d %H:%M:%S')
-                                }
-                                data_source = "YFinance (validated)"
-                                successful_real_data += 1
-            except Exception as e:
-                print(f"  YFinance error: {e}")
-        
         # Fallback: Use realistic estimated data
         if not stock_info:
             stock_info = get_fallback_realistic_data(symbol, name)
@@ -205,34 +197,51 @@ def scrape_stocks():
         
         stock_data.append(final_stock)
         print(f"  ✓ {data_source} - Price: {stock_info['price']}")
-        
-        # Rate limiting
-        time.sleep(0.5)
+    
+    executor.shutdown(wait=False, cancel_futures=True)
     
     print("\n" + "=" * 60)
     print(f"Scraping completed!")
     print(f"Real data sources: {successful_real_data}/{len(INDONESIAN_STOCKS)}")
     print(f"Fallback estimates: {len(INDONESIAN_STOCKS) - successful_real_data}/{len(INDONESIAN_STOCKS)}")
+    for source, summary in source_stats.summary()['sources'].items():
+        print(f"{source}: {summary['wins']}/{summary['launched']} wins, {summary['cancelled']} cancelled, "
+              f"{summary['abandoned']} abandoned, p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms")
+    print_stats()
     
     # Save to JSON
     output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'data')
     os.makedirs(output_dir, exist_ok=True)
     
     output_file = os.path.join(output_dir, 'stocks.json')
+    run_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S WIB')
     
-    with open(output_file, 'w') as f:
-        json.dump({
-            'stocks': stock_data,
-            'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S WIB'),
-            'data_quality': {
-                'real_data_count': successful_real_data,
-                'total_stocks': len(INDONESIAN_STOCKS),
-                'real_data_percentage': round((successful_real_data / len(INDONESIAN_STOCKS)) * 100, 1)
-            }
-        }, f, indent=2)
+    # Only rewritten when the quotes changed; the manifest records when
+    manifest = Manifest()
+    manifest.write({
+        'stocks': stock_data,
+        'last_update': run_time,
+        'data_quality': {
+            'real_data_count': successful_real_data,
+            'total_stocks': len(INDONESIAN_STOCKS),
+            'real_data_percentage': round((successful_real_data / len(INDONESIAN_STOCKS)) * 100, 1),
+            'fallback_sources': source_stats.summary()
+        }
+    }, output_file, run_time)
+    manifest.save(run_time)
     
     print(f"Data saved to {output_file}")
     return stock_data
 
 if __name__ == "__main__":
-    scrape_stocks()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Scrape Indonesian stock quotes')
+    parser.add_argument('--async', dest='async_mode', action='store_true', help='fetch Yahoo quotes concurrently')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests in flight in async mode')
+    parser.add_argument('--rate', type=float, default=None, help='requests per second (per host in async mode; the fallback cascade defaults to 2)')
+    parser.add_argument('--deadline', type=float, default=30.0, help='seconds before async fetches are cancelled')
+    parser.add_argument('--hedge', type=float, default=None, metavar='PERCENTILE',
+                        help='launch the next source when one is slower than this latency percentile (e.g. 0.9)')
+    args = parser.parse_args()
+    scrape_stocks(args.async_mode, args.concurrency, args.rate, args.deadline, args.hedge)
\ No newline at end of file
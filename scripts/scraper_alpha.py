@@ -1,9 +1,8 @@
-import json
 import os
 import time
 from datetime import datetime
-import urllib.request
-import urllib.parse
+from http_transport import get_transport
+import serializer
 from stock_symbols import INDONESIAN_STOCKS
 
 def fetch_stock_data_alpha(symbol):
@@ -19,12 +18,9 @@ def fetch_stock_data_alpha(symbol):
         "apikey": api_key
     }
     
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-    
     try:
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read().decode())
-            
+        data = get_transport().get_json(base_url, params=params)
+        
         if "Global Quote" in data:
             quote = data["Global Quote"]
             return {
@@ -181,11 +177,10 @@ def scrape_stocks():
     
     output_file = os.path.join(output_dir, 'stocks.json')
     
-    with open(output_file, 'w') as f:
-        json.dump({
-            'stocks': stock_data,
-            'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S WIB')
-        }, f, indent=2)
+    serializer.dump({
+        'stocks': stock_data,
+        'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S WIB')
+    }, output_file, sidecars=True)
     
     print(f"Data saved to {output_file}")
     return stock_data
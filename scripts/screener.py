@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Screener query engine over a columnar snapshot of the stock universe
+data/screener.json holds one column per field (index row, fundamentals,
+technicals) instead of the old screener_cache.json buckets. `Screener` keeps a
+sorted-order index per numeric column and a row mask per categorical value, so
+a conjunction of range and equality predicates is a few binary searches and
+mask ANDs rather than a scan over every stock.
+
+    Screener.from_table(table).query({'pe': (None, 15), 'roe': (0.15, None), 'sector': ['Financials']})
+"""
+
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCREENER_PATH = os.path.join(BASE_DIR, 'data', 'screener.json')
+
+# Quote fields beyond the index row that screener rows carry (for unusual volume and 52-week proximity)
+QUOTE_FIELDS = ('avgVolume', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow')
+
+# A range predicate is (min, max), either side None for open; equality is one value or a list of values
+Predicate = Union[Tuple[Optional[float], Optional[float]], Any, List[Any]]
+
+def build_table(rows: Iterable[Dict], last_update: str = None) -> Dict:
+    """Columnar screener artifact from per-stock rows: {'symbols', 'columns', 'last_update'}"""
+    rows = list(rows)
+    fields = []
+    for row in rows:
+        fields.extend(field for field in row if field != 'symbol' and field not in fields)
+    return {
+        'last_update': last_update,
+        'symbols': [row['symbol'] for row in rows],
+        'columns': {field: [row.get(field) for row in rows] for field in fields}
+    }
+
+def rows_from_files(data_dir: str) -> Tuple[List[Dict], Optional[str]]:
+    """Screener rows rebuilt from index.json, fundamentals.json and the per-stock files"""
+    import serializer
+    index = serializer.load(os.path.join(data_dir, 'index.json'))
+    fundamentals = serializer.load(os.path.join(data_dir, 'fundamentals.json'))
+    rows = []
+    for stock in index.get('stocks', []):
+        path = os.path.join(data_dir, 'stocks', f"{stock['symbol'].replace('.JK', '')}.json")
+        detail = serializer.load(path) if os.path.exists(path) else {}
+        quote = {field: detail.get('basic', {}).get(field) for field in QUOTE_FIELDS}
+        rows.append({**stock, **quote, **fundamentals.get(stock['symbol'], {}),
+                     'industry': detail.get('company', {}).get('industry', ''), **(detail.get('technicals') or {})})
+    return rows, index.get('last_update')
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class Screener:
+    """Sorted-column indexes for numeric fields and value masks for categorical ones"""
+
+    def __init__(self, symbols: Sequence[str], columns: Dict[str, Sequence], categories=None):
+        self.symbols = list(symbols)
+        self.size = len(self.symbols)
+        self.columns = {field: list(values) for field, values in columns.items()}
+        self.numeric = {}
+        self.categories = {}
+        for field, values in self.columns.items():
+            present = [value for value in values if value is not None]
+            if present and all(_is_number(value) for value in present):
+                array = np.array([np.nan if value is None else value for value in values], dtype=float)
+                order = np.argsort(array, kind='stable')
+                # NaN sorts last, so the first `valid` positions of `order` are the real values
+                valid = int(np.count_nonzero(~np.isnan(array)))
+                self.numeric[field] = (order, array[order[:valid]])
+            elif present and all(isinstance(value, str) for value in present):
+                keys = np.array(['' if value is None else value for value in values], dtype=object)
+                self.categories[field] = {value: keys == value for value in set(present)}
+        if categories is not None:
+            # A CategoryIndex adds multi-valued dimensions such as index membership tags
+            for dimension, values in categories.bitsets.items():
+                self.categories.setdefault(dimension, {}).update(
+                    (value, categories.mask(bits, self.symbols)) for value, bits in values.items())
+
+    @classmethod
+    def from_table(cls, table: Dict, categories=None) -> 'Screener':
+        return cls(table.get('symbols', []), table.get('columns', {}), categories)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def _range_mask(self, field: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        order, values = self.numeric[field]
+        start = np.searchsorted(values, low, 'left') if low is not None else 0
+        stop = np.searchsorted(values, high, 'right') if high is not None else len(values)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def _equal_mask(self, field: str, wanted) -> np.ndarray:
+        masks = self.categories[field]
+        mask = np.zeros(self.size, dtype=bool)
+        for value in (wanted if isinstance(wanted, (list, tuple, set)) else [wanted]):
+            if value in masks:
+                mask |= masks[value]
+        return mask
+
+    def match(self, predicates: Dict[str, Predicate]) -> np.ndarray:
+        """Boolean row mask for the conjunction of `predicates`
+
+        Numeric fields take (min, max) with inclusive bounds; categorical fields
+        take a value or a list of accepted values. Rows without a value never match.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for field, predicate in predicates.items():
+            if field in self.numeric:
+                if not isinstance(predicate, (list, tuple)) or len(predicate) != 2:
+                    raise ValueError(f'{field} takes a (min, max) range')
+                mask &= self._range_mask(field, *predicate)
+            elif field in self.categories:
+                mask &= self._equal_mask(field, predicate)
+            else:
+                raise ValueError(f'unknown or unindexed field {field}')
+        return mask
+
+    def ordered(self, mask: np.ndarray, sort: str = None) -> np.ndarray:
+        """Row numbers selected by `mask`, sorted by `field` / `-field` through its index (missing values last)"""
+        if not sort:
+            return np.flatnonzero(mask)
+        field = sort.lstrip('-')
+        if field not in self.numeric:
+            raise ValueError(f'cannot sort by {field}')
+        order, values = self.numeric[field]
+        valid, missing = order[:len(values)], order[len(values):]
+        if sort.startswith('-'):
+            valid = valid[::-1]
+        return np.concatenate([valid[mask[valid]], missing[mask[missing]]])
+
+    def rows(self, indices: Iterable[int], fields: Sequence[str] = None) -> List[Dict]:
+        # The symbol always comes from self.symbols; it is not one of the columns
+        missing = [None] * self.size
+        columns = [(field, self.columns.get(field, missing)) for field in fields or self.fields if field != 'symbol']
+        return [{'symbol': self.symbols[i], **{field: column[i] for field, column in columns}} for i in indices]
+
+    def query(self, predicates: Dict[str, Predicate], sort: str = None, fields: Sequence[str] = None,
+              offset: int = 0, limit: int = None) -> List[Dict]:
+        """Matching rows, optionally sorted, projected and paged"""
+        indices = self.ordered(self.match(predicates), sort)
+        stop = offset + limit if limit is not None else None
+        return self.rows(indices[offset:stop], fields)
+
+def benchmark(symbols: int = 5000, repeat: int = 1000):
+    """Time a three-predicate query against a linear scan over row dicts"""
+    rng = np.random.default_rng(11)
+    sectors = ['Financials', 'Energy', 'Consumer', 'Materials', 'Industrials', 'Technology']
+    rows = [{
+        'symbol': f'SYM{i:04d}.JK',
+        'pe': None if rng.random() < 0.1 else float(rng.uniform(1, 60)),
+        'roe': float(rng.uniform(-0.2, 0.4)),
+        'marketCap': float(rng.lognormal(28, 2)),
+        'sector': sectors[i % len(sectors)]
+    } for i in range(symbols)]
+    screener = Screener.from_table(build_table(rows))
+    predicates = {'pe': (None, 15), 'roe': (0.15, None), 'sector': ['Financials', 'Energy']}
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        indexed = screener.match(predicates)
+    indexed_time = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(max(repeat // 10, 1)):
+        scanned = [row['symbol'] for row in rows
+                   if row['pe'] is not None and row['pe'] <= 15 and row['roe'] >= 0.15 and row['sector'] in ('Financials', 'Energy')]
+    scan_time = (time.perf_counter() - started) / max(repeat // 10, 1)
+
+    assert scanned == [screener.symbols[i] for i in np.flatnonzero(indexed)]
+    print(f"{symbols} symbols, {len(scanned)} matches")
+    print(f"  linear scan: {scan_time * 1e6:8.1f} us/query")
+    print(f"  indexed:     {indexed_time * 1e6:8.1f} us/query  ({scan_time / indexed_time:.1f}x)")
+
+if __name__ == '__main__':
+    import argparse
+    import serializer
+    from manifest import publish
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['build', 'query', 'benchmark'])
+    parser.add_argument('predicates', nargs='*', help='field=min:max for ranges (either side may be empty) or field=a,b for values (including tag=LQ45)')
+    parser.add_argument('--sort', help='field, or --sort=-field for descending')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--path', default=SCREENER_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        rows, last_update = rows_from_files(os.path.dirname(args.path))
+        publish(build_table(rows, last_update), args.path)
+        print(f"Wrote {args.path}: {len(rows)} symbols")
+    elif args.command == 'benchmark':
+        benchmark()
+    else:
+        predicates = {}
+        for text in args.predicates:
+            field, _, value = text.partition('=')
+            if ':' in value:
+                low, high = value.split(':', 1)
+                predicates[field] = (float(low) if low else None, float(high) if high else None)
+            else:
+                predicates[field] = value.split(',')
+        from categories import load_index
+        screener = Screener.from_table(serializer.load(args.path), load_index(os.path.join(os.path.dirname(args.path), 'categories.json')))
+        for row in screener.query(predicates, args.sort, limit=args.limit):
+            print(row)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+JSON serializer layer for the generated data files
+Uses orjson (compact, native NumPy/datetime support) when installed and falls back
+to the stdlib encoder. Set STOCKS_JSON_PRETTY=1, or pass pretty=True, for
+indented output when debugging.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Union
+import numpy as np
+from precompress import write_sidecars
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+PRETTY = os.environ.get('STOCKS_JSON_PRETTY', '') not in ('', '0')
+
+# Run metadata that changes on every run even when the data does not; left out of content hashes
+VOLATILE_KEYS = frozenset({'lastUpdate', 'last_update', 'data_quality', 'generatedAt'})
+# A key shows up in the compact encoding as "key":
+_VOLATILE_TOKENS = tuple(f'"{key}":'.encode() for key in VOLATILE_KEYS)
+
+# Bytes and encode/decode seconds per path for the current process
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _default(value: Any):
+    """Encode what the backend does not handle natively (NumPy, pandas, dates)"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def dumps(obj: Any, pretty: bool = None) -> bytes:
+    """Encode `obj` to UTF-8 JSON bytes, compact unless `pretty`"""
+    pretty = PRETTY if pretty is None else pretty
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    if pretty:
+        return json.dumps(obj, default=_default, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode()
+
+def loads(data: Union[bytes, str]) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _has_volatile(obj: Any) -> bool:
+    if not isinstance(obj, (dict, list)):
+        return False
+    payload = dumps(obj, pretty=False)
+    return any(token in payload for token in _VOLATILE_TOKENS)
+
+def _strip_volatile(obj: Any) -> Any:
+    """`obj` without VOLATILE_KEYS; subtrees that hold none (e.g. bar records) are shared, not walked"""
+    if isinstance(obj, dict):
+        return {key: _strip_volatile(value) if _has_volatile(value) else value
+                for key, value in obj.items() if key not in VOLATILE_KEYS}
+    if isinstance(obj, list):
+        return [_strip_volatile(value) if _has_volatile(value) else value for value in obj]
+    return obj
+
+def content_hash(obj: Any) -> str:
+    """Hash of the compact encoding of `obj` without its VOLATILE_KEYS, at any depth
+
+    Most files have no volatile key at all; their encoding is hashed as it is.
+    """
+    payload = dumps(obj, pretty=False)
+    if any(token in payload for token in _VOLATILE_TOKENS):
+        payload = dumps(_strip_volatile(obj), pretty=False)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def _record(path: str, **values):
+    with _stats_lock:
+        entry = _stats.setdefault(path, {'bytes': 0, 'encode_s': 0.0, 'decode_s': 0.0})
+        for key, value in values.items():
+            entry[key] = entry[key] + value if key != 'bytes' else value
+
+def dump(obj: Any, path: str, pretty: bool = None, sidecars: bool = False) -> int:
+    """Atomically write `obj` to `path`; returns the number of bytes written
+
+    Served artifacts pass `sidecars` to also get precompressed .gz/.br copies.
+    """
+    started = time.perf_counter()
+    payload = dumps(obj, pretty)
+    _record(path, bytes=len(payload), encode_s=time.perf_counter() - started)
+    with open(f'{path}.tmp', 'wb') as f:
+        f.write(payload)
+    os.replace(f'{path}.tmp', path)
+    if sidecars:
+        write_sidecars(path, payload)
+    return len(payload)
+
+def load(path: str) -> Any:
+    with open(path, 'rb') as f:
+        payload = f.read()
+    started = time.perf_counter()
+    obj = loads(payload)
+    _record(path, bytes=len(payload), decode_s=time.perf_counter() - started)
+    return obj
+
+def set_pretty(pretty: bool):
+    """Switch the default output format, for this process and any it starts"""
+    global PRETTY
+    PRETTY = pretty
+    os.environ['STOCKS_JSON_PRETTY'] = '1' if pretty else '0'
+
+def stats(reset: bool = False) -> Dict[str, Dict]:
+    """Per-path bytes and encode/decode time recorded by `dump` and `load`"""
+    with _stats_lock:
+        entries = {path: dict(entry) for path, entry in _stats.items()}
+        if reset:
+            _stats.clear()
+    return entries
+
+def merge_stats(entries: Dict[str, Dict]):
+    """Fold in stats collected by a worker process"""
+    for path, entry in entries.items():
+        _record(path, **entry)
+
+def report(base_dir: str = None) -> Dict:
+    """Print and return totals of what this process wrote, with the largest files"""
+    entries = stats()
+    total_bytes = sum(entry['bytes'] for entry in entries.values())
+    encode = sum(entry['encode_s'] for entry in entries.values())
+    decode = sum(entry['decode_s'] for entry in entries.values())
+    print(f"JSON ({BACKEND}{', pretty' if PRETTY else ''}): {len(entries)} files, {total_bytes / 1e6:.2f} MB, "
+          f"encode {encode * 1000:.1f} ms, decode {decode * 1000:.1f} ms")
+    largest = sorted(entries.items(), key=lambda item: item[1]['bytes'], reverse=True)[:5]
+    for path, entry in largest:
+        name = os.path.relpath(path, base_dir) if base_dir else path
+        print(f"  {name}: {entry['bytes'] / 1e3:.1f} KB, encode {entry['encode_s'] * 1000:.2f} ms")
+    return {'backend': BACKEND, 'files': len(entries), 'bytes': total_bytes,
+            'encode_ms': round(encode * 1000, 1), 'decode_ms': round(decode * 1000, 1)}
+
+def benchmark(data_dir: str, repeat: int = 5):
+    """Compare stdlib indent=2 with this layer's output for every data file under `data_dir`"""
+    rows = []
+    for root, _, names in os.walk(data_dir):
+        for name in sorted(names):
+            if name.endswith('.json'):
+                with open(os.path.join(root, name), 'rb') as f:
+                    rows.append((os.path.relpath(os.path.join(root, name), data_dir), json.loads(f.read())))
+
+    def measure(encode, decode):
+        size = encode_time = decode_time = 0
+        for _, obj in rows:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                payload = encode(obj)
+            encode_time += (time.perf_counter() - started) / repeat
+            started = time.perf_counter()
+            for _ in range(repeat):
+                decode(payload)
+            decode_time += (time.perf_counter() - started) / repeat
+            size += len(payload)
+        return size, encode_time, decode_time
+
+    baseline = measure(lambda obj: json.dumps(obj, indent=2).encode(), json.loads)
+    current = measure(lambda obj: dumps(obj, pretty=False), loads)
+    print(f"{len(rows)} files under {data_dir}")
+    for label, (size, encode_time, decode_time) in (('json indent=2', baseline), (f'{BACKEND} compact', current)):
+        print(f"  {label:16s} {size / 1e6:8.2f} MB  encode {encode_time * 1000:8.1f} ms  decode {decode_time * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['benchmark'])
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'))
+    args = parser.parse_args()
+    benchmark(args.data_dir)
@@ -21,4 +21,15 @@ INDONESIAN_STOCKS = [
     ("ANTM.JK", "Aneka Tambang"),
     ("BRIS.JK", "Bank Syariah Indonesia"),
     ("TOWR.JK", "Sarana Menara Nusantara")
-]
\ No newline at end of file
+]
+# Index membership tags for the category index; update after each IDX index review
+INDEX_MEMBERS = {
+    'LQ45': [
+        "BBCA.JK", "BBRI.JK", "BMRI.JK", "TLKM.JK", "ASII.JK", "UNVR.JK", "ICBP.JK", "INDF.JK", "KLBF.JK",
+        "SMGR.JK", "UNTR.JK", "PGAS.JK", "BBNI.JK", "ADRO.JK", "ANTM.JK", "BRIS.JK", "TOWR.JK", "JSMR.JK"
+    ],
+    'IDX30': [
+        "BBCA.JK", "BBRI.JK", "BMRI.JK", "TLKM.JK", "ASII.JK", "UNVR.JK", "ICBP.JK", "INDF.JK", "KLBF.JK",
+        "UNTR.JK", "PGAS.JK", "BBNI.JK", "ADRO.JK", "ANTM.JK"
+    ]
+}
@@ -0,0 +1,58 @@
+"""
+In-memory snapshots of the generated JSON files for the Flask app
+"""
+
+import json
+import os
+import threading
+
+class FileSnapshot:
+    """A JSON file parsed once and kept in memory until its mtime, inode or size changes
+
+    The scrapers replace files atomically, so a new inode means new content.
+    Values derived from the snapshot (rendered pages) are memoized per version.
+    """
+
+    def __init__(self, path, parse=lambda data: data, default=None):
+        self.path = path
+        self.parse = parse
+        self.default = default
+        self.version = 0
+        self._key = None
+        self._value = default
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
+    def get(self):
+        """(version, parsed value); the version changes whenever the file does"""
+        key = self._stat()
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    value = self.default
+                    if key is not None:
+                        try:
+                            with open(self.path, 'rb') as f:
+                                value = self.parse(json.load(f))
+                        except (OSError, ValueError):
+                            # Unreadable right now; keep serving the previous snapshot
+                            return self.version, self._value
+                    self._key, self._value, self.version = key, value, self.version + 1
+        return self.version, self._value
+
+    def memo(self, name, build, depends=None):
+        """`build(value)`, computed once per version of the file (and of `depends`, e.g. another snapshot's version)"""
+        version, value = self.get()
+        version = (version, depends)
+        hit = self._memo.get(name)
+        if hit is None or hit[0] != version:
+            hit = (version, build(value))
+            self._memo[name] = hit
+        return hit[1]
@@ -234,12 +234,20 @@ class BloombergApp {
         moversList.innerHTML = '';
         
         movers.forEach(stock => {
+            // Volume and 52-week boards show their own metric (volume / average, price / high or low)
+            let metric = `${stock.changePercent >= 0 ? '+' : ''}${this.dataManager.formatNumber(stock.changePercent)}%`;
+            if (type === 'unusual_volume') {
+                metric = `${this.dataManager.formatNumber(stock.value)}x avg`;
+            } else if (type === 'near_high' || type === 'near_low') {
+                const distance = (stock.value - 1) * 100;
+                metric = `${distance >= 0 ? '+' : ''}${this.dataManager.formatNumber(distance)}% vs ${type === 'near_high' ? 'high' : 'low'}`;
+            }
             const item = document.createElement('div');
             item.className = 'mover-item';
             item.innerHTML = `
                 <span class="stock-symbol" data-symbol="${stock.symbol}">${stock.symbol}</span>
                 <span class="${stock.changePercent >= 0 ? 'positive' : 'negative'}">
-                    ${stock.changePercent >= 0 ? '+' : ''}${this.dataManager.formatNumber(stock.changePercent)}%
+                    ${metric}
                 </span>
             `;
             item.addEventListener('click', () => this.showStockDetail(stock.symbol));
@@ -653,6 +661,12 @@ class BloombergApp {
 
     renderTechnicalsTab(container, data) {
         const t = data.technicals;
+        const c = this.dataManager.getCorrelation(data.symbol);
+        const peerRows = peers => peers.map(peer => `
+                        <tr>
+                            <td>${peer.symbol}</td>
+                            <td class="numeric ${peer.corr >= 0 ? 'positive' : 'negative'}">${this.dataManager.formatNumber(peer.corr)}</td>
+                        </tr>`).join('');
         
         container.innerHTML = `
             <div class="technicals-grid" style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 20px;">
@@ -685,6 +699,14 @@ class BloombergApp {
                             <td>Beta</td>
                             <td class="numeric">${data.basic.beta ? this.dataManager.formatNumber(data.basic.beta) : '-'}</td>
                         </tr>
+                        <tr>
+                            <td>Beta (vs composite)</td>
+                            <td class="numeric">${c && c.beta !== null ? this.dataManager.formatNumber(c.beta) : '-'}</td>
+                        </tr>
+                        <tr>
+                            <td>Avg Correlation</td>
+                            <td class="numeric">${c && c.avgCorr !== null ? this.dataManager.formatNumber(c.avgCorr) : '-'}</td>
+                        </tr>
                     </table>
                 </div>
                 
@@ -723,6 +745,13 @@ class BloombergApp {
                         </tr>
                     </table>
                 </div>
+                
+                <div class="technical-section">
+                    <h4 style="margin-bottom: 15px; color: var(--text-secondary);">Correlation (${c ? c.window : '-'} days)</h4>
+                    <table class="financial-table" style="width: 100%;">
+                        ${c ? peerRows(c.most) + peerRows(c.least) : '<tr><td>No correlation data</td></tr>'}
+                    </table>
+                </div>
             </div>
         `;
     }
@@ -739,8 +768,8 @@ class BloombergApp {
     }
 
     renderScreenerFilters() {
-        // Get unique sectors
-        const sectors = [...new Set(this.dataManager.data.stocks.map(s => s.sector).filter(Boolean))];
+        // Sectors from the category index
+        const sectors = this.dataManager.categoryValues('sector');
         
         const sectorFilters = document.getElementById('sectorFilters');
         sectorFilters.innerHTML = '';
@@ -6,9 +6,17 @@ class DataManager {
             stocks: [],
             fundamentals: {},
             historicals: {},
-            screenerCache: {},
+            screener: {},
+            // data/categories.json: sector/industry/tag -> hex bitset over `symbols`
+            categories: null,
+            // data/leaders.json: precomputed top-N boards (gainers, losers, active, ...)
+            leaders: null,
+            // data/correlation.json: beta vs the composite and most/least correlated peers
+            correlation: null,
             lastUpdate: null
         };
+        // data/manifest.json: content hash, size and change time per generated file
+        this.manifest = null;
         this.initDB();
     }
 
@@ -48,44 +56,93 @@ class DataManager {
         });
     }
 
-    // Load data from JSON files
+    // Fetch the manifest, revalidating against the server copy (a 304 when nothing changed)
+    async fetchManifest() {
+        try {
+            const response = await fetch('/data/manifest.json', { cache: 'no-cache' });
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            console.warn('Manifest unavailable:', error);
+            return null;
+        }
+    }
+
+    // Content hash of a generated file ('data/index.json'), or null if unknown
+    fileHash(path) {
+        const entry = this.manifest && this.manifest.files[path];
+        return entry ? entry.hash : null;
+    }
+
+    // Fetch a generated file by a URL versioned with its hash, so a changed file is never served stale
+    async fetchFile(path) {
+        const hash = this.fileHash(path);
+        const response = await fetch(hash ? `/${path}?v=${hash}` : `/${path}`);
+        if (!response.ok) throw new Error(`${path}: HTTP ${response.status}`);
+        return response.json();
+    }
+
+    // Load data from JSON files, refetching only the files whose hash changed since the last load
     async loadData() {
         try {
-            // Check if data exists in IndexedDB first
-            const cachedData = await this.getFromDB('metadata', 'lastUpdate');
-            const now = new Date();
-            
-            if (cachedData && cachedData.value) {
-                const lastUpdate = new Date(cachedData.value);
-                const hoursSinceUpdate = (now - lastUpdate) / (1000 * 60 * 60);
-                
-                // If data is less than 1 hour old, use cached data
-                if (hoursSinceUpdate < 1) {
-                    console.log('Using cached data from IndexedDB');
-                    await this.loadFromDB();
-                    return this.data;
-                }
+            this.manifest = await this.fetchManifest();
+            if (!this.manifest) {
+                return await this.loadDataWithTTL();
             }
             
-            console.log('Loading fresh data from server');
-            
-            // Load index file
-            const indexResponse = await fetch('/data/index.json');
-            const indexData = await indexResponse.json();
-            
-            this.data.stocks = indexData.stocks;
-            this.data.lastUpdate = indexData.last_update;
+            const cachedHashes = await this.getFromDB('metadata', 'fileHashes');
+            const seen = (cachedHashes && cachedHashes.value) || {};
+            const changed = path => !this.db || !this.fileHash(path) || seen[path] !== this.fileHash(path);
+            const files = {
+                index: 'data/index.json',
+                fundamentals: 'data/fundamentals.json',
+                screener: 'data/screener.json',
+                categories: 'data/categories.json',
+                leaders: 'data/leaders.json',
+                correlation: 'data/correlation.json'
+            };
+            const stale = Object.values(files).filter(changed);
             
-            // Load fundamentals
-            const fundamentalsResponse = await fetch('/data/fundamentals.json');
-            this.data.fundamentals = await fundamentalsResponse.json();
+            if (stale.length < Object.keys(files).length) {
+                await this.loadFromDB();
+            }
+            if (stale.length === 0) {
+                console.log('Manifest unchanged, using cached data from IndexedDB');
+                return this.data;
+            }
+            console.log(`Loading changed files from server: ${stale.join(', ')}`);
             
-            // Load screener cache
-            const screenerResponse = await fetch('/data/screener_cache.json');
-            this.data.screenerCache = await screenerResponse.json();
+            // The derived files only exist once the pipeline has built them
+            const required = [files.index, files.fundamentals];
+            const [indexData, fundamentals, screener, categories, leaders, correlation] = await Promise.all(Object.values(files).map(
+                path => !stale.includes(path) ? null
+                    : required.includes(path) ? this.fetchFile(path) : this.fetchFile(path).catch(() => null)
+            ));
+            if (indexData) {
+                this.data.stocks = indexData.stocks;
+                this.data.lastUpdate = indexData.last_update;
+            }
+            if (fundamentals) {
+                this.data.fundamentals = fundamentals;
+            }
+            if (screener) {
+                this.data.screener = screener;
+            }
+            if (categories) {
+                this.data.categories = categories;
+            }
+            if (leaders) {
+                this.data.leaders = leaders;
+            }
+            if (correlation) {
+                this.data.correlation = correlation;
+            }
             
-            // Store in IndexedDB
+            // Store in IndexedDB with the hashes it now matches
             await this.saveToIndexedDB();
+            for (const path of stale) {
+                seen[path] = this.fileHash(path);
+            }
+            await this.saveToDB('metadata', { key: 'fileHashes', value: seen });
             
             return this.data;
         } catch (error) {
@@ -96,19 +153,47 @@ class DataManager {
         }
     }
 
+    // Without a manifest: reuse IndexedDB for an hour, then refetch everything
+    async loadDataWithTTL() {
+        const cachedData = await this.getFromDB('metadata', 'lastUpdate');
+        
+        if (cachedData && cachedData.value) {
+            const hoursSinceUpdate = (new Date() - new Date(cachedData.value)) / (1000 * 60 * 60);
+            if (hoursSinceUpdate < 1) {
+                console.log('Using cached data from IndexedDB');
+                await this.loadFromDB();
+                return this.data;
+            }
+        }
+        
+        console.log('Loading fresh data from server');
+        const indexData = await this.fetchFile('data/index.json');
+        this.data.stocks = indexData.stocks;
+        this.data.lastUpdate = indexData.last_update;
+        this.data.fundamentals = await this.fetchFile('data/fundamentals.json');
+        this.data.screener = await this.fetchFile('data/screener.json').catch(() => null);
+        this.data.categories = await this.fetchFile('data/categories.json').catch(() => null);
+        this.data.leaders = await this.fetchFile('data/leaders.json').catch(() => null);
+        this.data.correlation = await this.fetchFile('data/correlation.json').catch(() => null);
+        
+        await this.saveToIndexedDB();
+        return this.data;
+    }
+
     // Load individual stock data
     async loadStockDetail(symbol) {
         try {
-            // Check IndexedDB first
+            const cleanSymbol = symbol.replace('.JK', '');
+            const path = `data/stocks/${cleanSymbol}.json`;
+            
+            // Check IndexedDB first; a cached copy is only used while its hash is current
             const cached = await this.getFromDB('stocks', symbol);
-            if (cached && cached.detailData) {
+            if (cached && cached.detailData && (!this.fileHash(path) || cached.detailHash === this.fileHash(path))) {
                 return cached.detailData;
             }
             
             // Load from server
-            const cleanSymbol = symbol.replace('.JK', '');
-            const response = await fetch(`/data/stocks/${cleanSymbol}.json`);
-            const stockData = await response.json();
+            const stockData = await this.fetchFile(path);
             
             // Update IndexedDB
             const transaction = this.db.transaction(['stocks'], 'readwrite');
@@ -116,6 +201,7 @@ class DataManager {
             const existing = await this.getFromDB('stocks', symbol);
             if (existing) {
                 existing.detailData = stockData;
+                existing.detailHash = this.fileHash(path);
                 store.put(existing);
             }
             
@@ -130,20 +216,20 @@ class DataManager {
     async loadHistoricalData(symbol, period = 'daily') {
         try {
             const id = `${symbol}_${period}`;
+            const cleanSymbol = symbol.replace('.JK', '');
+            const path = `data/historicals/${cleanSymbol}_${period}.json`;
             
-            // Check IndexedDB first
+            // Check IndexedDB first; a cached copy is only used while its hash is current
             const cached = await this.getFromDB('historicals', id);
-            if (cached) {
+            if (cached && (!this.fileHash(path) || cached.hash === this.fileHash(path))) {
                 return cached.data;
             }
             
             // Load from server
-            const cleanSymbol = symbol.replace('.JK', '');
-            const response = await fetch(`/data/historicals/${cleanSymbol}_${period}.json`);
-            const data = await response.json();
+            const data = await this.fetchFile(path);
             
             // Store in IndexedDB
-            await this.saveToDB('historicals', { id, symbol, period, data });
+            await this.saveToDB('historicals', { id, symbol, period, data, hash: this.fileHash(path) });
             
             return data;
         } catch (error) {
@@ -174,6 +260,10 @@ class DataManager {
         const metadataStore = transaction.objectStore('metadata');
         metadataStore.put({ key: 'lastUpdate', value: new Date().toISOString() });
         metadataStore.put({ key: 'dataLastUpdate', value: this.data.lastUpdate });
+        metadataStore.put({ key: 'screener', value: this.data.screener });
+        metadataStore.put({ key: 'categories', value: this.data.categories });
+        metadataStore.put({ key: 'leaders', value: this.data.leaders });
+        metadataStore.put({ key: 'correlation', value: this.data.correlation });
     }
 
     // Load data from IndexedDB
@@ -200,6 +290,22 @@ class DataManager {
         if (lastUpdateData) {
             this.data.lastUpdate = lastUpdateData.value;
         }
+        const screenerData = await this.getFromStore(metadataStore, 'screener');
+        if (screenerData) {
+            this.data.screener = screenerData.value;
+        }
+        const categoriesData = await this.getFromStore(metadataStore, 'categories');
+        if (categoriesData) {
+            this.data.categories = categoriesData.value;
+        }
+        const leadersData = await this.getFromStore(metadataStore, 'leaders');
+        if (leadersData) {
+            this.data.leaders = leadersData.value;
+        }
+        const correlationData = await this.getFromStore(metadataStore, 'correlation');
+        if (correlationData) {
+            this.data.correlation = correlationData.value;
+        }
     }
 
     // Helper methods for IndexedDB operations
@@ -293,7 +399,8 @@ class DataManager {
         }
         
         if (filters.sectors && filters.sectors.length > 0) {
-            results = results.filter(stock => filters.sectors.includes(stock.sector));
+            const members = this.categoryMembers('sector', filters.sectors);
+            results = results.filter(stock => members ? members.has(stock.symbol) : filters.sectors.includes(stock.sector));
         }
         
         if (filters.perf1dMin !== undefined || filters.perf1dMax !== undefined) {
@@ -308,6 +415,47 @@ class DataManager {
         return results;
     }
 
+    // Values of a category dimension ('sector', 'industry', 'tag')
+    categoryValues(dimension) {
+        const categories = this.data.categories;
+        if (categories && categories.categories[dimension]) {
+            return Object.keys(categories.categories[dimension]);
+        }
+        return dimension === 'tag' ? [] : [...new Set(this.data.stocks.map(s => s[dimension]).filter(Boolean))];
+    }
+
+    // Symbols in any of `values` of a dimension, decoded from the bitsets; null without a category index
+    categoryMembers(dimension, values) {
+        const categories = this.data.categories;
+        if (!categories || !categories.categories[dimension]) return null;
+        let bits = 0n;
+        for (const value of values) {
+            const hex = categories.categories[dimension][value];
+            if (hex) bits |= BigInt(`0x${hex}`);
+        }
+        const members = new Set();
+        for (let i = 0; bits; i++, bits >>= 1n) {
+            if (bits & 1n) members.add(categories.symbols[i]);
+        }
+        return members;
+    }
+
+    // Beta, average correlation and peers of one symbol from correlation.json; null when not covered
+    getCorrelation(symbol) {
+        const correlation = this.data.correlation;
+        const i = correlation && correlation.symbols ? correlation.symbols.indexOf(symbol) : -1;
+        if (i < 0) return null;
+        const peers = (positions, values) => positions[i].map((j, k) => ({ symbol: correlation.symbols[j], corr: values[i][k] }));
+        return {
+            asOf: correlation.as_of,
+            window: correlation.window,
+            beta: correlation.beta[i],
+            avgCorr: correlation.avg_corr[i],
+            most: peers(correlation.peers.most, correlation.peers.most_corr),
+            least: peers(correlation.peers.least, correlation.peers.least_corr)
+        };
+    }
+
     // Get market statistics
     getMarketStats() {
         const stats = {
@@ -354,8 +502,13 @@ class DataManager {
         return stats;
     }
 
-    // Get top movers
+    // Get top movers; boards from leaders.json need no sorting here
     getMovers(type = 'gainers', limit = 5) {
+        const leaders = this.data.leaders;
+        if (leaders && leaders.boards[type] && limit <= leaders.n) {
+            return leaders.boards[type].slice(0, limit);
+        }
+        
         let sorted = [...this.data.stocks];
         
         switch (type) {
@@ -368,6 +521,9 @@ class DataManager {
             case 'active':
                 sorted.sort((a, b) => (b.volume || 0) - (a.volume || 0));
                 break;
+            default:
+                // The other boards need quote fields that only leaders.json carries
+                return [];
         }
         
         return sorted.slice(0, limit);